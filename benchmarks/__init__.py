@@ -0,0 +1,8 @@
+"""Speakeasy Benchmarks
+
+Times Speakeasy's hot paths (life event binders, item production, negotiation, and
+JSON export) in seeded worlds of several population sizes. Run from the project root:
+
+    python -m benchmarks --populations 100 500 2000 -o results.json
+
+"""
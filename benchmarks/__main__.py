@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+
+from benchmarks.suite import run_benchmarks
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser("Benchmarks Speakeasy's hot paths")
+
+    parser.add_argument(
+        "-p",
+        "--populations",
+        type=int,
+        nargs="+",
+        default=[100, 500, 2000],
+        help="population sizes of the benchmark worlds",
+    )
+
+    parser.add_argument("--seed", type=int, default=1337, help="world seed")
+
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=10,
+        help="number of times to call each timed operation",
+    )
+
+    parser.add_argument(
+        "--export-repeat",
+        type=int,
+        default=1,
+        help="number of times to export each world to JSON",
+    )
+
+    parser.add_argument(
+        "--warmup-months",
+        type=int,
+        default=3,
+        help="months to simulate before timing",
+    )
+
+    parser.add_argument(
+        "-o", "--output", help="path to write JSON results (defaults to stdout)"
+    )
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = get_args()
+
+    report = run_benchmarks(
+        args.populations,
+        seed=args.seed,
+        repeat=args.repeat,
+        export_repeat=args.export_repeat,
+        warmup_months=args.warmup_months,
+    )
+
+    data = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(data)
+    else:
+        sys.stdout.write(data + "\n")
+
+
+if __name__ == "__main__":
+    main()
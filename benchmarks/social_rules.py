@@ -0,0 +1,253 @@
+"""Batched scoring of Speakeasy's social rules, used by the social rule benchmark.
+
+The weights below mirror the rules in speakeasy.social_rules. The benchmark tests check
+that the evaluator's scores match the rules' results.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from neighborly.components.character import Virtue
+from neighborly.core.ecs import World
+from neighborly.core.relationship import Friendship, RelationshipFacet, Romance
+from neighborly.core.time import SimDateTime
+from neighborly.utils.query import are_related
+
+from speakeasy.components import (
+    MAX_VIRTUE_DISTANCE,
+    Ethnicity,
+    EthnicityValue,
+    Faction,
+    Respect,
+)
+from speakeasy.resources import KinshipIndex
+from speakeasy.social_rules import get_virtue_signature
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+"""The number of set bits in each byte value."""
+
+_ETHNICITY_CODES: Dict[EthnicityValue, int] = {
+    value: code for code, value in enumerate(EthnicityValue)
+}
+
+
+def _popcount_array(values: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """Count the set bits of each (32-bit) value in an array."""
+    return (
+        _POPCOUNT[values & 0xFF]
+        + _POPCOUNT[(values >> 8) & 0xFF]
+        + _POPCOUNT[(values >> 16) & 0xFF]
+        + _POPCOUNT[(values >> 24) & 0xFF]
+    )
+
+
+class SocialRuleEvaluator:
+    """Scores Speakeasy's social rules for many (subject, target) pairs at once.
+
+    Characters' ethnicity codes, faction IDs, and VirtueSignatures (virtue values and
+    bitmasks of their high and low virtues) are gathered into arrays, once per
+    simulated tick. Scoring a batch of pairs is then a handful of array operations
+    instead of component lookups and set intersections for every rule and pair. The
+    total Respect, Romance, and Friendship deltas are the same as summing the results
+    of the individual rules.
+
+    Neighborly evaluates social rules one relationship at a time, as each one is
+    created, and records a modifier per rule. So, the simulation calls the rules in
+    speakeasy.social_rules, and this evaluator is only used to benchmark them.
+
+    Notes
+    -----
+    Features are refreshed when the simulated date changes. So, components that change
+    partway through a tick (for example, a character joining a gang) are seen by the
+    evaluator on the next tick.
+    """
+
+    __slots__ = (
+        "_date",
+        "_rows",
+        "_ethnicity",
+        "_faction",
+        "_has_virtues",
+        "_virtues",
+        "_norms",
+        "_high",
+        "_low",
+    )
+
+    _date: Optional[SimDateTime]
+    """The date that the features were gathered."""
+
+    _rows: Dict[int, int]
+    """Character IDs mapped to their row in the feature arrays."""
+
+    _ethnicity: npt.NDArray[np.int64]
+    """Ethnicity codes (-1 if a character has no Ethnicity)."""
+
+    _faction: npt.NDArray[np.int64]
+    """Faction IDs (-1 if a character has no Faction)."""
+
+    _has_virtues: npt.NDArray[np.bool_]
+    """Does a character have a Virtues component."""
+
+    _virtues: npt.NDArray[np.int64]
+    """Virtue values (one row per character)."""
+
+    _norms: npt.NDArray[np.float64]
+    """The Euclidean norm of each character's virtue values."""
+
+    _high: npt.NDArray[np.int64]
+    """Bitmasks of characters' highest virtues."""
+
+    _low: npt.NDArray[np.int64]
+    """Bitmasks of characters' lowest virtues."""
+
+    def __init__(self) -> None:
+        self._date = None
+        self._clear()
+
+    def _clear(self) -> None:
+        """Remove all gathered features."""
+        self._rows = {}
+        self._ethnicity = np.zeros(0, dtype=np.int64)
+        self._faction = np.zeros(0, dtype=np.int64)
+        self._has_virtues = np.zeros(0, dtype=np.bool_)
+        self._virtues = np.zeros((0, len(Virtue)), dtype=np.int64)
+        self._norms = np.zeros(0, dtype=np.float64)
+        self._high = np.zeros(0, dtype=np.int64)
+        self._low = np.zeros(0, dtype=np.int64)
+
+    def score(
+        self, world: World, pairs: Sequence[Tuple[int, int]]
+    ) -> Dict[Type[RelationshipFacet], npt.NDArray[np.int64]]:
+        """Score social rules for (subject, target) pairs.
+
+        Parameters
+        ----------
+        world
+            The world that the characters belong to.
+        pairs
+            (subject ID, target ID) pairs to score.
+
+        Returns
+        -------
+        Dict[Type[RelationshipFacet], npt.NDArray[np.int64]]
+            Respect, Romance, and Friendship mapped to one delta per pair.
+        """
+        self._refresh(world, pairs)
+
+        subjects = np.fromiter(
+            (self._rows[s] for s, _ in pairs), dtype=np.int64, count=len(pairs)
+        )
+        targets = np.fromiter(
+            (self._rows[t] for _, t in pairs), dtype=np.int64, count=len(pairs)
+        )
+
+        respect = np.zeros(len(pairs), dtype=np.int64)
+
+        # respect_same_ethnicity and disrespect_different_ethnicity
+        ethnicity_s = self._ethnicity[subjects]
+        ethnicity_t = self._ethnicity[targets]
+        has_ethnicity = (ethnicity_s >= 0) & (ethnicity_t >= 0)
+        respect += np.where(
+            has_ethnicity, np.where(ethnicity_s == ethnicity_t, 5, -5), 0
+        )
+
+        # respect_same_faction
+        faction_s = self._faction[subjects]
+        respect += np.where(
+            (faction_s >= 0) & (faction_s == self._faction[targets]), 5, 0
+        )
+
+        # respect_for_family
+        kinship_index = world.try_resource(KinshipIndex)
+        respect += 10 * np.fromiter(
+            (
+                kinship_index.are_related(s, t)
+                if kinship_index is not None
+                else are_related(world.get_gameobject(s), world.get_gameobject(t))
+                for s, t in pairs
+            ),
+            dtype=np.int64,
+            count=len(pairs),
+        )
+
+        has_virtues = self._has_virtues[subjects] & self._has_virtues[targets]
+
+        # romance_boost_from_shared_virtues and romance_loss_from_virtue_conflicts
+        high_s, high_t = self._high[subjects], self._high[targets]
+        low_s, low_t = self._low[subjects], self._low[targets]
+        romance = (
+            _popcount_array(high_s & high_t)
+            + _popcount_array(low_s & low_t)
+            - _popcount_array(high_s & low_t)
+            - _popcount_array(high_t & low_s)
+        )
+
+        # friendship_virtue_compatibility (the same math as Virtues.compatibility)
+        virtues_s = self._virtues[subjects]
+        virtues_t = self._virtues[targets]
+        norm_product = self._norms[subjects] * self._norms[targets]
+        dot = np.einsum("ij,ij->i", virtues_s, virtues_t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cosine_similarity = np.where(norm_product == 0, 0.0, dot / norm_product)
+        distance = np.linalg.norm(virtues_s - virtues_t, axis=1)
+        distance_similarity = 2.0 * (1.0 - (distance / MAX_VIRTUE_DISTANCE)) - 1.0
+        compatibility = np.round(
+            100 * ((cosine_similarity + distance_similarity) / 2.0)
+        )
+        friendship = np.round(6 * (compatibility / 100.0)).astype(np.int64)
+
+        return {
+            Respect: respect,
+            Romance: np.where(has_virtues, romance, 0),
+            Friendship: np.where(has_virtues, friendship, 0),
+        }
+
+    def _refresh(self, world: World, pairs: Sequence[Tuple[int, int]]) -> None:
+        """Gather features for characters that have not been seen this tick."""
+        date = world.get_resource(SimDateTime)
+
+        if self._date is None or self._date != date:
+            self._clear()
+            self._date = date.copy()
+
+        new_characters: List[int] = []
+        for pair in pairs:
+            for uid in pair:
+                if uid not in self._rows:
+                    self._rows[uid] = len(self._rows)
+                    new_characters.append(uid)
+
+        if not new_characters:
+            return
+
+        ethnicity = np.full(len(new_characters), -1, dtype=np.int64)
+        faction = np.full(len(new_characters), -1, dtype=np.int64)
+        has_virtues = np.zeros(len(new_characters), dtype=np.bool_)
+        virtues = np.zeros((len(new_characters), len(Virtue)), dtype=np.int64)
+        norms = np.zeros(len(new_characters), dtype=np.float64)
+        high = np.zeros(len(new_characters), dtype=np.int64)
+        low = np.zeros(len(new_characters), dtype=np.int64)
+
+        for i, uid in enumerate(new_characters):
+            gameobject = world.get_gameobject(uid)
+            if (ethnicity_comp := gameobject.try_component(Ethnicity)) is not None:
+                ethnicity[i] = _ETHNICITY_CODES[ethnicity_comp.ethnicity]
+            if (faction_comp := gameobject.try_component(Faction)) is not None:
+                faction[i] = faction_comp.faction_id
+            if (signature := get_virtue_signature(gameobject)) is not None:
+                has_virtues[i] = True
+                virtues[i] = signature.values
+                norms[i] = signature.norm
+                high[i] = signature.high
+                low[i] = signature.low
+
+        self._ethnicity = np.concatenate((self._ethnicity, ethnicity))
+        self._faction = np.concatenate((self._faction, faction))
+        self._has_virtues = np.concatenate((self._has_virtues, has_virtues))
+        self._virtues = np.concatenate((self._virtues, virtues))
+        self._norms = np.concatenate((self._norms, norms))
+        self._high = np.concatenate((self._high, high))
+        self._low = np.concatenate((self._low, low))
@@ -0,0 +1,337 @@
+import dataclasses
+import inspect
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from neighborly import Neighborly
+from neighborly.components import GameCharacter
+from neighborly.core.ecs import Active, World
+from neighborly.core.life_event import RandomLifeEvent
+from neighborly.core.relationship import SocialRules
+from neighborly.core.roles import RoleList
+from neighborly.exporter import export_to_json
+
+import speakeasy
+import speakeasy.events
+import speakeasy.social_rules
+from speakeasy.components import Inventory
+from speakeasy.events import NegotiateEvent
+from speakeasy.exporter import write_json
+from speakeasy.negotiation.scheduler import NegotiationBatch
+from speakeasy.systems import ProduceItemsSystem
+
+from benchmarks.social_rules import SocialRuleEvaluator
+from benchmarks.worlds import build_world
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """Timing statistics for repeated calls of a single operation."""
+
+    name: str
+    """The name of the timed operation."""
+
+    population: int
+    """The requested number of characters in the benchmark world."""
+
+    calls: int
+    """The number of times the operation was called."""
+
+    successes: int
+    """The number of calls that returned a value other than None."""
+
+    total_s: float
+    """The total time spent in all calls (in seconds)."""
+
+    mean_s: float
+    """The mean time of a single call (in seconds)."""
+
+    median_s: float
+    """The median time of a single call (in seconds)."""
+
+    min_s: float
+    """The fastest call (in seconds)."""
+
+    max_s: float
+    """The slowest call (in seconds)."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+def time_calls(
+    name: str, population: int, fn: Callable[[], Any], repeat: int
+) -> BenchmarkResult:
+    """Time repeated calls of a function.
+
+    Parameters
+    ----------
+    name
+        The name of the timed operation.
+    population
+        The requested number of characters in the benchmark world.
+    fn
+        The function to call.
+    repeat
+        The number of times to call the function.
+
+    Returns
+    -------
+    BenchmarkResult
+        Timing statistics for the calls.
+    """
+    durations: List[float] = []
+    successes = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+        if result is not None:
+            successes += 1
+
+    return BenchmarkResult(
+        name=name,
+        population=population,
+        calls=repeat,
+        successes=successes,
+        total_s=sum(durations),
+        mean_s=statistics.mean(durations),
+        median_s=statistics.median(durations),
+        min_s=min(durations),
+        max_s=max(durations),
+    )
+
+
+def get_speakeasy_life_events() -> List[Type[RandomLifeEvent]]:
+    """Return all the random life event types defined by Speakeasy."""
+    return [
+        obj
+        for _, obj in inspect.getmembers(speakeasy.events, inspect.isclass)
+        if issubclass(obj, RandomLifeEvent)
+        and obj.__module__ == speakeasy.events.__name__
+    ]
+
+
+def benchmark_life_events(
+    sim: Neighborly, population: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Time instantiating (binding roles for) each Speakeasy life event type."""
+    return [
+        time_calls(
+            f"instantiate.{event_type.__name__}",
+            population,
+            lambda event_type=event_type: event_type.instantiate(sim.world, RoleList()),
+            repeat,
+        )
+        for event_type in get_speakeasy_life_events()
+    ]
+
+
+def get_inventories(world: World) -> Dict[int, Dict[str, int]]:
+    """Return a copy of the items in every inventory in a world."""
+    return {
+        uid: dict(inventory.items) for uid, inventory in world.get_component(Inventory)
+    }
+
+
+def set_inventories(world: World, inventories: Dict[int, Dict[str, int]]) -> None:
+    """Restore inventories to the items returned by get_inventories()."""
+    for uid, items in inventories.items():
+        inventory = world.get_gameobject(uid).get_component(Inventory)
+        for item in inventory.get_items():
+            inventory.set_quantity(item, 0)
+        for item, quantity in items.items():
+            inventory.set_quantity(item, quantity)
+
+
+def benchmark_production(
+    sim: Neighborly, population: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Time ProduceItemsSystem.run using both production modes.
+
+    Production changes owners' inventories, so they are restored before timing each
+    mode (and afterward) to have both modes do the same work.
+    """
+    system = sim.world.get_system(ProduceItemsSystem)
+
+    if system is None:
+        return []
+
+    original_mode = system.vectorized
+    inventories = get_inventories(sim.world)
+    results: List[BenchmarkResult] = []
+
+    for vectorized in (False, True):
+        set_inventories(sim.world, inventories)
+        system.vectorized = vectorized
+        results.append(
+            time_calls(
+                "ProduceItemsSystem.run.vectorized"
+                if vectorized
+                else "ProduceItemsSystem.run",
+                population,
+                system.run,
+                repeat,
+            )
+        )
+
+    system.vectorized = original_mode
+    set_inventories(sim.world, inventories)
+
+    return results
+
+
+def benchmark_social_rules(
+    sim: Neighborly, population: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Time scoring Speakeasy's social rules for every pair of active characters.
+
+    The rules are called one pair at a time and then scored by a fresh (so features
+    are gathered during every call) SocialRuleEvaluator.
+    """
+    world = sim.world
+    characters = [uid for uid, _ in world.get_components((GameCharacter, Active))]
+    pairs = [(s, t) for s in characters for t in characters if s != t]
+    rules = [
+        info.rule
+        for info in SocialRules.iter_rules()
+        if info.rule.__module__ == speakeasy.social_rules.__name__
+    ]
+
+    def score_pairs() -> None:
+        for s, t in pairs:
+            subject, target = world.get_gameobject(s), world.get_gameobject(t)
+            for rule in rules:
+                rule(subject, target)
+
+    return [
+        time_calls("social_rules.pairwise", population, score_pairs, repeat),
+        time_calls(
+            "social_rules.batched",
+            population,
+            lambda: SocialRuleEvaluator().score(world, pairs),
+            repeat,
+        ),
+    ]
+
+
+def benchmark_negotiation(
+    sim: Neighborly, population: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Time NegotiateEvent from binding roles through executing the negotiation.
+
+    Negotiations are also timed a step's worth (one per ten characters) at a time,
+    executed one after another and then run together as a NegotiationBatch.
+    """
+
+    def negotiate() -> Optional[NegotiateEvent]:
+        event = NegotiateEvent.instantiate(sim.world, RoleList())
+        if event is not None:
+            event.execute()
+        return event
+
+    def bind_negotiations() -> List[NegotiateEvent]:
+        events = []
+        for _ in range(max(population // 10, 1)):
+            event = NegotiateEvent.instantiate(sim.world, RoleList())
+            if event is not None:
+                events.append(event)  # type: ignore
+        return events
+
+    def negotiate_one_at_a_time() -> None:
+        for event in bind_negotiations():
+            event.execute()
+
+    def negotiate_batched() -> None:
+        batch = NegotiationBatch()
+        for event in bind_negotiations():
+            batch.submit(event)
+        batch.run()
+
+    return [
+        time_calls("NegotiateEvent.end_to_end", population, negotiate, repeat),
+        time_calls(
+            "negotiation.one_at_a_time", population, negotiate_one_at_a_time, repeat
+        ),
+        time_calls("negotiation.batched", population, negotiate_batched, repeat),
+    ]
+
+
+def benchmark_export(
+    sim: Neighborly, population: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Time exporting the simulation to JSON, all at once and streamed to a file."""
+
+    def stream() -> None:
+        with open(os.devnull, "w") as f:
+            write_json(sim, f)
+
+    return [
+        time_calls("export_to_json", population, lambda: export_to_json(sim), repeat),
+        time_calls("write_json", population, stream, repeat),
+    ]
+
+
+def run_benchmarks(
+    populations: Iterable[int],
+    seed: int = 1337,
+    repeat: int = 10,
+    export_repeat: int = 1,
+    warmup_months: int = 3,
+) -> Dict[str, Any]:
+    """Run all the benchmarks for each population size.
+
+    Parameters
+    ----------
+    populations
+        The population sizes of the benchmark worlds.
+    seed
+        The seed used to build every world.
+    repeat
+        The number of times to call each operation.
+    export_repeat
+        The number of times to export each world to JSON.
+    warmup_months
+        The number of months to simulate before timing.
+
+    Returns
+    -------
+    Dict[str, Any]
+        JSON-serializable metadata about the run and a list of results.
+    """
+    populations = list(populations)
+    results: List[BenchmarkResult] = []
+    build_times: Dict[str, float] = {}
+
+    for population in populations:
+        start = time.perf_counter()
+        sim = build_world(population, seed=seed, warmup_months=warmup_months)
+        build_times[str(population)] = time.perf_counter() - start
+
+        # Export first, since the other benchmarks change the state of the world
+        results.extend(benchmark_export(sim, population, export_repeat))
+        results.extend(benchmark_life_events(sim, population, repeat))
+        results.extend(benchmark_production(sim, population, repeat))
+        results.extend(benchmark_social_rules(sim, population, repeat))
+        results.extend(benchmark_negotiation(sim, population, repeat))
+
+    return {
+        "metadata": {
+            "speakeasy_version": speakeasy.VERSION,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "seed": seed,
+            "populations": populations,
+            "repeat": repeat,
+            "export_repeat": export_repeat,
+            "warmup_months": warmup_months,
+            "build_time_s": build_times,
+        },
+        "results": [result.to_dict() for result in results],
+    }
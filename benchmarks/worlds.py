@@ -0,0 +1,127 @@
+import random
+from typing import Any, Dict, Optional
+
+from neighborly import Neighborly, NeighborlyConfig
+from neighborly.components import CharacterSpawnTable, GameCharacter
+from neighborly.components.character import LifeStageType
+from neighborly.core.ecs import Active
+from neighborly.core.settlement import Settlement
+from neighborly.utils.common import add_character_to_settlement, spawn_character
+
+from speakeasy.batch import reset_global_state
+
+
+def create_simulation(
+    seed: int, settings: Optional[Dict[str, Any]] = None
+) -> Neighborly:
+    """Create a quiet Speakeasy simulation for benchmarking.
+
+    Parameters
+    ----------
+    seed
+        The seed for the simulation's random number generator.
+    settings
+        Additional simulation settings.
+
+    Returns
+    -------
+    Neighborly
+        A new simulation that has not been stepped.
+    """
+    reset_global_state()
+
+    return Neighborly(
+        NeighborlyConfig.parse_obj(
+            {
+                "seed": seed,
+                "verbose": False,
+                "time_increment": "1mo",
+                "relationship_schema": {
+                    "components": {
+                        "Friendship": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "Romance": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "InteractionScore": {
+                            "min_value": -5,
+                            "max_value": 5,
+                        },
+                        "Respect": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "Favors": {"favors": 0},
+                    }
+                },
+                "plugins": [
+                    "neighborly.plugins.defaults.create_town",
+                    "neighborly.plugins.defaults.characters",
+                    "neighborly.plugins.defaults.residences",
+                    "neighborly.plugins.defaults.social_rules",
+                    "neighborly.plugins.defaults.location_bias_rules",
+                    "neighborly.plugins.defaults.resident_spawning",
+                    "neighborly.plugins.defaults.names",
+                    "speakeasy.plugin",
+                ],
+                "settings": {"print_negotiations": False, **(settings or {})},
+            }
+        )
+    )
+
+
+def build_world(
+    population: int,
+    seed: int = 1337,
+    warmup_months: int = 3,
+    settings: Optional[Dict[str, Any]] = None,
+) -> Neighborly:
+    """Create a simulation with a given number of active characters.
+
+    The town is generated normally, topped up with young adult characters until it
+    reaches the requested population, and then simulated for a few months so that
+    businesses, jobs, relationships, and inventories exist.
+
+    Parameters
+    ----------
+    population
+        The minimum number of active characters to spawn.
+    seed
+        The seed for the simulation's random number generator.
+    warmup_months
+        The number of months to simulate after spawning characters.
+    settings
+        Additional simulation settings.
+
+    Returns
+    -------
+    Neighborly
+        The warmed up simulation.
+    """
+    sim = create_simulation(seed, settings)
+
+    # The first step creates the settlement and the first families
+    sim.step()
+
+    world = sim.world
+    rng = world.get_resource(random.Random)
+    settlement = world.get_gameobject(world.get_component(Settlement)[0][0])
+    spawn_table = settlement.get_component(CharacterSpawnTable)
+
+    active_characters = len(world.get_components((GameCharacter, Active)))
+    while active_characters < population:
+        character = spawn_character(
+            world,
+            spawn_table.choose_random(rng),
+            life_stage=LifeStageType.YoungAdult,
+        )
+        add_character_to_settlement(character, settlement)
+        active_characters += 1
+
+    for _ in range(warmup_months):
+        sim.step()
+
+    return sim
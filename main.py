@@ -1,48 +1,54 @@
 import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
 from neighborly import Neighborly, NeighborlyConfig
-from neighborly.exporter import export_to_json
-
-sim = Neighborly(
-    NeighborlyConfig.parse_obj(
-        {
-            "time_increment": "1mo",
-            "years_to_simulate": 10,
-            "relationship_schema": {
-                "components": {
-                    "Friendship": {
-                        "min_value": -100,
-                        "max_value": 100,
-                    },
-                    "Romance": {
-                        "min_value": -100,
-                        "max_value": 100,
-                    },
-                    "InteractionScore": {
-                        "min_value": -5,
-                        "max_value": 5,
-                    },
-                    "Respect": {
-                        "min_value": -100,
-                        "max_value": 100,
-                    },
-                    "Favors": {
-                        "favors": 0
-                    }
-                }
+from neighborly.core.time import SimDateTime, TimeDelta
+
+from speakeasy.batch import run_seeds
+from speakeasy.checkpoint import Checkpointer, resume_simulation
+from speakeasy.exporter import EXPORT_FORMATS, export_simulation
+from speakeasy.negotiation.scheduler import NegotiationBatch
+
+CONFIG: Dict[str, Any] = {
+    "time_increment": "1mo",
+    "years_to_simulate": 10,
+    "relationship_schema": {
+        "components": {
+            "Friendship": {
+                "min_value": -100,
+                "max_value": 100,
+            },
+            "Romance": {
+                "min_value": -100,
+                "max_value": 100,
             },
-            "plugins": [
-                "neighborly.plugins.defaults.names",
-                "neighborly.plugins.defaults.characters",
-                "neighborly.plugins.defaults.businesses",
-                "neighborly.plugins.defaults.residences",
-                "neighborly.plugins.defaults.ai",
-                "neighborly.plugins.defaults.location_bias_rules",
-                "neighborly.plugins.defaults.create_town",
-                "speakeasy.plugin"
-            ]
+            "InteractionScore": {
+                "min_value": -5,
+                "max_value": 5,
+            },
+            "Respect": {
+                "min_value": -100,
+                "max_value": 100,
+            },
+            "Favors": {
+                "favors": 0
+            }
         }
-    )
-)
+    },
+    "plugins": [
+        "neighborly.plugins.defaults.names",
+        "neighborly.plugins.defaults.characters",
+        "neighborly.plugins.defaults.businesses",
+        "neighborly.plugins.defaults.residences",
+        "neighborly.plugins.defaults.ai",
+        "neighborly.plugins.defaults.location_bias_rules",
+        "neighborly.plugins.defaults.create_town",
+        "speakeasy.plugin"
+    ]
+}
 
 def get_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser("Runs the Speakeasy simulation")
@@ -56,22 +62,134 @@ def get_args() -> argparse.Namespace:
         help="Disable creating an output file with the simulation's final state",
     )
 
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="json",
+        help=(
+            "format of the output (ndjson writes one record per line, columnar "
+            "writes a directory of typed NumPy columns)"
+        ),
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        help="directory to periodically write checkpoints to",
+    )
+
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=12,
+        help="simulated months between checkpoints (default: 12)",
+    )
+
+    parser.add_argument(
+        "--resume",
+        metavar="CHECKPOINT_DIR",
+        help="continue the run saved in a checkpoint directory",
+    )
+
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        nargs="+",
+        help="run one simulation per seed in parallel (batch mode)",
+    )
+
+    parser.add_argument(
+        "--num-seeds",
+        type=int,
+        help="run this many consecutive seeds starting at --seed-start (batch mode)",
+    )
+
+    parser.add_argument(
+        "--seed-start", type=int, default=0, help="first seed used with --num-seeds"
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="number of worker processes in batch mode (defaults to the CPU count)",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="directory to write each simulation's final state to in batch mode",
+    )
+
+    parser.add_argument(
+        "--summary",
+        help="path to write batch summary statistics (defaults to stdout)",
+    )
+
     return parser.parse_args()
 
+def get_batch_seeds(args: argparse.Namespace) -> List[int]:
+    if args.seeds:
+        return args.seeds
+
+    if args.num_seeds:
+        return list(range(args.seed_start, args.seed_start + args.num_seeds))
+
+    return []
+
+def run_batch(args: argparse.Namespace, seeds: List[int]) -> None:
+    if not args.no_emit:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    report = run_seeds(
+        {**CONFIG, "verbose": False},
+        seeds,
+        workers=args.workers,
+        output_dir=None if args.no_emit else args.output_dir,
+        export_format=args.format,
+    )
+
+    data = json.dumps(report, indent=2)
+
+    if args.summary:
+        with open(args.summary, "w") as f:
+            f.write(data)
+    else:
+        sys.stdout.write(data + "\n")
+
 def main() -> None:
 
     args = get_args()
 
-    sim.run_for(sim.config.years_to_simulate)
+    if seeds := get_batch_seeds(args):
+        run_batch(args, seeds)
+        return
+
+    if args.resume:
+        sim, checkpointer, stop_date = resume_simulation(args.resume)
+        checkpointer.run_until(sim, stop_date)
+    else:
+        sim = Neighborly(NeighborlyConfig.parse_obj(CONFIG))
+
+        if args.checkpoint_dir:
+            stop_date = sim.world.get_resource(SimDateTime).copy() + TimeDelta(
+                years=sim.config.years_to_simulate
+            )
+            checkpointer = Checkpointer(args.checkpoint_dir, args.checkpoint_interval)
+            checkpointer.run_until(sim, stop_date)
+        else:
+            sim.run_for(sim.config.years_to_simulate)
+
+    if negotiation_batch := sim.world.try_resource(NegotiationBatch):
+        negotiation_batch.shutdown()
 
     if not args.no_emit:
         output_path = (
-            args.output if args.output else f"speakeasy_{sim.config.seed}.json"
+            args.output
+            if args.output
+            else f"speakeasy_{sim.config.seed}.{args.format}"
         )
 
-        with open(output_path, "w") as f:
-            data = export_to_json(sim)
-            f.write(data)
+        export_simulation(sim, output_path, args.format)
 
 if __name__ == "__main__":
     main()
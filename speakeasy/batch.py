@@ -0,0 +1,255 @@
+"""Run many independent Speakeasy simulations in parallel.
+
+Each seed is simulated in a worker process from a process pool. Workers write the
+exported simulation themselves and only send a small summary back to the parent
+process, so throughput scales with the number of cores.
+"""
+
+import collections
+import concurrent.futures
+import os
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from neighborly import Neighborly, NeighborlyConfig
+from neighborly.components import GameCharacter
+from neighborly.core.ecs import Active, GameObject
+from neighborly.core.life_event import AllEvents, LifeEvent
+from neighborly.core.location_bias import LocationBiasRules
+from neighborly.core.relationship import SocialRules
+
+import speakeasy.social_rules
+from speakeasy.components import Inventory
+from speakeasy.exporter import export_simulation
+from speakeasy.instrumentation import uninstrument_all
+from speakeasy.negotiation.scheduler import NegotiationBatch
+from speakeasy.resources import Market
+
+# Rules registered when modules are imported (like speakeasy.social_rules). Plugins
+# register more rules each time a simulation is set up, so the registries are reset
+# to these before creating a new simulation.
+_BASE_SOCIAL_RULES = list(SocialRules._rules)  # type: ignore
+_BASE_LOCATION_BIAS_RULES = list(LocationBiasRules._rules)  # type: ignore
+
+
+def reset_global_state() -> None:
+    """Clear simulation state that Neighborly stores at the class level.
+
+    Event listeners registered using GameObject.on() and AllEvents.on_event(), social
+    rules, and location bias rules are shared by every simulation in a process.
+    Plugin setup registers them again for each new simulation, so they need to be
+    reset before creating another simulation in the same process. Event IDs are also
+    reset so that a seed produces the same output regardless of which worker runs it,
+    and instrumented life event types are restored.
+    """
+    AllEvents.clear_event_listeners()
+    GameObject.clear_event_listeners()
+    SocialRules._rules[:] = _BASE_SOCIAL_RULES  # type: ignore
+    LocationBiasRules._rules[:] = _BASE_LOCATION_BIAS_RULES  # type: ignore
+    LifeEvent._next_event_id = 0  # type: ignore
+    uninstrument_all()
+
+
+def create_simulation(config: Dict[str, Any], seed: int) -> Neighborly:
+    """Create a new simulation for a seed.
+
+    Parameters
+    ----------
+    config
+        Neighborly configuration data (the seed is overwritten).
+    seed
+        The seed for the simulation's random number generator.
+
+    Returns
+    -------
+    Neighborly
+        A new simulation with all plugins set up.
+    """
+    reset_global_state()
+    return Neighborly(NeighborlyConfig.parse_obj({**config, "seed": seed}))
+
+
+def summarize_simulation(sim: Neighborly, elapsed: float) -> Dict[str, Any]:
+    """Collect summary statistics about a finished simulation.
+
+    Parameters
+    ----------
+    sim
+        The simulation to summarize.
+    elapsed
+        The time spent running the simulation (in seconds).
+
+    Returns
+    -------
+    Dict[str, Any]
+        JSON-serializable summary statistics.
+    """
+    world = sim.world
+
+    event_counts = collections.Counter(
+        type(event).__name__ for event in world.get_resource(AllEvents)
+    )
+
+    market = world.try_resource(Market)
+
+    return {
+        "seed": sim.config.seed,
+        "elapsed_s": elapsed,
+        "date": sim.date.to_iso_str(),
+        "active_characters": len(world.get_components((GameCharacter, Active))),
+        "open_businesses": len(market.get_businesses()) if market else 0,
+        "total_items": sum(
+            sum(inventory.items.values())
+            for _, (inventory, _) in world.get_components((Inventory, Active))
+        ),
+        "total_events": sum(event_counts.values()),
+        "events": dict(sorted(event_counts.items())),
+    }
+
+
+def run_seed(
+    config: Dict[str, Any],
+    seed: int,
+    output_dir: Optional[str] = None,
+    export_format: str = "json",
+) -> Dict[str, Any]:
+    """Run a single simulation to completion.
+
+    Parameters
+    ----------
+    config
+        Neighborly configuration data.
+    seed
+        The seed for the simulation's random number generator.
+    output_dir
+        The directory to write speakeasy_<seed>.<export_format> to (not written if
+        None).
+    export_format
+        The format of the exported simulation ("json", "ndjson", or "columnar").
+
+    Returns
+    -------
+    Dict[str, Any]
+        Summary statistics about the simulation.
+    """
+    sim = create_simulation(config, seed)
+
+    start = time.perf_counter()
+    sim.run_for(sim.config.years_to_simulate)
+    elapsed = time.perf_counter() - start
+
+    if negotiation_batch := sim.world.try_resource(NegotiationBatch):
+        negotiation_batch.shutdown()
+
+    if output_dir is not None:
+        output_path = os.path.join(
+            output_dir, f"speakeasy_{sim.config.seed}.{export_format}"
+        )
+        export_simulation(sim, output_path, export_format)
+
+    summary = summarize_simulation(sim, elapsed)
+    # Neighborly stores seeds as strings, report the seed that was requested
+    summary["seed"] = seed
+    return summary
+
+
+def aggregate_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute statistics across the summaries of several simulations.
+
+    Parameters
+    ----------
+    summaries
+        Summaries returned by run_seed().
+
+    Returns
+    -------
+    Dict[str, Any]
+        The mean, standard deviation, minimum, and maximum of each metric. Event
+        types missing from a run are counted as zero.
+    """
+    metrics: Dict[str, List[float]] = collections.defaultdict(list)
+
+    event_types = sorted({name for s in summaries for name in s["events"]})
+
+    for summary in summaries:
+        for metric in (
+            "elapsed_s",
+            "active_characters",
+            "open_businesses",
+            "total_items",
+            "total_events",
+        ):
+            metrics[metric].append(summary[metric])
+        for event_type in event_types:
+            metrics[f"events.{event_type}"].append(
+                summary["events"].get(event_type, 0)
+            )
+
+    return {
+        metric: {
+            "mean": statistics.mean(values),
+            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+            "min": min(values),
+            "max": max(values),
+        }
+        for metric, values in metrics.items()
+    }
+
+
+def run_seeds(
+    config: Dict[str, Any],
+    seeds: Iterable[int],
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    export_format: str = "json",
+) -> Dict[str, Any]:
+    """Run a simulation for each seed using a pool of worker processes.
+
+    Parameters
+    ----------
+    config
+        Neighborly configuration data shared by all simulations.
+    seeds
+        The seeds to simulate.
+    workers
+        The number of worker processes (defaults to the number of CPUs). When set
+        to 1, the simulations run in the current process.
+    output_dir
+        The directory to write each simulation's JSON export to (not written if
+        None).
+    export_format
+        The format of the exported simulations ("json", "ndjson", or "columnar").
+
+    Returns
+    -------
+    Dict[str, Any]
+        The summary of each run (in the same order as seeds) and aggregate
+        statistics.
+    """
+    seeds = list(seeds)
+    start = time.perf_counter()
+
+    if workers == 1:
+        summaries = [
+            run_seed(config, seed, output_dir, export_format) for seed in seeds
+        ]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            summaries = list(
+                executor.map(
+                    run_seed,
+                    [config] * len(seeds),
+                    seeds,
+                    [output_dir] * len(seeds),
+                    [export_format] * len(seeds),
+                )
+            )
+
+    return {
+        "seeds": seeds,
+        "workers": workers or os.cpu_count(),
+        "wall_time_s": time.perf_counter() - start,
+        "statistics": aggregate_summaries(summaries) if summaries else {},
+        "runs": summaries,
+    }
@@ -0,0 +1,224 @@
+"""Periodic checkpoints that let long simulations resume after a crash.
+
+A Checkpointer steps a simulation and, every few simulated months, replaces
+checkpoint.pkl in its directory with a full snapshot of the simulation: the world, the
+states of the random number generators, and the next life event ID.
+
+Checkpoints are full snapshots rather than changes since the previous checkpoint.
+Resuming deterministically requires all of Neighborly's state (relationships,
+businesses, event history, system timers, etc.), not just Speakeasy's components, and
+Neighborly does not track which of it changed. Only the latest snapshot is kept, and it
+is written to a temporary file first, so a crash while checkpointing leaves the
+previous snapshot intact.
+
+resume_simulation() restores the latest snapshot, and stepping the resumed simulation
+produces the same results as a run that was never interrupted. The only difference is
+that sets of types, like the ones in Neighborly's StatusManager, may iterate in a
+different order after being unpickled.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import pickle
+import random
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+from neighborly import Neighborly
+from neighborly.core.ecs import SystemGroup, World
+from neighborly.core.life_event import LifeEvent
+from neighborly.core.time import SimDateTime, TimeDelta
+from neighborly.core.tracery import Tracery
+
+from speakeasy.batch import reset_global_state
+
+SNAPSHOT_FILE = "checkpoint.pkl"
+
+
+def _constant(value: Any) -> Any:
+    return value
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickles zero-argument lambdas that return constants.
+
+    Neighborly's Settlement uses lambdas like this as default factories, and the
+    standard pickler can not serialize lambdas.
+    """
+
+    def reducer_override(self, obj: Any) -> Any:
+        if (
+            isinstance(obj, types.FunctionType)
+            and obj.__name__ == "<lambda>"
+            and obj.__code__.co_argcount == 0
+            and obj.__closure__ is None
+        ):
+            value = obj()
+            if value is None or isinstance(value, (bool, int, float, str)):
+                return functools.partial, (_constant, value)
+        return NotImplemented
+
+
+def _bind_systems(world: World) -> None:
+    """Point every system's class-level world reference at a world."""
+    stack: List[Any] = [world._systems]  # type: ignore
+    while stack:
+        system = stack.pop()
+        type(system).world = world
+        if isinstance(system, SystemGroup):
+            stack.extend(system.iter_children())
+
+
+def _get_rng_state(sim: Neighborly) -> Dict[str, Any]:
+    """Return the states of the random number generators used during a simulation.
+
+    Besides the world's RNG, the global RNG and the RNG of Neighborly's (class-level)
+    Tracery grammar are used while stepping.
+    """
+    return {
+        "world": sim.world.get_resource(random.Random).getstate(),
+        "global": random.getstate(),
+        "tracery": Tracery._grammar.rng.getstate(),  # type: ignore
+    }
+
+
+class Checkpointer:
+    """Runs a simulation, writing checkpoints at a fixed interval of simulated time."""
+
+    __slots__ = "directory", "interval", "checkpoint_count", "_last_date"
+
+    directory: str
+    """The directory that checkpoints are written to."""
+
+    interval: int
+    """The number of simulated months between checkpoints."""
+
+    checkpoint_count: int
+    """The number of checkpoints written so far."""
+
+    _last_date: Optional[SimDateTime]
+    """The date of the last checkpoint (or when the checkpointer started running)."""
+
+    def __init__(self, directory: str, interval: int = 12) -> None:
+        """
+        Parameters
+        ----------
+        directory
+            The directory to write checkpoints to (created if it does not exist).
+        interval
+            The number of simulated months between checkpoints.
+        """
+        if interval <= 0:
+            raise ValueError(
+                f"Checkpoint interval must be positive, but was given {interval}"
+            )
+
+        self.directory = directory
+        self.interval = interval
+        self.checkpoint_count = 0
+        self._last_date = None
+
+    def run_until(self, sim: Neighborly, stop_date: SimDateTime) -> None:
+        """Step a simulation until a date, writing checkpoints along the way.
+
+        A final checkpoint is written when the stop date is reached.
+
+        Parameters
+        ----------
+        sim
+            The simulation to run.
+        stop_date
+            The date to stop stepping the simulation.
+        """
+        current_date = sim.world.get_resource(SimDateTime)
+
+        if self._last_date is None:
+            self._last_date = current_date.copy()
+
+        while stop_date > current_date:
+            sim.step()
+            if current_date >= self._last_date + TimeDelta(months=self.interval):
+                self.save(sim, stop_date)
+
+        if current_date != self._last_date:
+            self.save(sim, stop_date)
+
+    def save(self, sim: Neighborly, stop_date: SimDateTime) -> None:
+        """Write a checkpoint for the current state of a simulation.
+
+        Parameters
+        ----------
+        sim
+            The simulation to checkpoint.
+        stop_date
+            The date that a resumed simulation should run until.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.checkpoint_count += 1
+        self._last_date = sim.world.get_resource(SimDateTime).copy()
+
+        rng_state = _get_rng_state(sim)
+
+        snapshot = {
+            "world": sim.world,
+            "config": sim.config,
+            "stop_date": stop_date,
+            "next_event_id": LifeEvent._next_event_id,  # type: ignore
+            "global_rng": rng_state["global"],
+            "tracery_rng": rng_state["tracery"],
+            "checkpointer": self,
+        }
+
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(snapshot_path + ".tmp", "wb") as f:
+            _SnapshotPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(snapshot)
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {attr: getattr(self, attr) for attr in Checkpointer.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
+
+def resume_simulation(
+    directory: str,
+) -> Tuple[Neighborly, Checkpointer, SimDateTime]:
+    """Restore a simulation from the latest checkpoint in a directory.
+
+    Plugins are set up again using the checkpointed config so that event listeners and
+    social rules are registered. Then, the new simulation's world is replaced with the
+    checkpointed one.
+
+    Parameters
+    ----------
+    directory
+        A directory that a Checkpointer wrote to.
+
+    Returns
+    -------
+    Tuple[Neighborly, Checkpointer, SimDateTime]
+        The restored simulation, a checkpointer that continues writing to the
+        directory, and the date the original run was supposed to stop.
+    """
+    with open(os.path.join(directory, SNAPSHOT_FILE), "rb") as f:
+        snapshot = pickle.load(f)
+
+    reset_global_state()
+    sim = Neighborly(snapshot["config"])
+
+    sim.world = snapshot["world"]
+    _bind_systems(sim.world)
+    LifeEvent._next_event_id = snapshot["next_event_id"]  # type: ignore
+    random.setstate(snapshot["global_rng"])
+    Tracery._grammar.rng.setstate(snapshot["tracery_rng"])  # type: ignore
+
+    checkpointer: Checkpointer = snapshot["checkpointer"]
+    checkpointer.directory = directory
+
+    return sim, checkpointer, snapshot["stop_date"]
+
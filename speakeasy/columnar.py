@@ -0,0 +1,280 @@
+"""Binary columnar export of Speakeasy-specific tables for analysis.
+
+Each table is written to its own directory as one .npy file per column. Columns have
+fixed NumPy dtypes, so loading a table memory-maps the files instead of parsing them.
+Strings (item names, event types, role names, etc.) are dictionary encoded. Columns
+store integer codes and schema.json stores the lists of strings they index into.
+
+Tables
+------
+inventories
+    owner, item, quantity
+knowledge
+    character, business, item, relation (a code into "knowledge_relations")
+relationships
+    relationship, owner, target, respect, favors
+events
+    event_id, event_type, timestamp (simulated hours since 0001-01-01)
+event_roles
+    event_id, role, gameobject
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from array import array
+from typing import Any, Dict, List
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from neighborly import Neighborly
+from neighborly.core.life_event import AllEvents
+from neighborly.core.relationship import Relationship
+
+from speakeasy.components import Favors, Inventory, Knowledge, Respect
+
+FORMAT_NAME = "speakeasy-columnar"
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+
+KNOWLEDGE_RELATIONS = ("produces", "buys")
+
+_DTYPES: Dict[str, str] = {"q": "<i8", "i": "<i4", "b": "i1"}
+
+_TABLES: Dict[str, Dict[str, str]] = {
+    "inventories": {"owner": "q", "item": "i", "quantity": "i"},
+    "knowledge": {"character": "q", "business": "q", "item": "i", "relation": "b"},
+    "relationships": {
+        "relationship": "q",
+        "owner": "q",
+        "target": "q",
+        "respect": "i",
+        "favors": "i",
+    },
+    "events": {"event_id": "q", "event_type": "i", "timestamp": "q"},
+    "event_roles": {"event_id": "q", "role": "i", "gameobject": "q"},
+}
+"""Table names mapped to column names mapped to array typecodes."""
+
+_ENCODED_COLUMNS: Dict[str, Dict[str, str]] = {
+    "inventories": {"item": "items"},
+    "knowledge": {"item": "items", "relation": "knowledge_relations"},
+    "events": {"event_type": "event_types"},
+    "event_roles": {"role": "roles"},
+}
+"""Table names mapped to dictionary-encoded column names and their dictionaries."""
+
+
+class _StringDictionary:
+    """Assigns consecutive integer codes to strings in the order they are seen."""
+
+    __slots__ = "codes", "values"
+
+    codes: Dict[str, int]
+    values: List[str]
+
+    def __init__(self) -> None:
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def export_to_columnar(sim: Neighborly, path: str) -> None:
+    """Write a simulation's Speakeasy tables to a directory of typed .npy columns.
+
+    Parameters
+    ----------
+    sim
+        The simulation to export.
+    path
+        The directory to write to (created if it does not exist).
+    """
+    world = sim.world
+
+    columns: Dict[str, Dict[str, array[int]]] = {
+        table: {column: array(typecode) for column, typecode in schema.items()}
+        for table, schema in _TABLES.items()
+    }
+
+    items = _StringDictionary()
+    event_types = _StringDictionary()
+    roles = _StringDictionary()
+
+    inventories = columns["inventories"]
+    for uid, inventory in world.get_component(Inventory):
+        for item, quantity in inventory.items.items():
+            inventories["owner"].append(uid)
+            inventories["item"].append(items.encode(item))
+            inventories["quantity"].append(quantity)
+
+    knowledge = columns["knowledge"]
+    for uid, character_knowledge in world.get_component(Knowledge):
+        for relation, entries in enumerate(
+            (character_knowledge.produces, character_knowledge.buys)
+        ):
+            for item, businesses in entries.items():
+                item_code = items.encode(item)
+                for business in businesses:
+                    knowledge["character"].append(uid)
+                    knowledge["business"].append(business)
+                    knowledge["item"].append(item_code)
+                    knowledge["relation"].append(relation)
+
+    relationships = columns["relationships"]
+    for uid, relationship in world.get_component(Relationship):
+        gameobject = world.get_gameobject(uid)
+        respect = gameobject.try_component(Respect)
+        favors = gameobject.try_component(Favors)
+        relationships["relationship"].append(uid)
+        relationships["owner"].append(relationship.owner)
+        relationships["target"].append(relationship.target)
+        relationships["respect"].append(
+            respect.get_value() if respect is not None else 0
+        )
+        relationships["favors"].append(favors.favors if favors is not None else 0)
+
+    events = columns["events"]
+    event_roles = columns["event_roles"]
+    for event in world.get_resource(AllEvents):
+        event_id = event.get_id()
+        events["event_id"].append(event_id)
+        events["event_type"].append(event_types.encode(type(event).__name__))
+        events["timestamp"].append(event.get_timestamp().to_hours())
+        for role in event.iter_roles():
+            event_roles["event_id"].append(event_id)
+            event_roles["role"].append(roles.encode(role.name))
+            event_roles["gameobject"].append(role.gameobject.uid)
+
+    schema: Dict[str, Any] = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "seed": sim.config.seed,
+        "date": sim.date.to_iso_str(),
+        "tables": {},
+        "dictionaries": {
+            "items": items.values,
+            "event_types": event_types.values,
+            "roles": roles.values,
+            "knowledge_relations": list(KNOWLEDGE_RELATIONS),
+        },
+    }
+
+    for table, table_columns in columns.items():
+        os.makedirs(os.path.join(path, table), exist_ok=True)
+
+        schema["tables"][table] = {
+            "rows": len(next(iter(table_columns.values()))),
+            "columns": {},
+        }
+
+        for column, values in table_columns.items():
+            dtype = _DTYPES[values.typecode]
+            np.save(
+                os.path.join(path, table, f"{column}.npy"),
+                np.frombuffer(values, dtype=values.typecode).astype(dtype, copy=False),
+            )
+            schema["tables"][table]["columns"][column] = dtype
+
+    with open(os.path.join(path, SCHEMA_FILE), "w") as f:
+        json.dump(schema, f, indent=2)
+
+
+class ColumnarExport:
+    """A columnar export loaded as memory-mapped NumPy arrays."""
+
+    __slots__ = "path", "schema", "_mmap"
+
+    path: str
+    """The directory of the export."""
+
+    schema: Dict[str, Any]
+    """The contents of the export's schema.json file."""
+
+    _mmap: bool
+    """Should columns be memory-mapped instead of read into memory."""
+
+    def __init__(self, path: str, mmap: bool = True) -> None:
+        """
+        Parameters
+        ----------
+        path
+            The directory that export_to_columnar() wrote to.
+        mmap
+            Memory-map columns instead of reading them into memory.
+        """
+        with open(os.path.join(path, SCHEMA_FILE)) as f:
+            schema = json.load(f)
+
+        if schema.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} does not contain a Speakeasy columnar export.")
+
+        if schema["version"] > FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported columnar export version {schema['version']} "
+                f"(expected {FORMAT_VERSION} or lower)."
+            )
+
+        self.path = path
+        self.schema = schema
+        self._mmap = mmap
+
+    def get_dictionary(self, name: str) -> List[str]:
+        """Return the strings that a dictionary-encoded column's codes index into."""
+        return self.schema["dictionaries"][name]
+
+    def get_table(self, table: str) -> Dict[str, npt.NDArray[Any]]:
+        """Load the columns of a table.
+
+        Parameters
+        ----------
+        table
+            The name of the table.
+
+        Returns
+        -------
+        Dict[str, npt.NDArray[Any]]
+            Column names mapped to (read-only if memory-mapped) arrays.
+        """
+        return {
+            column: np.load(
+                os.path.join(self.path, table, f"{column}.npy"),
+                mmap_mode="r" if self._mmap else None,
+            )
+            for column in self.schema["tables"][table]["columns"]
+        }
+
+    def to_dataframe(self, table: str, decode: bool = True) -> pd.DataFrame:
+        """Load a table as a pandas DataFrame.
+
+        Parameters
+        ----------
+        table
+            The name of the table.
+        decode
+            Convert dictionary-encoded columns to pandas Categoricals. The codes are
+            used as-is, so no strings are created per row.
+
+        Returns
+        -------
+        pd.DataFrame
+            The table.
+        """
+        data: Dict[str, Any] = self.get_table(table)
+
+        if decode:
+            for column, dictionary in _ENCODED_COLUMNS.get(table, {}).items():
+                data[column] = pd.Categorical.from_codes(
+                    data[column], categories=self.get_dictionary(dictionary)
+                )
+
+        return pd.DataFrame(data, copy=False)
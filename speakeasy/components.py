@@ -1,30 +1,86 @@
 from __future__ import annotations
 
+import math
+from array import array
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
-
+from itertools import repeat
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import numpy.typing as npt
+from neighborly.components.character import Virtues
 from neighborly.core.ecs import Component, ISerializable
-from neighborly.core.relationship import RelationshipFacet, RelationshipStatus
+from neighborly.core.relationship import (
+    IncrementCounter,
+    Relationship,
+    RelationshipFacet,
+    RelationshipStatus,
+)
 from ordered_set import OrderedSet
 
+from speakeasy.resources import ItemRegistry, RespectIndex
+
+VIRTUE_SIGNATURE_SIZE = 3
+"""The number of high and low virtues in a VirtueSignature (as in Virtues)."""
+
+MAX_VIRTUE_DISTANCE = 509.9019513592785
+"""The maximum distance between virtue arrays used by Virtues.compatibility()."""
+
 
 class Inventory(Component, ISerializable):
-    """Tracks the items that the GameObject possesses."""
+    """Tracks the items that the GameObject possesses.
+
+    Quantities are stored in a flat integer array indexed by the item IDs assigned by
+    an ItemRegistry. Items with a quantity of zero are not considered to be in the
+    inventory.
+    """
+
+    __slots__ = "registry", "_slots", "_size", "items"
 
-    __slots__ = "items"
+    registry: ItemRegistry
+    """Assigns the IDs used to index item slots."""
 
-    items: Dict[str, int]
+    _slots: array[int]
+    """Item quantities indexed by item ID."""
+
+    _size: int
+    """The number of items with a non-zero quantity."""
+
+    items: InventoryItems
     """Item names mapped to quantity counts."""
 
-    def __init__(self, items: Optional[Dict[str, int]] = None) -> None:
+    def __init__(
+        self,
+        items: Optional[Dict[str, int]] = None,
+        registry: Optional[ItemRegistry] = None,
+    ) -> None:
         """
         Parameters
         ----------
         items
             The starting set of items in the inventory
+        registry
+            The registry that assigns item IDs. Inventories created by the simulation
+            share the world's registry. A new registry is created if none is given.
         """
         super().__init__()
-        self.items: Dict[str, int] = {**items} if items is not None else {}
+        self.registry = registry if registry is not None else ItemRegistry()
+        self._slots = array("i")
+        self._size = 0
+        self.items = InventoryItems(self)
+
+        if items is not None:
+            for item, quantity in items.items():
+                self.set_quantity(item, quantity)
 
     def add_item(self, item: str, quantity: int) -> None:
         """Add an item to the inventory.
@@ -36,9 +92,7 @@ class Inventory(Component, ISerializable):
         quantity
             The amount to add to the inventory.
         """
-        if item not in self.items:
-            self.items[item] = 0
-        self.items[item] += quantity
+        self.set_quantity(item, self.get_quantity(item) + quantity)
 
     def remove_item(self, item: str, quantity: int) -> None:
         """Add an item to the inventory.
@@ -50,18 +104,18 @@ class Inventory(Component, ISerializable):
         quantity
             The quantity of the item to remove.
         """
-        if item not in self.items:
+        current_quantity = self.get_quantity(item)
+
+        if current_quantity == 0:
             raise KeyError(f"Cannot find item, {item}, in inventory")
 
-        if self.items[item] < quantity:
+        if current_quantity < quantity:
             raise ValueError(
                 f"Quantity ({quantity}) too high. "
-                f"Inventory has {self.items[item]} {item}(s)"
+                f"Inventory has {current_quantity} {item}(s)"
             )
 
-        self.items[item] -= quantity
-        if self.items[item] == 0:
-            del self.items[item]
+        self.set_quantity(item, current_quantity - quantity)
 
     def get_quantity(self, item: str) -> int:
         """Returns the quantity of an item in the inventory.
@@ -71,16 +125,85 @@ class Inventory(Component, ISerializable):
         item
             The name of an item
         """
-        return self.items.get(item, 0)
+        item_id = self.registry.try_id(item)
+        if item_id is None or item_id >= len(self._slots):
+            return 0
+        return self._slots[item_id]
+
+    def set_quantity(self, item: str, quantity: int) -> None:
+        """Set the quantity of an item in the inventory.
+
+        Parameters
+        ----------
+        item
+            The name of an item.
+        quantity
+            The new quantity. Setting it to zero removes the item.
+        """
+        item_id = self.registry.get_id(item)
+
+        if item_id >= len(self._slots):
+            if quantity == 0:
+                return
+            self._slots.extend(repeat(0, item_id + 1 - len(self._slots)))
+
+        self._size += (quantity != 0) - (self._slots[item_id] != 0)
+        self._slots[item_id] = quantity
+
+    def is_empty(self) -> bool:
+        """Check if the inventory has no items."""
+        return self._size == 0
+
+    def get_items(self) -> List[str]:
+        """Return the names of all items in the inventory."""
+        get_name = self.registry.get_name
+        return [get_name(i) for i, quantity in enumerate(self._slots) if quantity]
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"items": {**self.items}}
+        return {"items": dict(self.items)}
 
     def __str__(self) -> str:
-        return self.items.__str__()
+        return dict(self.items).__str__()
+
+    def __repr__(self) -> str:
+        return f"Inventory({dict(self.items).__repr__()})"
+
+
+class InventoryItems(MutableMapping[str, int]):
+    """A dictionary-like view of the items in an Inventory."""
+
+    __slots__ = "_inventory"
+
+    _inventory: Inventory
+
+    def __init__(self, inventory: Inventory) -> None:
+        self._inventory = inventory
+
+    def __getitem__(self, item: str) -> int:
+        quantity = self._inventory.get_quantity(item)
+        if quantity == 0:
+            raise KeyError(item)
+        return quantity
+
+    def __setitem__(self, item: str, quantity: int) -> None:
+        self._inventory.set_quantity(item, quantity)
+
+    def __delitem__(self, item: str) -> None:
+        if self._inventory.get_quantity(item) == 0:
+            raise KeyError(item)
+        self._inventory.set_quantity(item, 0)
+
+    def __contains__(self, item: object) -> bool:
+        return isinstance(item, str) and self._inventory.get_quantity(item) != 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._inventory.get_items())
+
+    def __len__(self) -> int:
+        return self._inventory._size
 
     def __repr__(self) -> str:
-        return f"Inventory({self.items.__repr__()})"
+        return dict(self).__repr__()
 
 
 class OwnedBy(RelationshipStatus, ISerializable):
@@ -255,11 +378,15 @@ class Produces(Component):
 class Knowledge(Component):
     """Tracks knowledge of what businesses produce and buy certain items."""
 
-    __slots__ = ("produces", "buys")
+    __slots__ = ("produces", "buys", "producer_ids")
 
     produces: Dict[str, OrderedSet[int]]
     """Map of item names to a set of IDs of businesses that produce that item."""
 
+    producer_ids: OrderedSet[int]
+    """IDs of all businesses known to produce at least one item (in the order they
+    were learned about)."""
+
     buys: Dict[str, OrderedSet[int]]
     """Map of item names to a set of IDs of businesses that buy that item."""
 
@@ -267,6 +394,7 @@ class Knowledge(Component):
         super().__init__()
         self.produces = {}
         self.buys = {}
+        self.producer_ids = OrderedSet([])
 
     def add_producer(self, producer: int, item: str) -> None:
         """Add knowledge of a business that produces an item.
@@ -281,6 +409,7 @@ class Knowledge(Component):
         if item not in self.produces:
             self.produces[item] = OrderedSet([])
         self.produces[item].add(producer)
+        self.producer_ids.add(producer)
 
     def remove_producer(self, producer: int, item: str) -> None:
         """
@@ -296,6 +425,8 @@ class Knowledge(Component):
         if item not in self.produces:
             return
         self.produces[item].remove(producer)
+        if not any(producer in producers for producers in self.produces.values()):
+            self.producer_ids.discard(producer)
 
     def add_buyer(self, buyer: int, item: str) -> None:
         """
@@ -328,10 +459,8 @@ class Knowledge(Component):
         self.buys[item].remove(buyer)
 
     def known_producers(self) -> List[int]:
-        known_businesses: List[int] = []
-        for producers in self.produces.values():
-            known_businesses.extend(list(producers))
-        return known_businesses
+        """Return the IDs of all businesses known to produce at least one item."""
+        return list(self.producer_ids)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -341,6 +470,143 @@ class Knowledge(Component):
 
 
 class Respect(RelationshipFacet):
-    """Tracks how much a GameObject respects another."""
+    """Tracks how much a GameObject respects another.
+
+    Changes to the value are reported to the world's RespectIndex (if present).
+    """
+
+    def increment(self, value: int) -> None:
+        super().increment(value)
+        self._update_respect_index()
+
+    def set_base(self, value: Tuple[int, int]) -> None:
+        super().set_base(value)
+        self._update_respect_index()
+
+    def set_modifier(self, modifier: Optional[IncrementCounter]) -> None:
+        super().set_modifier(modifier)
+        self._update_respect_index()
+
+    def _update_respect_index(self) -> None:
+        """Report the current value of this facet to the RespectIndex."""
+        if self._gameobject is None:
+            return
+
+        relationship = self._gameobject.try_component(Relationship)
+        respect_index = self._gameobject.world.try_resource(RespectIndex)
+
+        if relationship is None or respect_index is None:
+            return
 
-    pass
+        respect_index.update(
+            relationship.owner, relationship.target, self.get_value()
+        )
+
+
+def _popcount(value: int) -> int:
+    """Count the set bits of an integer."""
+    return bin(value).count("1")
+
+
+class VirtueSignature(Component):
+    """A cached summary of a character's Virtues used by social rules.
+
+    Comparing two characters' virtues normally sorts both virtue arrays and intersects
+    sets of their highest and lowest virtues. A signature stores those virtues as
+    bitmasks, so shared likes and conflicts are popcounts. It also stores the values
+    and norm needed by Virtues.compatibility(). The signature is only recomputed when
+    the values of the Virtues component change.
+    """
+
+    __slots__ = "high", "low", "values", "squared_norm", "norm", "_key"
+
+    high: int
+    """A bitmask of the indices of the character's highest virtues."""
+
+    low: int
+    """A bitmask of the indices of the character's lowest virtues."""
+
+    values: npt.NDArray[np.int64]
+    """A copy of the character's virtue values."""
+
+    squared_norm: int
+    """The sum of the squared virtue values."""
+
+    norm: float
+    """The Euclidean norm of the virtue values."""
+
+    _key: bytes
+    """The raw virtue values that the signature was computed from."""
+
+    def __init__(self, virtues: Virtues) -> None:
+        """
+        Parameters
+        ----------
+        virtues
+            The virtues to summarize.
+        """
+        super().__init__()
+        self._key = b""
+        self.refresh(virtues)
+
+    def refresh(self, virtues: Virtues) -> None:
+        """Recompute the signature if the virtue values have changed.
+
+        Parameters
+        ----------
+        virtues
+            The virtues to summarize.
+        """
+        raw_values: npt.NDArray[np.int32] = virtues._virtues  # type: ignore
+        key = raw_values.tobytes()
+
+        if key == self._key:
+            return
+
+        # The same ordering as Virtues.get_high_values() and get_low_values()
+        order = [int(i) for i in np.argsort(raw_values)]
+
+        self._key = key
+        self.high = sum(1 << i for i in order[-VIRTUE_SIGNATURE_SIZE:])
+        self.low = sum(1 << i for i in order[:VIRTUE_SIGNATURE_SIZE])
+        self.values = raw_values.astype(np.int64)
+        self.squared_norm = int(np.dot(self.values, self.values))
+        self.norm = math.sqrt(self.squared_norm)
+
+    def count_shared_virtues(self, other: VirtueSignature) -> int:
+        """Return the number of high and low virtues shared with another character."""
+        return _popcount(self.high & other.high) + _popcount(self.low & other.low)
+
+    def count_virtue_conflicts(self, other: VirtueSignature) -> int:
+        """Return the number of high virtues that are low virtues of the other."""
+        return _popcount(self.high & other.low) + _popcount(other.high & self.low)
+
+    def compatibility(self, other: VirtueSignature) -> int:
+        """Calculate the same similarity score as Virtues.compatibility().
+
+        Parameters
+        ----------
+        other
+            The signature of the other character.
+
+        Returns
+        -------
+        int
+            Similarity score on the range [-100, 100]
+        """
+        dot = int(np.dot(self.values, other.values))
+
+        norm_product = self.norm * other.norm
+        cosine_similarity = 0.0 if norm_product == 0 else dot / norm_product
+
+        # |a - b|^2 = |a|^2 + |b|^2 - 2(a . b) is exact for integer values
+        distance = math.sqrt(self.squared_norm + other.squared_norm - 2 * dot)
+        distance_similarity = 2.0 * (1.0 - (distance / MAX_VIRTUE_DISTANCE)) - 1.0
+
+        return round(100 * ((cosine_similarity + distance_similarity) / 2.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"high": self.high, "low": self.low}
+
+    def __repr__(self) -> str:
+        return f"VirtueSignature(high={self.high:#x}, low={self.low:#x})"
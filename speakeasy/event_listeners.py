@@ -1,11 +1,29 @@
 import random
 
+from typing import Union
+
 from neighborly import GameObject
-from neighborly.components import LifeStage
-from neighborly.components.character import LifeStageType
-from neighborly.core.ecs import Active
-from neighborly.events import GiveBirthEvent, JoinSettlementEvent, StartJobEvent
-from speakeasy.components import Inventory, Ethnicity, EthnicityValue, Knowledge, Produces
+from neighborly.components import Business, ClosedForBusiness, LifeStage, Virtues
+from neighborly.components.character import Family, LifeStageType
+from neighborly.core.ecs import Active, ComponentAddedEvent, ComponentRemovedEvent
+from neighborly.core.relationship import Relationship
+from neighborly.events import (
+    BusinessClosedEvent,
+    EndJobEvent,
+    GiveBirthEvent,
+    JoinSettlementEvent,
+    StartBusinessEvent,
+    StartJobEvent,
+)
+from speakeasy.components import (
+    Inventory,
+    Ethnicity,
+    EthnicityValue,
+    Knowledge,
+    Produces,
+    VirtueSignature,
+)
+from speakeasy.resources import BusinessAssociations, KinshipIndex, Market
 
 def on_adult_join_settlement(
     gameobject: GameObject, event: JoinSettlementEvent
@@ -37,12 +55,7 @@ def on_birth(gameobject: GameObject, event: GiveBirthEvent) -> None:
         items_given = round(sum(parent_inventory.items.values()) / 2)
         if items_given >= 1:
             for _ in range(rng.randint(1, items_given)):
-                key_options = [
-                    k
-                    for k in parent_inventory.items.keys()
-                    if parent_inventory.get_quantity(k) > 0
-                ]
-                chosen_item = rng.choice(key_options)
+                chosen_item = rng.choice(parent_inventory.get_items())
                 parent_inventory.remove_item(chosen_item, 1)
                 baby_inventory.add_item(chosen_item, 1)
 
@@ -63,7 +76,86 @@ def gain_knowledge_of_employer_business(gameobject: GameObject, event: StartJobE
             for item in event.business.get_component(Produces).requires:
                 knowledge.add_buyer(event.business._id, item)
 
+def invalidate_business_associations_on_job_change(
+    gameobject: GameObject, event: Union[StartJobEvent, EndJobEvent]
+) -> None:
+    if gameobject == event.character:
+        if associations := gameobject.world.try_resource(BusinessAssociations):
+            # Employees are associated through the owner, so they change as well
+            associations.invalidate(event.character.uid)
+            associations.invalidate_business(event.business.uid)
+            for employee in event.business.get_component(Business).get_employees():
+                associations.invalidate(employee)
+
+def invalidate_business_associations_on_close(
+    gameobject: GameObject, event: BusinessClosedEvent
+) -> None:
+    if gameobject == event.business:
+        if associations := gameobject.world.try_resource(BusinessAssociations):
+            associations.invalidate_business(event.business.uid)
+
+def add_business_to_market(gameobject: GameObject, event: StartBusinessEvent) -> None:
+    if gameobject == event.character:
+        if market := gameobject.world.try_resource(Market):
+            if produces := event.business.try_component(Produces):
+                market.add_business(event.business.uid, produces.produces, produces.requires)
+
+def add_spawned_business_to_market(
+    gameobject: GameObject, event: ComponentAddedEvent
+) -> None:
+    #businesses that are spawned directly (instead of started by a character) never
+    #fire a StartBusinessEvent
+    if isinstance(event.component, (Business, Produces)):
+        if market := gameobject.world.try_resource(Market):
+            if gameobject.uid in market or gameobject.has_component(ClosedForBusiness):
+                return
+            business = gameobject.try_component(Business)
+            produces = gameobject.try_component(Produces)
+            if business and produces:
+                market.add_business(gameobject.uid, produces.produces, produces.requires)
+
+def remove_business_from_market(gameobject: GameObject, event: BusinessClosedEvent) -> None:
+    if gameobject == event.business:
+        if market := gameobject.world.try_resource(Market):
+            market.remove_business(event.business.uid)
+
+def add_family_to_kinship_index(
+    gameobject: GameObject, event: ComponentAddedEvent
+) -> None:
+    if isinstance(event.component, Family):
+        if kinship_index := gameobject.world.try_resource(KinshipIndex):
+            relationship = gameobject.get_component(Relationship)
+            kinship_index.add(relationship.owner, relationship.target, gameobject.uid)
+
+
+def remove_family_from_kinship_index(
+    gameobject: GameObject, event: ComponentRemovedEvent
+) -> None:
+    if isinstance(event.component, Family):
+        if kinship_index := gameobject.world.try_resource(KinshipIndex):
+            relationship = gameobject.get_component(Relationship)
+            kinship_index.remove(relationship.owner, relationship.target)
+
+
+def add_virtue_signature(gameobject: GameObject, event: ComponentAddedEvent) -> None:
+    #computed here so that evaluating social rules never adds components
+    if isinstance(event.component, Virtues):
+        if signature := gameobject.try_component(VirtueSignature):
+            signature.refresh(event.component)
+        else:
+            gameobject.add_component(VirtueSignature(event.component))
+
+
 def register_event_listeners():
     GameObject.on(GiveBirthEvent, on_birth)
     GameObject.on(JoinSettlementEvent, on_adult_join_settlement)
     GameObject.on(StartJobEvent, gain_knowledge_of_employer_business)
+    GameObject.on(StartJobEvent, invalidate_business_associations_on_job_change)
+    GameObject.on(EndJobEvent, invalidate_business_associations_on_job_change)
+    GameObject.on(BusinessClosedEvent, invalidate_business_associations_on_close)
+    GameObject.on(StartBusinessEvent, add_business_to_market)
+    GameObject.on(ComponentAddedEvent, add_spawned_business_to_market)
+    GameObject.on(BusinessClosedEvent, remove_business_from_market)
+    GameObject.on(ComponentAddedEvent, add_family_to_kinship_index)
+    GameObject.on(ComponentRemovedEvent, remove_family_from_kinship_index)
+    GameObject.on(ComponentAddedEvent, add_virtue_signature)
@@ -0,0 +1,459 @@
+"""An append-only event log stored in a memory-mapped file.
+
+By default, AllEvents and every character's EventHistory keep every LifeEvent object
+alive for the entire simulation, along with everything those objects reference (for
+example, NegotiateEvent traces). When the "event_log" setting is enabled, the Speakeasy
+plugin replaces the storage of AllEvents with an EventLog and creates EventHistory
+components that only store event IDs.
+
+An EventLog writes a fixed-size record (event ID, event type ID, timestamp, and the IDs
+of role names and GameObjects) for each event to a memory-mapped file. Events are
+materialized when they are read. Materialized events have the same type, ID, timestamp,
+and roles as the original. Other attributes are only kept if their values are scalars
+(like a StartJobEvent's occupation or a TradeEvent's items). Those are interned, since
+most events share a handful of values. Attributes holding other objects (like a
+NegotiateEvent's trace and agreement) are not kept.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    overload,
+)
+
+import numpy as np
+
+from neighborly.core.ecs import World
+from neighborly.core.life_event import AllEvents, LifeEvent
+from neighborly.core.roles import Role, RoleList
+from neighborly.core.time import SimDateTime
+
+MAX_ROLES = 8
+"""The number of roles that fit in a record."""
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("event_id", "<i8"),
+        ("event_type", "<i4"),
+        ("year", "<i4"),
+        ("month", "i1"),
+        ("day", "i1"),
+        ("hour", "i1"),
+        ("role_count", "i1"),
+        ("details", "<i4"),
+        ("roles", "<i4", (MAX_ROLES,)),
+        ("gameobjects", "<i8", (MAX_ROLES,)),
+    ]
+)
+"""The layout of a single event record."""
+
+_OVERFLOW = -1
+"""The role count of events with too many roles for a record (kept in memory)."""
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class EventLog(MutableMapping[int, LifeEvent]):
+    """Event IDs mapped to life events, stored as records in a memory-mapped file.
+
+    The log is append-only. Entries can be added and read, but not removed.
+    """
+
+    __slots__ = (
+        "world",
+        "_file",
+        "_records",
+        "_size",
+        "_index",
+        "_first_id",
+        "_event_types",
+        "_event_type_ids",
+        "_role_names",
+        "_role_name_ids",
+        "_details",
+        "_details_ids",
+        "_overflow",
+        "_waiting",
+    )
+
+    world: World
+    """The world used to look up role GameObjects when events are read."""
+
+    _file: IO[bytes]
+    """The file backing the records."""
+
+    _records: np.memmap
+    """The memory-mapped records (only the first _size are used)."""
+
+    _size: int
+    """The number of records written."""
+
+    _index: array[int]
+    """Event IDs (offset by _first_id) mapped to record indices (-1 if missing)."""
+
+    _first_id: int
+    """The lowest event ID that can be stored in _index."""
+
+    _event_types: List[Type[LifeEvent]]
+    """Event types indexed by their ID."""
+
+    _event_type_ids: Dict[Type[LifeEvent], int]
+    """Event types mapped to their ID."""
+
+    _role_names: List[str]
+    """Role names indexed by their ID."""
+
+    _role_name_ids: Dict[str, int]
+    """Role names mapped to their ID."""
+
+    _details: List[Dict[str, Any]]
+    """Scalar attributes of events indexed by their ID."""
+
+    _details_ids: Dict[Tuple[Tuple[str, Any], ...], int]
+    """Scalar attributes of events mapped to their ID."""
+
+    _overflow: Dict[int, LifeEvent]
+    """Events with more than MAX_ROLES roles mapped to their ID."""
+
+    _waiting: Dict[int, List[EventIdList]]
+    """Event IDs mapped to the EventIdLists holding the event until it is logged."""
+
+    def __init__(
+        self, world: World, path: Optional[str] = None, capacity: int = 1024
+    ) -> None:
+        """
+        Parameters
+        ----------
+        world
+            The world that events' roles belong to.
+        path
+            The file to write records to. An anonymous temporary file is used if
+            None.
+        capacity
+            The initial number of records to allocate space for.
+        """
+        self.world = world
+        self._file = (
+            open(path, "w+b") if path is not None else tempfile.TemporaryFile()
+        )
+        self._size = 0
+        self._index = array("q")
+        self._first_id = -1
+        self._event_types = []
+        self._event_type_ids = {}
+        self._role_names = []
+        self._role_name_ids = {}
+        self._details = []
+        self._details_ids = {}
+        self._overflow = {}
+        self._waiting = {}
+        self._map(max(capacity, 1))
+
+    def _map(self, capacity: int) -> None:
+        """Resize the backing file to hold a number of records and map it."""
+        self._file.truncate(capacity * RECORD_DTYPE.itemsize)
+        self._records = np.memmap(
+            self._file, dtype=RECORD_DTYPE, mode="r+", shape=(capacity,)
+        )
+
+    def _get_record_index(self, event_id: int) -> int:
+        offset = event_id - self._first_id
+        if self._first_id < 0 or offset < 0 or offset >= len(self._index):
+            return -1
+        return self._index[offset]
+
+    def _set_record_index(self, event_id: int, record_index: int) -> None:
+        if self._first_id < 0:
+            self._first_id = event_id
+
+        if event_id < self._first_id:
+            # IDs usually increase, but make room at the front if they do not
+            self._index[0:0] = array("q", [-1] * (self._first_id - event_id))
+            self._first_id = event_id
+
+        offset = event_id - self._first_id
+        if offset >= len(self._index):
+            self._index.extend([-1] * (offset - len(self._index) + 1))
+
+        self._index[offset] = record_index
+
+    def append(self, event: LifeEvent) -> None:
+        """Write a record for an event.
+
+        Like a dict, recording an event with the same ID again replaces the existing
+        record without changing its position.
+
+        Parameters
+        ----------
+        event
+            The event to record.
+        """
+        event_id = event.get_id()
+        record_index = self._get_record_index(event_id)
+
+        if record_index < 0:
+            record_index = self._size
+            if record_index == len(self._records):
+                self._records.flush()
+                self._map(len(self._records) * 2)
+            self._set_record_index(event_id, record_index)
+            self._size += 1
+
+            for event_list in self._waiting.pop(event_id, ()):
+                event_list._pending.pop(event_id, None)  # type: ignore
+
+        event_type = type(event)
+        event_type_id = self._event_type_ids.get(event_type)
+        if event_type_id is None:
+            event_type_id = len(self._event_types)
+            self._event_types.append(event_type)
+            self._event_type_ids[event_type] = event_type_id
+
+        roles = list(event.iter_roles())
+        timestamp = event.get_timestamp()
+
+        record = self._records[record_index]
+        record["event_id"] = event_id
+        record["event_type"] = event_type_id
+        record["year"] = timestamp.year
+        record["month"] = timestamp.month
+        record["day"] = timestamp.day
+        record["hour"] = timestamp.hour
+        record["details"] = self._get_details_id(event)
+
+        self._overflow.pop(event_id, None)
+
+        if len(roles) > MAX_ROLES:
+            record["role_count"] = _OVERFLOW
+            self._overflow[event_id] = event
+        else:
+            record["role_count"] = len(roles)
+            for i, role in enumerate(roles):
+                role_name_id = self._role_name_ids.get(role.name)
+                if role_name_id is None:
+                    role_name_id = len(self._role_names)
+                    self._role_names.append(role.name)
+                    self._role_name_ids[role.name] = role_name_id
+                record["roles"][i] = role_name_id
+                record["gameobjects"][i] = role.gameobject.uid
+
+    def _get_details_id(self, event: LifeEvent) -> int:
+        """Intern the scalar attributes of an event (-1 if it has none)."""
+        details = tuple(
+            (name, value)
+            for name, value in getattr(event, "__dict__", {}).items()
+            if isinstance(value, _SCALAR_TYPES)
+        )
+
+        if not details:
+            return -1
+
+        details_id = self._details_ids.get(details)
+        if details_id is None:
+            details_id = len(self._details)
+            self._details.append(dict(details))
+            self._details_ids[details] = details_id
+
+        return details_id
+
+    def _wait_for(self, event_id: int, event_list: EventIdList) -> None:
+        """Drop an event from an EventIdList's pending events once it is logged."""
+        self._waiting.setdefault(event_id, []).append(event_list)
+
+    def get_records(self) -> np.ndarray:
+        """Return a read-only view of the written records."""
+        records = self._records[: self._size].view(np.ndarray)
+        records.flags.writeable = False
+        return records
+
+    def _materialize(self, record_index: int) -> LifeEvent:
+        record = self._records[record_index]
+        event_id = int(record["event_id"])
+
+        if record["role_count"] == _OVERFLOW:
+            return self._overflow[event_id]
+
+        event_type = self._event_types[record["event_type"]]
+        event = event_type.__new__(event_type)
+        event._uid = event_id  # type: ignore
+        event._timestamp = SimDateTime(  # type: ignore
+            int(record["year"]),
+            int(record["month"]),
+            int(record["day"]),
+            int(record["hour"]),
+        )
+        event._roles = RoleList(  # type: ignore
+            Role(
+                self._role_names[record["roles"][i]],
+                self.world.get_gameobject(int(record["gameobjects"][i])),
+            )
+            for i in range(record["role_count"])
+        )
+        if record["details"] >= 0:
+            for name, value in self._details[record["details"]].items():
+                setattr(event, name, value)
+        return event
+
+    def __setitem__(self, event_id: int, event: LifeEvent) -> None:
+        if event_id != event.get_id():
+            raise ValueError(
+                f"Event {event.get_id()} can not be stored using the ID {event_id}."
+            )
+        self.append(event)
+
+    def __getitem__(self, event_id: int) -> LifeEvent:
+        record_index = self._get_record_index(event_id)
+        if record_index < 0:
+            raise KeyError(event_id)
+        return self._materialize(record_index)
+
+    def __delitem__(self, event_id: int) -> None:
+        raise TypeError("Events can not be removed from the event log.")
+
+    def __contains__(self, event_id: object) -> bool:
+        return isinstance(event_id, int) and self._get_record_index(event_id) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        for record_index in range(self._size):
+            yield int(self._records[record_index]["event_id"])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Checkpoints copy the written records. A new temporary file is mapped when
+        # they are loaded.
+        return {
+            "world": self.world,
+            "records": np.array(self._records[: self._size]),
+            "index": self._index,
+            "first_id": self._first_id,
+            "event_types": self._event_types,
+            "role_names": self._role_names,
+            "details": self._details,
+            "overflow": self._overflow,
+            "waiting": self._waiting,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        records = state["records"]
+        self.world = state["world"]
+        self._file = tempfile.TemporaryFile()
+        self._size = len(records)
+        self._map(max(len(records), 1024))
+        self._records[: self._size] = records
+        self._index = state["index"]
+        self._first_id = state["first_id"]
+        self._event_types = state["event_types"]
+        self._event_type_ids = {t: i for i, t in enumerate(self._event_types)}
+        self._role_names = state["role_names"]
+        self._role_name_ids = {n: i for i, n in enumerate(self._role_names)}
+        self._details = state["details"]
+        self._details_ids = {
+            tuple(d.items()): i for i, d in enumerate(self._details)
+        }
+        self._overflow = state["overflow"]
+        self._waiting = state["waiting"]
+
+
+class EventIdList(Sequence[LifeEvent]):
+    """A list of events that stores event IDs and reads events from an EventLog.
+
+    Events that are not in the log yet are kept until they are. The log drops them
+    from the list when it writes them.
+    """
+
+    __slots__ = "_event_log", "_ids", "_pending"
+
+    _event_log: EventLog
+    """The log that events are read from."""
+
+    _ids: array[int]
+    """The IDs of the events in the list."""
+
+    _pending: Dict[int, LifeEvent]
+    """Events that were not in the log when they were appended."""
+
+    def __init__(self, event_log: EventLog) -> None:
+        self._event_log = event_log
+        self._ids = array("q")
+        self._pending = {}
+
+    def append(self, event: LifeEvent) -> None:
+        """Add an event to the end of the list."""
+        event_id = event.get_id()
+        self._ids.append(event_id)
+        if event_id not in self._event_log and event_id not in self._pending:
+            self._pending[event_id] = event
+            self._event_log._wait_for(event_id, self)
+
+    def _get(self, event_id: int) -> LifeEvent:
+        if event_id in self._pending:
+            return self._pending[event_id]
+        return self._event_log[event_id]
+
+    @overload
+    def __getitem__(self, index: int) -> LifeEvent:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[LifeEvent]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[LifeEvent, List[LifeEvent]]:
+        if isinstance(index, slice):
+            return [self._get(event_id) for event_id in self._ids[index]]
+        return self._get(self._ids[index])
+
+    def __iter__(self) -> Iterator[LifeEvent]:
+        for event_id in self._ids:
+            yield self._get(event_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def install_event_log(world: World, path: Optional[str] = None) -> EventLog:
+    """Replace the storage of a world's AllEvents resource with an EventLog.
+
+    Events already in AllEvents are moved to the log. The log is also added to the
+    world as a resource.
+
+    Parameters
+    ----------
+    world
+        The world to install the event log in.
+    path
+        The file to write records to. An anonymous temporary file is used if None.
+
+    Returns
+    -------
+    EventLog
+        The new event log.
+    """
+    all_events = world.get_resource(AllEvents)
+    event_log = EventLog(world, path)
+
+    for event in all_events:
+        event_log.append(event)
+
+    # AllEvents only uses its history as a mapping of event IDs to events
+    all_events._history = event_log  # type: ignore
+    world.add_resource(event_log)
+
+    return event_log
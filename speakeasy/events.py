@@ -1,5 +1,18 @@
+import functools
 import random
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 from neighborly.components.business import (
     Business,
     BusinessOwner,
@@ -19,10 +32,10 @@ from neighborly.core.relationship import (
     get_relationship,
     get_relationships_with_statuses
 )
-from neighborly.components.character import Family
 from neighborly.decorators import random_life_event
 
-from speakeasy.negotiation.core import NegotiationState, print_negotiation_trace, ResponseCategory
+from speakeasy.negotiation.core import NegotiationState, NegotiationTrace, print_negotiation_trace, ResponseCategory
+from speakeasy.negotiation.scheduler import NegotiationBatch
 
 ############
 # TODO: remove placeholders for new stuff
@@ -35,62 +48,208 @@ NEGOTIATE_EVENT_RESPECT_THRESHOLD = -10
 #############
 
 from speakeasy.components import Inventory, Knowledge, Respect, Favors, Produces
+from speakeasy.resources import BusinessAssociations, KinshipIndex, Market, RespectIndex
 
 # Classes for the different effects map entries
-class GainItemEffect:
-    def __init__(self, item) -> None:
-        self.item = item
+class Effect:
+    """Base class of immutable descriptors of what an event does to a role.
 
-class LoseItemEffect:
-    def __init__(self, item) -> None:
-        self.item = item
+    Effects only hold values and GameObject IDs, so describing an event does not look
+    up or create anything in the world.
+    """
 
-class GainRelationshipEffect:
-    def __init__(self, relationship: Relationship, facet: RelationshipFacet) -> None:
-        self.relationship = relationship
-        self.facet = facet
+    __slots__ = ()
 
-class LoseRelationshipEffect:
-    def __init__(self, relationship: Relationship, facet: RelationshipFacet) -> None:
-        self.relationship = relationship
-        self.facet = facet
+    _fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(self, *values: Any) -> None:
+        for field, value in zip(self._fields, values):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), self._values()
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and other._values() == self._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._values()))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{f}={v!r}" for f, v in zip(self._fields, self._values()))
+        return f"{type(self).__name__}({values})"
+
+
+class GainItemEffect(Effect):
+    __slots__ = ("item",)
+    _fields = __slots__
+
+    item: Optional[str]
+
+    def __init__(self, item: Optional[str]) -> None:
+        super().__init__(item)
+
+
+class LoseItemEffect(Effect):
+    __slots__ = ("item",)
+    _fields = __slots__
+
+    item: Optional[str]
+
+    def __init__(self, item: Optional[str]) -> None:
+        super().__init__(item)
+
+
+class RelationshipEffect(Effect):
+    """Changes a facet of the relationship from an owner to a target."""
+
+    __slots__ = ("owner", "target", "facet")
+    _fields = __slots__
+
+    owner: int
+    target: int
+    facet: Type[RelationshipFacet]
+
+    def __init__(
+        self, owner: int, target: int, facet: Type[RelationshipFacet]
+    ) -> None:
+        super().__init__(owner, target, facet)
+
+
+class GainRelationshipEffect(RelationshipEffect):
+    __slots__ = ()
+
+
+class LoseRelationshipEffect(RelationshipEffect):
+    __slots__ = ()
+
+
+class GainKnowledgeEffect(Effect):
+    __slots__ = ("item",)
+    _fields = __slots__
+
+    item: Optional[str]
+
+    def __init__(self, item: Optional[str]) -> None:
+        super().__init__(item)
 
-class GainKnowledgeEffect:
-    def __init__(self, item) -> None:
-        self.item = item
 
-class TriggerEventEffect:
-    def __init__(self, triggered_event_class) -> None:
-        self.triggered_event_class = triggered_event_class
+class TriggerEventEffect(Effect):
+    __slots__ = ("triggered_event_class",)
+    _fields = __slots__
+
+    triggered_event_class: Type[RandomLifeEvent]
+
+    def __init__(self, triggered_event_class: Type[RandomLifeEvent]) -> None:
+        super().__init__(triggered_event_class)
+
+
+EffectsDict = Dict[Role, List[Effect]]
+
+
+def cache_effects(
+    get_effects: Callable[[Any], EffectsDict]
+) -> Callable[[Any], EffectsDict]:
+    """Compute an event's effects once and return the same dict on later calls.
+
+    Only use this for events whose effects depend on nothing but their roles and
+    attributes. The returned dict is shared, so callers should not modify it.
+    """
+
+    @functools.wraps(get_effects)
+    def wrapper(self: Any) -> EffectsDict:
+        effects = self.__dict__.get("_effects")
+        if effects is None:
+            effects = self.__dict__["_effects"] = get_effects(self)
+        return effects
+
+    return wrapper
 
 # utility functions
 def needs_item_from(a: Business, b: Inventory, r : random.Random):
-    pro_a = a.gameobject.get_component(Produces)
-    if True in [i in b.items for i in pro_a.requires]:
-        items = [i for i in pro_a.requires if (i in b.items and b.items[i] > 0)]
-        if items:
-            return r.choice(items)
+    market = a.gameobject.world.get_resource(Market)
+    items = [i for i in sorted(market.get_required_items(a.gameobject.uid)) if b.get_quantity(i) > 0]
+    if items:
+        return r.choice(items)
     return None
 
 def has_knowledge(a: Knowledge, b: Business) -> bool:
-    return True in [b.gameobject.uid in i for i in list(a.produces.values())]
+    return b.gameobject.uid in a.producer_ids
 
-def get_associated_business(obj : GameObject) -> Business:
-    bizown = None
-    employed = []
+def find_associated_business(obj : GameObject) -> Optional[int]:
+    """Return the ID of the business a GameObject owns or works for (uncached)."""
     if obj.has_component(BusinessOwner):
-        bizown = obj.get_component(BusinessOwner)
+        return obj.get_component(BusinessOwner).business
+
     if obj.has_component(RelationshipManager):
-        employed = [obj.world.get_gameobject(rel.get_component(Relationship).target) for rel in get_relationships_with_statuses(obj, EmployeeOf)]
-    associated_biz = None
+        for rel in get_relationships_with_statuses(obj, EmployeeOf):
+            boss = obj.world.get_gameobject(rel.get_component(Relationship).target)
+            return boss.get_component(BusinessOwner).business
+
+    return None
+
+def get_associated_business(obj : GameObject) -> Optional[Business]:
+    """Return the business a GameObject owns or works for.
+
+    Results are cached in the world's BusinessAssociations resource (if present).
+    """
+    associations = obj.world.try_resource(BusinessAssociations)
+
+    if associations is not None and obj.uid in associations:
+        business_id = associations.get(obj.uid)
+    else:
+        business_id = find_associated_business(obj)
+        if associations is not None:
+            associations.set(obj.uid, business_id)
+
+    if business_id is None:
+        return None
 
-    if len(employed) > 0:
-        associated_biz = obj.world.get_gameobject(employed[0].get_component(BusinessOwner).business).get_component(Business)
+    return obj.world.get_gameobject(business_id).get_component(Business)
 
-    if bizown:
-        associated_biz = obj.world.get_gameobject(bizown.business).get_component(Business)
+def find_business_associates(business: Business) -> FrozenSet[int]:
+    """Return the IDs of a business's owner and employees (uncached)."""
+    associates = set(business.get_employees())
+    if business.owner:
+        associates.add(business.owner)
+    return frozenset(associates)
 
-    return associated_biz
+def get_business_associates(world: World, business_id: int) -> FrozenSet[int]:
+    """Return the IDs of a business's owner and employees.
+
+    Results are cached in the world's BusinessAssociations resource (if present).
+    """
+    associations = world.try_resource(BusinessAssociations)
+
+    if associations is not None:
+        try:
+            return associations.get_associates(business_id)
+        except KeyError:
+            pass
+
+    associates = find_business_associates(
+        world.get_gameobject(business_id).get_component(Business)
+    )
+
+    if associations is not None:
+        associations.set_associates(business_id, associates)
+
+    return associates
+
+def get_known_business_associates(obj: GameObject) -> Set[int]:
+    """Return the IDs of everyone associated with a business that obj knows about."""
+    return set().union(
+        *(
+            get_business_associates(obj.world, business_id)
+            for business_id in obj.get_component(Knowledge).producer_ids
+        )
+    )
 
 #learning that someone's biz produces an item
 @random_life_event()
@@ -110,6 +269,7 @@ class LearnAboutEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         return {
             Role("Initiator", self["Initiator"]) : [GainKnowledgeEffect(None)]
@@ -192,6 +352,7 @@ class TradeEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
@@ -200,8 +361,8 @@ class TradeEvent(RandomLifeEvent):
         others_item = self.others_item
 
         return {
-            Role("Initiator", initiator) : [GainItemEffect(others_item), LoseItemEffect(initiators_item), GainRelationshipEffect(get_relationship(other, initiator), Respect)],
-            Role("Other", other) : [GainItemEffect(initiators_item), LoseItemEffect(others_item), GainRelationshipEffect(get_relationship(initiator, other), Respect)]
+            Role("Initiator", initiator) : [GainItemEffect(others_item), LoseItemEffect(initiators_item), GainRelationshipEffect(other.uid, initiator.uid, Respect)],
+            Role("Other", other) : [GainItemEffect(initiators_item), LoseItemEffect(others_item), GainRelationshipEffect(initiator.uid, other.uid, Respect)]
         }
 
     def execute(self) -> None:
@@ -239,39 +400,32 @@ class TradeEvent(RandomLifeEvent):
                 for result in world.get_components((GameCharacter, Active, Inventory, Knowledge))
             ]
 
+        respect_index = world.get_resource(RespectIndex)
+        market = world.get_resource(Market)
+
         matches = []
 
         #must know someone they respect
         for candidate in candidates:
             inventory = candidate.get_component(Inventory)
-            if len(inventory.items) < 1:
+            if inventory.is_empty():
                 continue
 
             candidate_biz = get_associated_business(candidate)
             if not candidate_biz:
                 continue
 
-            known_businesses = [world.get_gameobject(i) for i in candidate.get_component(Knowledge).known_producers()]
-
-            known_business_associates = [world.get_gameobject(i.get_component(Business).owner) for i in known_businesses if i.get_component(Business).owner]
-
-            known_business_employees = [[world.get_gameobject(e) for e in biz.get_component(Business).get_employees()] for biz in known_businesses if biz.get_component(Business).get_employees()]
+            known_business_associates = get_known_business_associates(candidate)
 
-            for emps in known_business_employees:
-                known_business_associates.extend(emps)
-
-            known_business_relationships = [get_relationship(candidate, o) for o in known_business_associates]
-            #print("MY relationships wit them:", [r.get_component(Respect).get_value() for r in known_business_relationships])
-
-            potential_offered_items = [i for i in inventory.items]
+            respected = respect_index.respected_by(candidate.uid, TRADE_EVENT_RESPECT_THRESHOLD + 1)
+            if respected.isdisjoint(known_business_associates):
+                continue
 
             #hold back anything required by my biz
-            biz = get_associated_business(candidate)
-            if biz:
-                prod = biz.gameobject.get_component(Produces)
-                potential_offered_items = [i for i in potential_offered_items if i not in prod.requires]
+            required_items = market.get_required_items(candidate_biz.gameobject.uid)
+            potential_offered_items = [i for i in inventory.get_items() if i not in required_items]
 
-            if True in [r.get_component(Respect).get_value() > TRADE_EVENT_RESPECT_THRESHOLD for r in known_business_relationships] and len(potential_offered_items) > 0:
+            if len(potential_offered_items) > 0:
                 matches.append((candidate, world.get_resource(random.Random).choice(potential_offered_items)))
 
         if matches:
@@ -285,39 +439,33 @@ class TradeEvent(RandomLifeEvent):
     ) -> Optional[GameObject]:
 
         respect_threshold = TRADE_EVENT_RESPECT_THRESHOLD
+        respect_index = world.get_resource(RespectIndex)
 
         if candidate:
             candidates = [candidate]
         else:
             candidates = [
                 world.get_gameobject(c)
-                for c in initiator.get_component(RelationshipManager).outgoing.keys()
+                for c in sorted(respect_index.mutually_respected(initiator.uid, respect_threshold))
             ]
 
+        initiators_biz = get_associated_business(initiator)
+
         matches: List[GameObject] = []
 
         for character in candidates:
             if character == initiator:
                 continue
 
+            #Prereq: mutual respect
+            if not respect_index.mutually_respect(initiator.uid, character.uid, respect_threshold):
+                continue
+
             #Prereq: initiator need
-            initiators_biz = get_associated_business(initiator)
             characters_inv = character.get_component(Inventory)
 
             needed_item = needs_item_from(initiators_biz, characters_inv, world.get_resource(random.Random))
             if needed_item is None:
-                #print('init needs nothing from other?')
-                continue
-
-            #Prereq: mutual respect
-            outgoing_relationship = get_relationship(initiator, character)
-            incoming_relationship = get_relationship(character, initiator)
-
-            outgoing_respect = outgoing_relationship.get_component(Respect)
-            incoming_respect = incoming_relationship.get_component(Respect)
-
-            if outgoing_respect.get_value() < respect_threshold or incoming_respect.get_value() < respect_threshold:
-                #print('init and other dont mutually respect weach other?')
                 continue
 
             matches.append((character, needed_item))
@@ -370,14 +518,15 @@ class GoodWordEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
         subject = self["Subject"]
 
         return {
-            Role("Initiator", initiator) : [LoseRelationshipEffect(get_relationship(initiator, subject), Favors)],#, LoseRelationshipEffect(get_relationship(other, initiator), Respect)
-            Role("Subject", subject) : [GainRelationshipEffect(get_relationship(other, subject), Respect), GainRelationshipEffect(get_relationship(subject, initiator), Favors)]
+            Role("Initiator", initiator) : [LoseRelationshipEffect(initiator.uid, subject.uid, Favors)],#, LoseRelationshipEffect(other.uid, initiator.uid, Respect)
+            Role("Subject", subject) : [GainRelationshipEffect(other.uid, subject.uid, Respect), GainRelationshipEffect(subject.uid, initiator.uid, Favors)]
         }
 
     def execute(self) -> None:
@@ -422,24 +571,16 @@ class GoodWordEvent(RandomLifeEvent):
                 for result in world.get_components((GameCharacter, Active, RelationshipManager))
             ]
 
+        respect_index = world.get_resource(RespectIndex)
+
         #initiator must respect someone... who respects them
         matches = []
         for character in candidates:
-            people_they_respect = [world.get_gameobject(r).get_component(Relationship).target for r in character.get_component(RelationshipManager).outgoing.values() 
-                                        if (world.get_gameobject(r).get_component(Respect).get_value() >= GOOD_WORD_EVENT_RESPECT_THRESHOLD
-                                        or not apply_threshold)
-                                    ]
-            if len(people_they_respect) < 1:
-                continue
-
-            people_mutually_respected = [world.get_gameobject(target) for target in people_they_respect 
-                                            if (get_relationship(world.get_gameobject(target), character).get_component(Respect).get_value() >= GOOD_WORD_EVENT_RESPECT_THRESHOLD
-                                            or not apply_threshold)
-                                        ]
-            if len(people_mutually_respected) < 1:
-                continue
-
-            matches.append(character)
+            if apply_threshold:
+                if respect_index.mutually_respected(character.uid, GOOD_WORD_EVENT_RESPECT_THRESHOLD):
+                    matches.append(character)
+            elif character.get_component(RelationshipManager).outgoing:
+                matches.append(character)
 
         if matches:
             return world.get_resource(random.Random).choice(matches)
@@ -452,25 +593,17 @@ class GoodWordEvent(RandomLifeEvent):
     ) -> Optional[GameObject]:
 
         respect_threshold = GOOD_WORD_EVENT_RESPECT_THRESHOLD
-        apply_threshold = True
+        respect_index = world.get_resource(RespectIndex)
 
         if candidate:
-            candidates = [candidate]
-            apply_threshold = False
+            matches = [candidate]
         else:
-            candidates = [
+            #prereq: initiator must respect subject
+            matches = [
                 world.get_gameobject(c)
-                for c in initiator.get_component(RelationshipManager).outgoing.keys()
+                for c in sorted(respect_index.respected_by(initiator.uid, respect_threshold))
             ]
 
-        matches: List[GameObject] = []
-
-        for character in candidates:
-            #prereq: initiator must respect subject
-            respect = get_relationship(initiator, character).get_component(Respect)
-            if respect.get_value() >= respect_threshold or not apply_threshold:
-                matches.append(character)
-
         if matches:
             return world.get_resource(random.Random).choice(matches)
 
@@ -482,13 +615,15 @@ class GoodWordEvent(RandomLifeEvent):
     ) -> Optional[GameObject]:
 
         respect_threshold = GOOD_WORD_EVENT_RESPECT_THRESHOLD
+        respect_index = world.get_resource(RespectIndex)
 
         if candidate:
             candidates = [candidate]
         else:
             candidates = [
-                world.get_gameobject(result[0])
-                for result in world.get_components((GameCharacter, Active))
+                world.get_gameobject(c)
+                for c in sorted(respect_index.respecting(initiator.uid, respect_threshold))
+                if world.has_components(c, GameCharacter, Active)
             ]
             candidates = [c for c in candidates if c != initiator and c != subject]
 
@@ -499,8 +634,7 @@ class GoodWordEvent(RandomLifeEvent):
                 continue
 
             #prereq: other must respect initiator
-            respect = get_relationship(character, initiator).get_component(Respect).get_value()
-            if respect >= respect_threshold:
+            if respect_index.respects(character.uid, initiator.uid, respect_threshold):
                 matches.append(character)
 
         if matches:
@@ -548,6 +682,7 @@ class TellAboutEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    #not cached: the item comes from the business the subject is associated with now
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
@@ -556,7 +691,7 @@ class TellAboutEvent(RandomLifeEvent):
         subjects_item = list(get_associated_business(subject).gameobject.get_component(Produces).produces.keys())[0]
 
         return {
-            Role("Initiator", initiator) : [GainRelationshipEffect(get_relationship(other, initiator), Respect), LoseRelationshipEffect(get_relationship(subject, initiator), Respect)],
+            Role("Initiator", initiator) : [GainRelationshipEffect(other.uid, initiator.uid, Respect), LoseRelationshipEffect(subject.uid, initiator.uid, Respect)],
             Role("Other", other) : [GainKnowledgeEffect(subjects_item)]
         }
 
@@ -594,7 +729,7 @@ class TellAboutEvent(RandomLifeEvent):
                 for result in world.get_components((GameCharacter, Active, Knowledge))
             ]
 
-        matches = [c for c in candidates if len(c.get_component(Knowledge).produces.keys()) > 0]
+        matches = [c for c in candidates if c.get_component(Knowledge).producer_ids]
 
         if matches:
             return world.get_resource(random.Random).choice(matches)
@@ -611,29 +746,24 @@ class TellAboutEvent(RandomLifeEvent):
         if candidate:
             candidates = [candidate]
         else:
-            all_candidates = [
+            #prereq: initiator must respect other
+            respect_index = world.get_resource(RespectIndex)
+            candidates = [
                 world.get_gameobject(c)
-                for c in initiator.get_component(RelationshipManager).outgoing.keys()
+                for c in sorted(respect_index.respected_by(initiator.uid, respect_threshold))
             ]
-            #prereq: initiator must respect other
-            candidates = []
-            for character in all_candidates:
-                respect = get_relationship(initiator, character).get_component(Respect)
-                if respect.get_value() >= respect_threshold:
-                    candidates.append(character)
 
         matches: List[GameObject] = []
 
+        known_businesses = initiator.get_component(Knowledge).producer_ids
+
         for character in candidates:
              if character.has_component(Knowledge):
 
                 #prepreq: initiator must know new business for other
                 other_knowledge = character.get_component(Knowledge)
 
-                known_businesses = initiator.get_component(Knowledge).known_producers()
-                other_known_businesses = other_knowledge.known_producers()
-
-                if False in [b in other_known_businesses for b in known_businesses]:
+                if not known_businesses <= other_knowledge.producer_ids:
                     matches.append(character)
 
         if matches:
@@ -645,8 +775,8 @@ class TellAboutEvent(RandomLifeEvent):
     def _bind_subject(
         world: World, initiator: GameObject, other: GameObject, candidate: Optional[GameObject] = None
     ) -> Optional[GameObject]:
-        initiators_known_bizs = initiator.get_component(Knowledge).known_producers()
-        others_known_bizs = other.get_component(Knowledge).known_producers()
+        initiators_known_bizs = initiator.get_component(Knowledge).producer_ids
+        others_known_bizs = other.get_component(Knowledge).producer_ids
 
         if candidate:
             biz = get_associated_business(candidate)
@@ -655,8 +785,9 @@ class TellAboutEvent(RandomLifeEvent):
             else:
                 return None
         else:
-            candidates = [world.get_gameobject(i) for i in initiators_known_bizs]
-            candidates = [b.get_component(Business) for b in candidates if b.uid not in others_known_bizs]
+            market = world.get_resource(Market)
+            candidates = [world.get_gameobject(i) for i in sorted(initiators_known_bizs - others_known_bizs) if i in market]
+            candidates = [b.get_component(Business) for b in candidates]
             candidates = [world.get_gameobject(b.owner) for b in candidates if b.owner]
 
         if candidates:
@@ -705,14 +836,15 @@ class TheftEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    #not cached: the item comes from the other's inventory, which changes as they trade
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
 
-        others_item = list(other.get_component(Inventory).items)[0]
+        others_item = other.get_component(Inventory).get_items()[0]
 
         return {
-            Role("Initiator", initiator) : [GainItemEffect(others_item), LoseRelationshipEffect(get_relationship(other, initiator), Respect)]
+            Role("Initiator", initiator) : [GainItemEffect(others_item), LoseRelationshipEffect(other.uid, initiator.uid, Respect)]
         }
 
     def execute(self) -> None:
@@ -725,10 +857,10 @@ class TheftEvent(RandomLifeEvent):
         others_inventory = others_owner.get_component(Inventory)
 
         for stolen_item_idx in range(initiator.world.get_resource(random.Random).randint(1,5)):
-            if len([item for item in others_inventory.items if others_inventory.items[item]>0]) < 1:
+            if others_inventory.is_empty():
                 continue
 
-            others_item = initiator.world.get_resource(random.Random).choice([item for item in others_inventory.items if others_inventory.items[item]>0])
+            others_item = initiator.world.get_resource(random.Random).choice(others_inventory.get_items())
             others_inventory.remove_item(others_item, 1)
             initiators_inventory.add_item(others_item, 1)
 
@@ -756,26 +888,22 @@ class TheftEvent(RandomLifeEvent):
         #initiator must disrespect someonethey know
         for candidate in candidates:
 
-            known_businesses = [world.get_gameobject(i) for i in candidate.get_component(Knowledge).known_producers() if world.get_gameobject(i).has_component(Active) and world.get_gameobject(i).get_component(Business).owner]
-            #print(f"I know {len(known_businesses)} biz's")
+            #one entry per disrespected associate, so businesses are weighted by how many
+            victims: List[GameObject] = []
 
-            known_business_associates = [(world.get_gameobject(i.get_component(Business).owner),i) for i in known_businesses if i.get_component(Business).owner]
-            #print(f"It has {len(known_business_associates)} owners")
-            known_business_employees = [[(world.get_gameobject(emp), biz_object) for emp in biz_object.get_component(Business).get_employees()] for biz_object in known_businesses if biz_object.get_component(Business).get_employees()]
-            #print(f"It has {len(known_business_employees)} employees")
+            for business_id in sorted(candidate.get_component(Knowledge).producer_ids):
+                business = world.get_gameobject(business_id)
+                if not business.has_component(Active) or not business.get_component(Business).owner:
+                    continue
 
-            for emps in known_business_employees:
-                known_business_associates.extend(emps)
+                for associate in sorted(get_business_associates(world, business_id)):
+                    respect = get_relationship(candidate, world.get_gameobject(associate)).get_component(Respect)
+                    if respect.get_value() < THEFT_EVENT_RESPECT_THRESHOLD:
+                        victims.append(business)
 
-            known_business_relationships = [(get_relationship(candidate, pair[0]), pair[1]) for pair in known_business_associates]
-            #print("My relatioships with them: ", [r.get_component(Respect).get_value() for r in known_business_relationships])
-
-            #print("ALL my relationships: ", [candidate.world.get_gameobject(r_id).get_component(Respect).get_value() for r_id in candidate.get_component(RelationshipManager).outgoing.values()])
-
-            if True in [pair[0].get_component(Respect).get_value() < THEFT_EVENT_RESPECT_THRESHOLD for pair in known_business_relationships]:
-                victim = world.get_resource(random.Random).choice([pair[1] for pair in known_business_relationships if pair[0].get_component(Respect).get_value() < THEFT_EVENT_RESPECT_THRESHOLD])
+            if victims:
+                victim = world.get_resource(random.Random).choice(victims)
                 matches.append((candidate, victim))
-                #print('chose a victim and candidate.')
 
         if matches:
             return world.get_resource(random.Random).choice(matches)
@@ -827,6 +955,7 @@ class GiveEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
@@ -879,7 +1008,7 @@ class GiveEvent(RandomLifeEvent):
 
         if initiator and other:
             initiator_inventory = initiator.get_component(Inventory)
-            candidates = [item for item in list(initiator_inventory.items)] #needed to spawn to put item in role list but, creates waste?
+            candidates = initiator_inventory.get_items()
             if len(candidates) < 1:
                 return None
             return world.get_resource(random.Random).choice(candidates)
@@ -929,12 +1058,13 @@ class HelpWithRivalGangEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
 
         return {
-            Role("Initiator", initiator) : [GainRelationshipEffect(get_relationship(other, initiator), Favors), GainRelationshipEffect(get_relationship(other, initiator), Respect)]
+            Role("Initiator", initiator) : [GainRelationshipEffect(other.uid, initiator.uid, Favors), GainRelationshipEffect(other.uid, initiator.uid, Respect)]
         }
 
     def execute(self) -> None:
@@ -943,7 +1073,7 @@ class HelpWithRivalGangEvent(RandomLifeEvent):
 
         #add some respect from other and their fam
         get_relationship(other, initiator).get_component(Respect).increment(2) 
-        others_fam = [obj.get_component(Relationship).target for obj in get_relationships_with_statuses(other, Family)]
+        others_fam = initiator.world.get_resource(KinshipIndex).get_family(other.uid)
         for fam in others_fam:
             get_relationship(initiator.world.get_gameobject(fam), initiator).get_component(Respect).increment(1) 
 
@@ -970,21 +1100,21 @@ class HelpWithRivalGangEvent(RandomLifeEvent):
     ) -> Optional[GameObject]:
 
         respect_threshold = HELP_EVENT_RESPECT_THRESHOLD
+        respect_index = world.get_resource(RespectIndex)
 
         if candidate:
             candidates = [candidate]
         else:
             candidates = [
                 world.get_gameobject(c)
-                for c in initiator.get_component(RelationshipManager).outgoing.keys()
+                for c in sorted(respect_index.respected_by(initiator.uid, respect_threshold))
             ]
 
         matches: List[GameObject] = []
 
         for character in candidates:
             #prereq: initiator must respect other
-            respect = get_relationship(initiator, character).get_component(Respect)
-            if respect.get_value() >= respect_threshold:
+            if respect_index.respects(initiator.uid, character.uid, respect_threshold):
                 matches.append(character)
 
         if matches:
@@ -1026,6 +1156,7 @@ class GenerateKnowledgeEvent(RandomLifeEvent):
     def get_priority(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         return {}
 
@@ -1082,8 +1213,8 @@ class GenerateKnowledgeEvent(RandomLifeEvent):
 
 @random_life_event()
 class NegotiateEvent(RandomLifeEvent):
-    from speakeasy.negotiation.core import get_initial_ask_options, negotiate
-    from speakeasy.negotiation.neighborly_classes import NeighborlyNegotiator
+    from speakeasy.negotiation.core import complete_negotiation, get_agreement, get_initial_ask_options, iter_negotiation
+    from speakeasy.negotiation.neighborly_classes import NeighborlyNegotiator, OfferLedger
 
     initiator = "Initiator"
 
@@ -1091,7 +1222,7 @@ class NegotiateEvent(RandomLifeEvent):
         self, date: SimDateTime, initiator: GameObject, other: GameObject
     ) -> None:
         super().__init__(date, [Role("Initiator", initiator), Role("Other", other)])
-        self.trace = ""
+        self.trace: Optional[NegotiationTrace] = None
         self.agreement = []
 
     def get_priority(self) -> float:
@@ -1100,36 +1231,87 @@ class NegotiateEvent(RandomLifeEvent):
     def get_probability(self) -> float:
         return 1
 
+    @cache_effects
     def get_effects(self):
         initiator = self["Initiator"]
         other = self["Other"]
 
         return {
-            Role("Initiator", initiator) : [GainRelationshipEffect(get_relationship(initiator, other), Respect), GainRelationshipEffect(get_relationship(other, initiator), Respect)],
-            Role("Other", other) : [GainRelationshipEffect(get_relationship(initiator, other), Respect), GainRelationshipEffect(get_relationship(other, initiator), Respect)]
+            Role("Initiator", initiator) : [GainRelationshipEffect(initiator.uid, other.uid, Respect), GainRelationshipEffect(other.uid, initiator.uid, Respect)],
+            Role("Other", other) : [GainRelationshipEffect(initiator.uid, other.uid, Respect), GainRelationshipEffect(other.uid, initiator.uid, Respect)]
         }
 
     def execute(self) -> None:
         initiator = self["Initiator"]
+
+        #batched negotiations run at the end of the step (see negotiation.scheduler)
+        if batch := initiator.world.try_resource(NegotiationBatch):
+            batch.submit(self)
+            return
+
+        setup = self.start_negotiation()
+        if setup is None:
+            return
+
+        turns = NegotiateEvent.iter_negotiation(*setup)
+        self.finish_negotiation(*NegotiateEvent.complete_negotiation(turns))
+
+    def start_negotiation(
+        self, batch: Optional[NegotiationBatch] = None
+    ) -> Optional[Tuple[Any, Any, Any, bool]]:
+        """Set up the negotiation (None if there's nothing to ask for).
+
+        Returns the arguments of iter_negotiation(): both negotiators, the action to
+        ask for, and whether to record a trace.
+        """
+        initiator = self["Initiator"]
         other = self["Other"]
+        rng = initiator.world.get_resource(random.Random)
+
+        negotiator = NegotiateEvent.NeighborlyNegotiator( initiator.get_component(GameCharacter).full_name, initiator , rng, batch)
+        partner = NegotiateEvent.NeighborlyNegotiator( other.get_component(GameCharacter).full_name, other, rng, batch )
 
-        #run negotiation
-        negotiator = NegotiateEvent.NeighborlyNegotiator( initiator.get_component(GameCharacter).full_name, initiator , initiator.world.get_resource(random.Random))
-        partner = NegotiateEvent.NeighborlyNegotiator( other.get_component(GameCharacter).full_name, other, initiator.world.get_resource(random.Random) )
         options = NegotiateEvent.get_initial_ask_options(negotiator, partner)
         if len(options) < 1:
-            return
-        thing_to_ask_for = initiator.world.get_resource(random.Random).choice(options)
+            return None
+
+        settings = initiator.world.get_resource(NeighborlyConfig).settings
+        for agent in (negotiator, partner):
+            agent.max_counter_offers = settings.get("negotiation_max_counter_offers")
+            agent.search_budget = settings.get("negotiation_search_budget")
+
+        thing_to_ask_for = rng.choice(options)
+
+        print_negotiations = settings.get("print_negotiations", True)
+        record_trace = settings.get("negotiation_trace", True) or print_negotiations
 
-        print(f'Running negotiation between {negotiator.name} and {partner.name}:')
-        print(f'{negotiator.name}:{negotiator.gameObject.get_component(Inventory).items}\n{partner.name}:{partner.gameObject.get_component(Inventory).items}')
-        self.agreement, self.trace = NegotiateEvent.negotiate(negotiator, partner, thing_to_ask_for)
+        if print_negotiations:
+            print(f'Running negotiation between {negotiator.name} and {partner.name}:')
+            print(f'{negotiator.gameObject.get_component(Inventory).items}\n{partner.gameObject.get_component(Inventory).items}')
 
-        #trigger each event from the agreed upon package
+        return negotiator, partner, thing_to_ask_for, record_trace
+
+    def finish_negotiation(self, result: Any, trace: Optional[NegotiationTrace]) -> None:
+        """Carry out the agreement (if any) of a finished negotiation."""
+        initiator = self["Initiator"]
+        other = self["Other"]
+        world = initiator.world
+
+        self.agreement, self.trace = NegotiateEvent.get_agreement(result), trace
+
+        if world.get_resource(NeighborlyConfig).settings.get("print_negotiations", True):
+            print(self.trace.render(), end="")
+
+        #nobody can give up items they no longer have (an earlier agreement in a batch
+        #may have taken them)
+        ledger = NegotiateEvent.OfferLedger(world)
+        ledger.sync(self.agreement)
+        if not ledger.is_affordable():
+            self.agreement = []
+
+        #trigger each event from the agreed upon package (candidates become real events)
         for item in self.agreement:
-            triggered_event = item.val
-            initiator.world.get_resource(AllEvents).append(triggered_event)
-            triggered_event.execute()
+            item.val.commit(world)
 
             #add some mutual respect
             get_relationship(initiator, other).get_component(Respect).increment(1)
@@ -1142,7 +1324,7 @@ class NegotiateEvent(RandomLifeEvent):
 
         if event_history := initiator.try_component(EventHistory):
             event_history.append(self)
-        initiator.world.get_resource(AllEvents).append(self)
+        world.get_resource(AllEvents).append(self)
 
     @staticmethod
     def _bind_initiator(
@@ -1173,6 +1355,7 @@ class NegotiateEvent(RandomLifeEvent):
     ) -> Optional[GameObject]:
 
         respect_threshold = NEGOTIATE_EVENT_RESPECT_THRESHOLD
+        respect_index = world.get_resource(RespectIndex)
 
         if candidate:
             candidates = [candidate]
@@ -1181,34 +1364,57 @@ class NegotiateEvent(RandomLifeEvent):
                 world.get_gameobject(c)
                 for c in initiator.get_component(RelationshipManager).outgoing.keys()
             ]
+            world.get_resource(random.Random).shuffle(candidates)
 
-        matches: List[GameObject] = []
-
+        #take the first viable partner in random order
         for character in candidates:
             if character == initiator:
                 continue
 
             #Prereq: mutual respect
-            outgoing_relationship = get_relationship(initiator, character)
-            outgoing_respect = outgoing_relationship.get_component(Respect)
+            if respect_index.get_value(initiator.uid, character.uid) < respect_threshold:
+                continue
 
-            if outgoing_respect.get_value() < respect_threshold:
+            #prereq: something to ask for (cheap check before enumerating options)
+            if not NegotiateEvent._may_have_ask_options(world, initiator, character):
                 continue
 
-            #prereq: something to ask for
             negotiator = NegotiateEvent.NeighborlyNegotiator( initiator.get_component(GameCharacter).full_name, initiator, initiator.world.get_resource(random.Random))
             partner = NegotiateEvent.NeighborlyNegotiator( character.get_component(GameCharacter).full_name, character, initiator.world.get_resource(random.Random))
             options = NegotiateEvent.get_initial_ask_options(negotiator, partner)
             if len(options) < 1:
                 continue
 
-            matches.append(character)
-
-        if matches:
-            return world.get_resource(random.Random).choice(matches)
+            return character
 
         return None
 
+    @staticmethod
+    def _may_have_ask_options(
+        world: World, initiator: GameObject, partner: GameObject
+    ) -> bool:
+        """Necessary conditions for the initiator having something to ask the partner for.
+
+        The initiator only values actions where they receive items (GiveEvent,
+        TradeEvent), the partner puts in a good word for them (GoodWordEvent), or the
+        partner tells them about a business (TellAboutEvent).
+        """
+        partner_inventory = partner.try_component(Inventory)
+        if partner_inventory and not partner_inventory.is_empty():
+            return True
+
+        respecting_partner = world.get_resource(RespectIndex).respecting(partner.uid, GOOD_WORD_EVENT_RESPECT_THRESHOLD)
+        if len(respecting_partner) > (initiator.uid in respecting_partner):
+            return True
+
+        partner_knowledge = partner.try_component(Knowledge)
+        initiator_knowledge = initiator.try_component(Knowledge)
+        if partner_knowledge and initiator_knowledge:
+            if not partner_knowledge.producer_ids <= initiator_knowledge.producer_ids:
+                return True
+
+        return False
+
     @classmethod
     def instantiate(
         cls,
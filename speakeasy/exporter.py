@@ -0,0 +1,170 @@
+"""Streaming exporters for Speakeasy simulations.
+
+neighborly.exporter.export_to_json() builds a dict of the entire world and then
+serializes it to one string. These exporters produce the same data but serialize one
+GameObject, life event, or resource at a time and write it to a file as they go. So, the
+memory needed to export a simulation is bounded by its largest single object rather than
+the size of the whole world and its history.
+
+export_simulation() also supports the binary columnar format in speakeasy.columnar.
+"""
+
+import json
+from typing import Any, Dict, Iterator, TextIO
+
+from neighborly import Neighborly
+from neighborly.core.ecs import ISerializable
+from neighborly.core.life_event import AllEvents
+
+from speakeasy.columnar import export_to_columnar
+
+EXPORT_FORMATS = ("json", "ndjson", "columnar")
+"""The formats supported by export_simulation()."""
+
+
+def _iter_mapping(entries: Iterator[str]) -> Iterator[str]:
+    """Wrap serialized "key": value entries in a JSON object."""
+    yield "{"
+    for i, entry in enumerate(entries):
+        if i:
+            yield ", "
+        yield entry
+    yield "}"
+
+
+def _entry(key: Any, value: Dict[str, Any]) -> str:
+    return f"{json.dumps(str(key))}: {json.dumps(value)}"
+
+
+def _iter_resource(resource: ISerializable) -> Iterator[str]:
+    """Serialize a resource, one life event at a time for AllEvents."""
+    if isinstance(resource, AllEvents):
+        yield from _iter_mapping(
+            _entry(event.get_id(), event.to_dict()) for event in resource
+        )
+    else:
+        yield json.dumps(resource.to_dict())
+
+
+def iter_json(sim: Neighborly) -> Iterator[str]:
+    """Serialize a simulation to JSON in small chunks.
+
+    Joining the chunks gives the same string as neighborly's export_to_json().
+
+    Parameters
+    ----------
+    sim
+        The simulation to serialize.
+
+    Returns
+    -------
+    Iterator[str]
+        Consecutive pieces of the JSON document.
+    """
+    yield f'{{"seed": {json.dumps(sim.config.seed)}, "gameobjects": '
+
+    yield from _iter_mapping(
+        _entry(g.uid, g.to_dict()) for g in sim.world.get_gameobjects()
+    )
+
+    yield ', "resources": {'
+    for i, resource in enumerate(
+        r for r in sim.world.get_all_resources() if isinstance(r, ISerializable)
+    ):
+        if i:
+            yield ", "
+        yield f"{json.dumps(resource.__class__.__name__)}: "
+        yield from _iter_resource(resource)
+    yield "}}"
+
+
+def iter_ndjson(sim: Neighborly) -> Iterator[str]:
+    """Serialize a simulation to newline-delimited JSON (one record per line).
+
+    The first record contains the seed. It is followed by one record per GameObject,
+    one per life event, and one per remaining serializable resource. Each record has
+    a "type" field set to "simulation", "gameobject", "event", or "resource".
+
+    Parameters
+    ----------
+    sim
+        The simulation to serialize.
+
+    Returns
+    -------
+    Iterator[str]
+        JSON records, each ending with a newline.
+    """
+    yield json.dumps({"type": "simulation", "seed": sim.config.seed}) + "\n"
+
+    for gameobject in sim.world.get_gameobjects():
+        yield json.dumps({"type": "gameobject", "data": gameobject.to_dict()}) + "\n"
+
+    for resource in sim.world.get_all_resources():
+        if isinstance(resource, AllEvents):
+            for event in resource:
+                yield json.dumps(
+                    {"type": "event", "id": event.get_id(), "data": event.to_dict()}
+                ) + "\n"
+        elif isinstance(resource, ISerializable):
+            yield json.dumps(
+                {
+                    "type": "resource",
+                    "name": resource.__class__.__name__,
+                    "data": resource.to_dict(),
+                }
+            ) + "\n"
+
+
+def write_json(sim: Neighborly, fp: TextIO) -> None:
+    """Write a simulation to a file as a single JSON document.
+
+    Parameters
+    ----------
+    sim
+        The simulation to export.
+    fp
+        A text file opened for writing.
+    """
+    for chunk in iter_json(sim):
+        fp.write(chunk)
+
+
+def write_ndjson(sim: Neighborly, fp: TextIO) -> None:
+    """Write a simulation to a file as newline-delimited JSON.
+
+    Parameters
+    ----------
+    sim
+        The simulation to export.
+    fp
+        A text file opened for writing.
+    """
+    for record in iter_ndjson(sim):
+        fp.write(record)
+
+
+def export_simulation(sim: Neighborly, path: str, export_format: str = "json") -> None:
+    """Export a simulation to a file (or a directory for the columnar format).
+
+    Parameters
+    ----------
+    sim
+        The simulation to export.
+    path
+        The path to write to.
+    export_format
+        One of "json", "ndjson", or "columnar".
+    """
+    if export_format == "columnar":
+        export_to_columnar(sim, path)
+        return
+
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    with open(path, "w") as f:
+        if export_format == "ndjson":
+            write_ndjson(sim, f)
+        else:
+            write_json(sim, f)
@@ -3,16 +3,30 @@ from typing import Any
 
 from neighborly import IComponentFactory
 from neighborly.core.ecs.ecs import World
+from neighborly.core.life_event import EventHistory
 
 from speakeasy.components import Ethnicity, EthnicityValue, Inventory
+from speakeasy.event_log import EventIdList, EventLog
+from speakeasy.resources import ItemRegistry
 
 
 class InventoryFactory(IComponentFactory):
     def create(self, world: World, **kwargs: Any) -> Inventory:
-        return Inventory()
+        return Inventory(registry=world.get_resource(ItemRegistry))
 
 
 class EthnicityFactory(IComponentFactory):
     def create(self, world: World, **kwargs: Any) -> Ethnicity:
         rng = world.get_resource(random.Random)
         return Ethnicity(rng.choice(sorted(list(EthnicityValue))))
+
+
+class EventHistoryFactory(IComponentFactory):
+    """Creates EventHistory components that only store the IDs of their events."""
+
+    def create(self, world: World, **kwargs: Any) -> EventHistory:
+        event_history = EventHistory()
+        event_history._history = EventIdList(  # type: ignore
+            world.get_resource(EventLog)
+        )
+        return event_history
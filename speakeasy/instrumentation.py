@@ -0,0 +1,379 @@
+"""Opt-in instrumentation for Speakeasy's life events.
+
+When the "instrument_events" setting is enabled, the Speakeasy plugin adds an
+EventInstrumentation resource to the world and wraps each life event type's instantiate,
+execute, and role binding methods. The wrappers record how often events are attempted,
+which roles fail to bind, and how long instantiation, execution, and each role binding
+take.
+
+Nothing is wrapped unless instrumentation is enabled. Wrapping replaces methods on the
+event classes, which are shared by every simulation in the process, so
+uninstrument_all() restores the original methods. reset_global_state() calls it before
+a new simulation is created, and instrumented() wraps a module for the duration of a
+with block. Event types that are still wrapped only check for the resource before
+calling the original methods in worlds that do not have instrumentation enabled.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import inspect
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+from neighborly.core.ecs import ISerializable, World
+from neighborly.core.life_event import RandomLifeEvent
+from neighborly.core.roles import RoleList
+
+_ORIGINALS_ATTR = "__speakeasy_uninstrumented__"
+"""Holds the original class attributes of an instrumented event type."""
+
+_instrumented_types: List[Type[RandomLifeEvent]] = []
+"""Event types in the order that they were instrumented."""
+
+
+class LatencyHistogram:
+    """Counts durations in power-of-two buckets of microseconds.
+
+    Bucket ``i`` holds durations less than ``2 ** i`` microseconds and at least
+    ``2 ** (i - 1)`` microseconds. The last bucket holds everything slower.
+    """
+
+    __slots__ = "counts", "count", "total", "min", "max"
+
+    counts: List[int]
+    """The number of durations recorded in each bucket."""
+
+    count: int
+    """The total number of durations recorded."""
+
+    total: float
+    """The sum of all recorded durations (in seconds)."""
+
+    min: float
+    """The shortest recorded duration (in seconds)."""
+
+    max: float
+    """The longest recorded duration (in seconds)."""
+
+    NUM_BUCKETS = 32
+
+    def __init__(self) -> None:
+        self.counts = [0] * LatencyHistogram.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        """Record a duration (in seconds)."""
+        bucket = min(int(duration * 1e6).bit_length(), LatencyHistogram.NUM_BUCKETS - 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "buckets_us": {
+                str(2**bucket): count
+                for bucket, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+class EventTypeStats:
+    """Counters and latency histograms for a single life event type."""
+
+    __slots__ = (
+        "attempts",
+        "instantiated",
+        "executions",
+        "bind_calls",
+        "bind_failures",
+        "bind_latency",
+        "instantiate_latency",
+        "execute_latency",
+    )
+
+    attempts: int
+    """The number of times instantiate was called."""
+
+    instantiated: int
+    """The number of times instantiate returned an event."""
+
+    executions: int
+    """The number of times execute was called."""
+
+    bind_calls: Dict[str, int]
+    """Role binder names mapped to the number of times they were called."""
+
+    bind_failures: Dict[str, int]
+    """Role binder names mapped to the number of times they returned None."""
+
+    bind_latency: Dict[str, LatencyHistogram]
+    """Role binder names mapped to the durations of their calls."""
+
+    instantiate_latency: LatencyHistogram
+    """Durations of instantiate calls."""
+
+    execute_latency: LatencyHistogram
+    """Durations of execute calls."""
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.instantiated = 0
+        self.executions = 0
+        self.bind_calls = {}
+        self.bind_failures = {}
+        self.bind_latency = {}
+        self.instantiate_latency = LatencyHistogram()
+        self.execute_latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "instantiated": self.instantiated,
+            "executions": self.executions,
+            "bind_calls": {**self.bind_calls},
+            "bind_failures": {**self.bind_failures},
+            "bind_latency": {
+                role: histogram.to_dict()
+                for role, histogram in self.bind_latency.items()
+            },
+            "instantiate_latency": self.instantiate_latency.to_dict(),
+            "execute_latency": self.execute_latency.to_dict(),
+        }
+
+
+class EventInstrumentation(ISerializable):
+    """Records per-event-type hit rates and latencies.
+
+    This resource is serializable, so it is included when the simulation is exported
+    to JSON.
+    """
+
+    __slots__ = "event_types"
+
+    event_types: Dict[str, EventTypeStats]
+    """Event type names mapped to their stats."""
+
+    def __init__(self) -> None:
+        self.event_types = {}
+
+    def get_stats(self, event_type: str) -> EventTypeStats:
+        """Return the stats for an event type, creating them if needed."""
+        if event_type not in self.event_types:
+            self.event_types[event_type] = EventTypeStats()
+        return self.event_types[event_type]
+
+    def record_instantiate(
+        self, event_type: str, duration: float, succeeded: bool
+    ) -> None:
+        """Record an attempt to instantiate an event."""
+        stats = self.get_stats(event_type)
+        stats.attempts += 1
+        stats.instantiated += succeeded
+        stats.instantiate_latency.record(duration)
+
+    def record_bind(
+        self, event_type: str, role: str, duration: float, succeeded: bool
+    ) -> None:
+        """Record an attempt to bind a role."""
+        stats = self.get_stats(event_type)
+        stats.bind_calls[role] = stats.bind_calls.get(role, 0) + 1
+        if not succeeded:
+            stats.bind_failures[role] = stats.bind_failures.get(role, 0) + 1
+        if role not in stats.bind_latency:
+            stats.bind_latency[role] = LatencyHistogram()
+        stats.bind_latency[role].record(duration)
+
+    def record_execute(self, event_type: str, duration: float) -> None:
+        """Record the execution of an event."""
+        stats = self.get_stats(event_type)
+        stats.executions += 1
+        stats.execute_latency.record(duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            event_type: stats.to_dict()
+            for event_type, stats in sorted(self.event_types.items())
+        }
+
+
+def _wrap_instantiate(
+    instantiate: Callable[..., Optional[RandomLifeEvent]]
+) -> Callable[..., Optional[RandomLifeEvent]]:
+    @functools.wraps(instantiate)
+    def wrapper(
+        cls: Type[RandomLifeEvent], world: World, bindings: RoleList
+    ) -> Optional[RandomLifeEvent]:
+        instrumentation = world.try_resource(EventInstrumentation)
+
+        if instrumentation is None:
+            return instantiate(cls, world, bindings)
+
+        start = time.perf_counter()
+        event = instantiate(cls, world, bindings)
+        instrumentation.record_instantiate(
+            cls.__name__, time.perf_counter() - start, event is not None
+        )
+        return event
+
+    return wrapper
+
+
+def _wrap_execute(execute: Callable[[RandomLifeEvent], None]) -> Callable[..., None]:
+    @functools.wraps(execute)
+    def wrapper(self: RandomLifeEvent) -> None:
+        world = next(self.iter_roles()).gameobject.world
+        instrumentation = world.try_resource(EventInstrumentation)
+
+        if instrumentation is None:
+            return execute(self)
+
+        start = time.perf_counter()
+        execute(self)
+        instrumentation.record_execute(type(self).__name__, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _wrap_binder(
+    event_type: str, role: str, binder: Callable[..., Any]
+) -> Callable[..., Any]:
+    @functools.wraps(binder)
+    def wrapper(world: World, *args: Any, **kwargs: Any) -> Any:
+        instrumentation = world.try_resource(EventInstrumentation)
+
+        if instrumentation is None:
+            return binder(world, *args, **kwargs)
+
+        start = time.perf_counter()
+        result = binder(world, *args, **kwargs)
+        instrumentation.record_bind(
+            event_type, role, time.perf_counter() - start, result is not None
+        )
+        return result
+
+    return wrapper
+
+
+def instrument_event_type(event_type: Type[RandomLifeEvent]) -> None:
+    """Wrap the methods an event type defines so that they report to instrumentation.
+
+    Only methods defined directly on the event type are wrapped. Wrapping the same
+    event type more than once has no effect.
+
+    Parameters
+    ----------
+    event_type
+        The life event type to instrument.
+    """
+    attrs = event_type.__dict__
+
+    if _ORIGINALS_ATTR in attrs:
+        return
+
+    originals: Dict[str, Any] = {}
+
+    if isinstance(attrs.get("instantiate"), classmethod):
+        originals["instantiate"] = attrs["instantiate"]
+        event_type.instantiate = classmethod(  # type: ignore
+            _wrap_instantiate(attrs["instantiate"].__func__)
+        )
+
+    if "execute" in attrs:
+        originals["execute"] = attrs["execute"]
+        event_type.execute = _wrap_execute(attrs["execute"])  # type: ignore
+
+    for name, value in list(attrs.items()):
+        if name.startswith("_bind_") and isinstance(value, staticmethod):
+            originals[name] = value
+            setattr(
+                event_type,
+                name,
+                staticmethod(
+                    _wrap_binder(event_type.__name__, name[6:], value.__func__)
+                ),
+            )
+
+    setattr(event_type, _ORIGINALS_ATTR, originals)
+    _instrumented_types.append(event_type)
+
+
+def uninstrument_event_type(event_type: Type[RandomLifeEvent]) -> None:
+    """Restore the methods that instrument_event_type() wrapped.
+
+    Parameters
+    ----------
+    event_type
+        The life event type to restore (nothing happens if it is not instrumented).
+    """
+    originals: Optional[Dict[str, Any]] = event_type.__dict__.get(_ORIGINALS_ATTR)
+
+    if originals is None:
+        return
+
+    for name, value in originals.items():
+        setattr(event_type, name, value)
+
+    delattr(event_type, _ORIGINALS_ATTR)
+    _instrumented_types.remove(event_type)
+
+
+def _iter_event_types(module: ModuleType) -> Iterator[Type[RandomLifeEvent]]:
+    """Yield the random life event types defined in a module."""
+    for _, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, RandomLifeEvent) and obj.__module__ == module.__name__:
+            yield obj
+
+
+def instrument_module(module: ModuleType) -> None:
+    """Instrument every random life event type defined in a module."""
+    for event_type in _iter_event_types(module):
+        instrument_event_type(event_type)
+
+
+def uninstrument_module(module: ModuleType) -> None:
+    """Restore every random life event type defined in a module."""
+    for event_type in _iter_event_types(module):
+        uninstrument_event_type(event_type)
+
+
+def uninstrument_all() -> None:
+    """Restore every event type that is currently instrumented."""
+    for event_type in reversed(_instrumented_types):
+        uninstrument_event_type(event_type)
+
+
+@contextlib.contextmanager
+def instrumented(module: ModuleType) -> Iterator[None]:
+    """Instrument a module's life event types for the duration of a with block.
+
+    Event types that were already instrumented before the block stay instrumented.
+
+    Parameters
+    ----------
+    module
+        The module that defines the life event types.
+    """
+    already_instrumented = set(_instrumented_types)
+    instrument_module(module)
+    try:
+        yield
+    finally:
+        for event_type in _iter_event_types(module):
+            if event_type not in already_instrumented:
+                uninstrument_event_type(event_type)
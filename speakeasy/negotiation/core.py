@@ -1,5 +1,5 @@
 from enum import Enum
-import random, io
+import random
 
 class ResponseCategory(Enum):
   ACCEPT = 0,
@@ -45,55 +45,82 @@ class Agent:
     self.parent = None
     self.negotiation_state = None
 
+    # optional caps on counter-offer generation (None means no cap)
+    self.max_counter_offers = None
+    self.search_budget = None
+
   # naive evaluation = random dictionary lookup. meant to be overloaded.
   def evaluate_action(self, action: Action):
     return self.utilities[action.val]
   def evaluate_offer(self, offer: NegotiationOffer):
-    return sum([self.evaluate_action(action) for action in offer])
-
-  # worker for generate_counter_offers
-  def generate_counter_offers_recursive(self,
+    return sum([self.get_utility(action) for action in offer])
+
+  # key used to recognize the same action across calls. meant to be overloaded.
+  def get_action_key(self, action: Action):
+    return action.val
+
+  # memoized evaluate_action. cached values stay valid for the whole negotiation.
+  def get_utility(self, action: Action):
+    if self.negotiation_state is None:
+      return self.evaluate_action(action)
+
+    cache = self.negotiation_state.utility_cache
+    key = (self, self.get_action_key(action))
+    if key not in cache:
+      cache[key] = self.evaluate_action(action)
+    return cache[key]
+
+  # hashable, frozen form of an offer. offers that are == must freeze to equal keys.
+  def freeze_offer(self, offer: NegotiationOffer):
+    return tuple(action.val for action in offer)
+
+  # worker for generate_counter_offers. Greedily packs the highest utility actions into
+  # offers, starting a new offer each time one exceeds the needed utility.
+  # max_counter_offers caps the number of offers kept and search_budget caps the
+  # number of actions considered (None means no cap).
+  def search_counter_offers(self,
   offerUtilityNeeded: int,
-  counterOfferSoFar: NegotiationOffer,
-  counterOffers: list,
-  rejectedOffers: list,
+  rejectedOfferKeys: set,
   possibleActions: list):
-    if (len(possibleActions) < 1):
-      return counterOffers
+    counterOffers = []
+    counterOfferSoFar = []
+    utilitySoFar = 0
 
-    possibleNextAction = possibleActions.pop()
-    utilityOfNextAction = self.evaluate_action(possibleNextAction)
+    # possibleActions is sorted by ascending utility
+    for steps, possibleNextAction in enumerate(reversed(possibleActions)):
+      if self.search_budget is not None and steps >= self.search_budget:
+        break
 
-    counterOfferSoFar.append(possibleNextAction)
+      counterOfferSoFar.append(possibleNextAction)
+      utilitySoFar += self.get_utility(possibleNextAction)
 
-    # cutoff recursion with the rejection list. #TODO: doesn't make sense to do really. and wont work as root offer isn't included
-    #if (counterOfferSoFar in rejectedOffers):
-    #  return counterOffers
+      # naive: Don't continue building if not needed for own utility TODO: parameterize as Greed ?
+      if (utilitySoFar > offerUtilityNeeded): #changed to must exceed needed, bc of case where needed = 0
+        # TODO: root offer isn't included, so this rarely matches a rejected offer
+        if (self.freeze_offer(counterOfferSoFar) not in rejectedOfferKeys):
+          counterOffers.append(counterOfferSoFar)
+          if self.max_counter_offers is not None and len(counterOffers) >= self.max_counter_offers:
+            break
 
-    # naive: Don't continue building if not needed for own utility TODO: parameterize as Greed ?
-    if (self.evaluate_offer(counterOfferSoFar) > offerUtilityNeeded): #changed to must exceed needed, bc of case where needed = 0
-      # TODO: doesnt work bc initial offer isn't included, see: print('appending current offer: ', offers_to_string([counterOfferSoFar]), ', rejected offers: ', offers_to_string(rejectedOffers))
-      if (counterOfferSoFar not in rejectedOffers):
-        counterOffers.append(counterOfferSoFar)
-      return self.generate_counter_offers_recursive(offerUtilityNeeded, [], counterOffers, rejectedOffers, possibleActions)
+        counterOfferSoFar = []
+        utilitySoFar = 0
 
-    # else recurse and continue building the current offer.
-    return self.generate_counter_offers_recursive(offerUtilityNeeded, counterOfferSoFar, counterOffers, rejectedOffers, possibleActions)
+    return counterOffers
 
   def generate_starting_possible_actions(self):
-    return [ action for action in list(map(Action, list(self.utilities.keys()))) if self.evaluate_action(action) > 0]
+    return [ action for action in list(map(Action, list(self.utilities.keys()))) if self.get_utility(action) > 0]
 
   #Naive Countering: Find sequence of actions (Offers) that sum to match (or exceed) needed utility.
-  def generate_counter_offers(self, offerUtilityNeeded: int, startingOffer: NegotiationOffer, rejectedOffers : list):
+  def generate_counter_offers(self, offerUtilityNeeded: int, startingOffer: NegotiationOffer, rejectedOfferKeys : set):
     # startingPossibleActions = [ Action(val) for val in list(self.utilities.keys()) ]
     startingPossibleActions = self.generate_starting_possible_actions()
     startingPossibleActions = [a for a in startingPossibleActions if a not in startingOffer]
-    startingPossibleActions = sorted(startingPossibleActions, key = lambda action: self.evaluate_action(action), reverse=False)
+    startingPossibleActions = sorted(startingPossibleActions, key = lambda action: self.get_utility(action), reverse=False)
 
     # debug: print all starting possible actions
-    # print(*[action.val +':'+ str(self.evaluate_action(action)) for action in startingPossibleActions])
+    # print(*[action.val +':'+ str(self.get_utility(action)) for action in startingPossibleActions])
 
-    counterOffers = self.generate_counter_offers_recursive(offerUtilityNeeded, [], [], rejectedOffers, startingPossibleActions)
+    counterOffers = self.search_counter_offers(offerUtilityNeeded, rejectedOfferKeys, startingPossibleActions)
 
     counterOffers = [startingOffer + offer for offer in counterOffers]
 
@@ -110,8 +137,9 @@ class Agent:
       counterOffers = [ offer ]
       return (ResponseCategory.ACCEPT, counterOffers)
 
-    counterOffers = self.generate_counter_offers(-currentOfferUtility, offer, rejectedOffers) #.Except(rejectedOffersSoFar)
-    counterOffers = [o for o in counterOffers if o not in rejectedOffers]
+    rejectedOfferKeys = set(self.freeze_offer(o) for o in rejectedOffers)
+    counterOffers = self.generate_counter_offers(-currentOfferUtility, offer, rejectedOfferKeys) #.Except(rejectedOffersSoFar)
+    counterOffers = [o for o in counterOffers if self.freeze_offer(o) not in rejectedOfferKeys]
     counterOffers = counterOffers[:number_of_options]
 
     if (len(counterOffers) > 0):
@@ -129,15 +157,54 @@ class Agent:
   def take_turn(self, negotiation_state):
     pass
 
-  import io
-
-def print_and_save_to_string(*args, **kwargs):
-    print(*args, **kwargs)
-    output = io.StringIO()
-    print(*args, file=output, **kwargs)
-    contents = output.getvalue()
-    output.close()
-    return contents
+class NegotiationTurn:
+  """A record of one agent's response during a negotiation."""
+  def __init__(self, agent_index, response, offers, offer_utilities):
+    self.agent_index = agent_index
+    self.response = response
+    self.offers = offers
+    #(agent 1 utility, agent 2 utility) for each offer
+    self.offer_utilities = offer_utilities
+
+class NegotiationTrace:
+  """Structured record of a negotiation. Rendering to text is deferred to render()."""
+  def __init__(self, initial_offers, initial_utilities):
+    self.initial_offers = initial_offers
+    self.initial_utilities = initial_utilities
+    self.turns = []
+    #(action, agent 1 utility, agent 2 utility) for each action put on the table
+    self.actions_discussed = []
+
+  def render(self):
+    lines = ["Negotiation Begins", "=================="]
+    line = f"Agent 1 opens by asking Agent 2 for {offers_to_string(self.initial_offers)}.  "
+    utilities = self.initial_utilities
+
+    for turn in self.turns:
+      line += "".join(f"[{u1}:{u2}]  " for (u1, u2) in utilities)
+      lines.append(line)
+      line = ""
+
+      if turn.response == ResponseCategory.COUNTER:
+        line = f"Agent {turn.agent_index} counters with {offers_to_string(turn.offers)}.  "
+        utilities = turn.offer_utilities
+      elif turn.response == ResponseCategory.ACCEPT:
+        line = f"Agent {turn.agent_index} accepts {offers_to_string(turn.offers)}.  "
+        for (u1, u2) in turn.offer_utilities:
+          lines.append(line + f"[{u1}:{u2}] ")
+          line = ""
+      elif turn.response == ResponseCategory.REJECT:
+        lines.append(f"Agent {turn.agent_index} rejects. ")
+
+    lines.append(line + "==================")
+
+    for (action, u1, u2) in self.actions_discussed:
+      lines.append(f"[{action.val} => {u1}:{u2}]")
+
+    return "\n".join(lines) + "\n"
+
+  def __str__(self):
+    return self.render()
 
 class NegotiationState:
   def __init__(self, a1, a2, ask):
@@ -155,6 +222,9 @@ class NegotiationState:
     self.to_agent1 = []
     self.to_agent2 = []
 
+    #(agent, action key) => utility, shared by both agents for this negotiation
+    self.utility_cache = {}
+
   def setup_initial_ask(self, action : Action):
     self.initialAsk = action
     self.initialOffer = [ self.initialAsk ]
@@ -176,27 +246,26 @@ def get_initial_ask_options(agent1 : Agent, agent2 : Agent):
   agent2.negotiation_state = state
   return agent1.generate_starting_possible_actions()
 
-def print_negotiation_trace(agent1 : Agent, agent2 : Agent, initialAsk):
-    state : NegotiationState = agent1.negotiation_state
+def get_offer_utilities(agent1 : Agent, agent2 : Agent, offers : list):
+  return [(agent1.evaluate_offer(offer), agent2.evaluate_offer(offer)) for offer in offers]
 
+#runs the negotiation protocol one turn at a time, yielding after each turn so that
+#many negotiations can be interleaved. Returns (via StopIteration) the same result
+#and trace as run_negotiation.
+def iter_negotiation(agent1 : Agent, agent2 : Agent, initialAsk, record_trace : bool = True):
+    state : NegotiationState = agent1.negotiation_state
 
 		#Negotiation Protocol
     state.setup_initial_ask(initialAsk)
 
-    trace_string = ""
-
-    trace_string += print_and_save_to_string("Negotiation Begins")
-    trace_string += print_and_save_to_string("==================")
-    trace_string += print_and_save_to_string(f"Agent 1 opens by asking Agent 2 for {offers_to_string(state.currentOffers)}. ", end =" ")
-
-    actionsDiscussed = []
+    trace = None
+    if record_trace:
+      trace = NegotiationTrace(state.currentOffers, get_offer_utilities(agent1, agent2, state.currentOffers))
 
     while state.lastResult == ResponseCategory.COUNTER:
-      for offer in state.currentOffers:
-        trace_string += print_and_save_to_string(f"[{agent1.evaluate_offer(offer)}:{agent2.evaluate_offer(offer)}] ", end =" ")
-        actionsDiscussed += offer
-
-      trace_string += print_and_save_to_string()
+      if trace:
+        for offer in state.currentOffers:
+          trace.actions_discussed += [(a, agent1.get_utility(a), agent2.get_utility(a)) for a in offer]
 
       state.currentAgent = agent1 if state.currentAgentIndex == 1 else agent2
       counterOffers = []
@@ -207,38 +276,55 @@ def print_negotiation_trace(agent1 : Agent, agent2 : Agent, initialAsk):
 
       state.rejectedOffers += state.currentOffers
 
-      if state.lastResult == ResponseCategory.COUNTER:
-        trace_string += print_and_save_to_string(f"Agent {state.currentAgentIndex} counters with {offers_to_string(counterOffers)}. ", end = ' ')
-        state.currentOffers = counterOffers
-      elif state.lastResult == ResponseCategory.ACCEPT:
-        trace_string += print_and_save_to_string(f"Agent {state.currentAgentIndex} accepts {offers_to_string(counterOffers)}. ", end = ' ')
+      if state.lastResult in (ResponseCategory.COUNTER, ResponseCategory.ACCEPT):
         state.currentOffers = counterOffers
 
-        for offer in state.currentOffers:
-          trace_string += print_and_save_to_string(f"[{agent1.evaluate_offer(offer)}:{agent2.evaluate_offer(offer)}] ")
-
-      elif state.lastResult == ResponseCategory.REJECT:
-        trace_string += print_and_save_to_string(f"Agent {state.currentAgentIndex} rejects. ")
+      if trace:
+        offer_utilities = []
+        if state.lastResult != ResponseCategory.REJECT:
+          offer_utilities = get_offer_utilities(agent1, agent2, counterOffers)
+        trace.turns.append(NegotiationTurn(state.currentAgentIndex, state.lastResult, counterOffers, offer_utilities))
 
       state.currentAgentIndex = 2 if state.currentAgentIndex == 1 else 1
 
-    trace_string += print_and_save_to_string("==================")
-
-    for a in actionsDiscussed:
-      trace_string += print_and_save_to_string(f"[{a.val} => {agent1.evaluate_action(a)}:{agent2.evaluate_action(a)}]")
+      if state.lastResult == ResponseCategory.COUNTER:
+        yield state
 
     agent1.negotiation_state = state
     agent2.negotiation_state = state
-    return ((state.lastResult, state.currentOffers), trace_string)
+    return ((state.lastResult, state.currentOffers), trace)
+
+#runs the remaining turns of an iter_negotiation and returns its result and trace
+def complete_negotiation(turns):
+    while True:
+      try:
+        next(turns)
+      except StopIteration as stop:
+        return stop.value
+
+#runs the negotiation protocol without any console output. Returns the result and a
+#NegotiationTrace, or None for the trace when record_trace is False.
+def run_negotiation(agent1 : Agent, agent2 : Agent, initialAsk, record_trace : bool = True):
+    return complete_negotiation(iter_negotiation(agent1, agent2, initialAsk, record_trace))
+
+def print_negotiation_trace(agent1 : Agent, agent2 : Agent, initialAsk):
+    result, trace = run_negotiation(agent1, agent2, initialAsk)
+    trace_string = trace.render()
+    print(trace_string, end="")
+    return (result, trace_string)
 
 if __name__ == "__main__":
   agent1 = Agent()
   agent2 = Agent()
   print_negotiation_trace(agent1, agent2, agent1.ActionToAskFor)
 
-def negotiate(agent1, agent2, thing_to_ask_for):
-    result, trace_string = print_negotiation_trace(agent1, agent2, thing_to_ask_for)
+#the accepted offer of a finished negotiation, or [] if it was rejected
+def get_agreement(result):
     if result[0] == ResponseCategory.ACCEPT:
-        return result[1][0], trace_string
+        return result[1][0]
     else:
-        return [], trace_string
+        return []
+
+def negotiate(agent1, agent2, thing_to_ask_for, record_trace = True):
+    result, trace = run_negotiation(agent1, agent2, thing_to_ask_for, record_trace)
+    return get_agreement(result), trace
@@ -1,123 +1,373 @@
+import copy
 import types
-from typing import List
+from array import array
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple, Type
 import random
+import zlib
 
-from neighborly import GameObject
-from neighborly.core.relationship import Relationship
+from neighborly import GameObject, World
 
 from neighborly.core.roles import Role, RoleList
-from neighborly.core.relationship import get_relationship
+from neighborly.core.life_event import AllEvents, LifeEvent, RandomLifeEvent
+from neighborly.core.relationship import RelationshipManager
 
 from speakeasy.negotiation.core import Action, Agent, ResponseCategory
 from speakeasy.events import GainItemEffect, LoseItemEffect, GainKnowledgeEffect, GainRelationshipEffect, LoseRelationshipEffect, get_associated_business
-from speakeasy.components import Respect, Favors, Produces, Inventory
+from speakeasy.components import Respect, Favors, Inventory
+from speakeasy.resources import Market, NegotiationRandom
+from speakeasy.negotiation.offload import NegotiationSnapshot
+from speakeasy.negotiation.scheduler import NegotiationBatch
 from speakeasy.events import TradeEvent, GoodWordEvent, GiveEvent, TellAboutEvent
 
 supported_actions = [TradeEvent, GoodWordEvent, GiveEvent, TellAboutEvent]
 
-def check_item_possibility(self_object, other_object, offers_so_far, potential_action):
-    self_inventory = self_object.get_component(Inventory)
-    other_inventory = other_object.get_component(Inventory)
+def get_event_key(event: RandomLifeEvent) -> Hashable:
+    """Identify an event by its type, role bindings, and the items it moves."""
+    roles = tuple(
+        (role.name, role.gameobject.uid if role.gameobject else None)
+        for role in event.iter_roles()
+    )
+    items = tuple(
+        getattr(event, attr, None) for attr in ("initiators_item", "others_item", "item")
+    )
+    return (type(event).__name__, roles, items)
+
+#World methods that a DryRunWorld refuses to forward
+_WORLD_MUTATORS = frozenset((
+    "spawn_gameobject",
+    "delete_gameobject",
+    "add_component",
+    "remove_component",
+    "register_component",
+    "add_resource",
+    "remove_resource",
+    "add_system",
+    "remove_system",
+    "step",
+))
+
+class DryRunWorld:
+    """A read-only view of a world for binding candidate events.
+
+    The view hands out its own random number generator in place of the world's, so
+    binding roles does not advance the simulation's random state. Methods that would
+    add or remove GameObjects, components, resources, or systems raise a RuntimeError.
+    """
+
+    __slots__ = "_world", "_rng"
+
+    def __init__(self, world: World, rng: random.Random) -> None:
+        self._world = world
+        self._rng = rng
+
+    def get_resource(self, resource_type: Type[Any]) -> Any:
+        if resource_type is random.Random:
+            return self._rng
+        return self._world.get_resource(resource_type)
+
+    def try_resource(self, resource_type: Type[Any]) -> Any:
+        if resource_type is random.Random:
+            return self._rng
+        return self._world.try_resource(resource_type)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _WORLD_MUTATORS:
+            raise RuntimeError(f"Can not call World.{name}() during a dry run.")
+        return getattr(self._world, name)
+
+class EventCandidate:
+    """A life event bound during a dry run that has not happened (yet).
+
+    The event does not have an event ID of its own, so candidates compare and hash by
+    their event keys. commit() creates the real event (with an ID) and executes it.
+    """
+
+    __slots__ = "event", "key"
+
+    def __init__(self, event: RandomLifeEvent) -> None:
+        self.event = event
+        self.key = get_event_key(event)
+
+    def get_effects(self) -> Dict[Role, List[Any]]:
+        return self.event.get_effects()
+
+    def get_priority(self) -> float:
+        return self.event.get_priority()
+
+    def iter_roles(self) -> Iterator[Role]:
+        return self.event.iter_roles()
+
+    def commit(self, world: World) -> RandomLifeEvent:
+        """Carry out the event, as a copy with a newly allocated event ID.
+
+        The ID is only allocated here, when the event is added to AllEvents and
+        executed, so candidates that are never agreed upon do not use up IDs.
+
+        Parameters
+        ----------
+        world
+            The world to record and execute the event in.
+
+        Returns
+        -------
+        RandomLifeEvent
+            The executed event.
+        """
+        event = copy.copy(self.event)
+        event._uid = LifeEvent._next_event_id  # type: ignore
+        LifeEvent._next_event_id += 1  # type: ignore
+        world.get_resource(AllEvents).append(event)
+        event.execute()
+        return event
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, EventCandidate) and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __str__(self) -> str:
+        return str(self.event)
+
+    def __repr__(self) -> str:
+        return f"EventCandidate({self.event!r})"
+
+def dry_run(
+    event_type: Type[RandomLifeEvent],
+    world: World,
+    bindings: RoleList,
+    rng: random.Random,
+) -> Optional[EventCandidate]:
+    """Bind an event's roles without changing the world.
+
+    Parameters
+    ----------
+    event_type
+        The type of event to bind.
+    world
+        The world to check preconditions against.
+    bindings
+        Roles to bind, like the bindings given to instantiate().
+    rng
+        The random number generator to make choices with (instead of the world's).
+
+    Returns
+    -------
+    EventCandidate or None
+        The bound event, or None if its preconditions are not met.
+    """
+    next_event_id = LifeEvent._next_event_id  # type: ignore
+    try:
+        view = DryRunWorld(world, rng)
+        event = event_type.instantiate(view, bindings)  # type: ignore
+    finally:
+        LifeEvent._next_event_id = next_event_id  # type: ignore
+
+    if event is None:
+        return None
+
+    return EventCandidate(event)
+
+def get_favors(world: World, owner: int, target: int) -> int:
+    """Return the favors of a relationship without creating it (0 if it is missing)."""
+    outgoing = world.get_gameobject(owner).get_component(RelationshipManager).outgoing
+    if target not in outgoing:
+        return 0
+    return world.get_gameobject(outgoing[target]).get_component(Favors).favors
+
+def get_item_losses(action: Action) -> Dict[Tuple[int, str], int]:
+    """Return how many of each item each party loses to an action.
+
+    Only losses are counted. Counting gains too would let an offer pay for an item
+    with an item that one of its other actions hands over, which makes for really
+    dumb trades.
+    """
+    losses: Dict[Tuple[int, str], int] = {}
+    for role, effects in action.val.get_effects().items():
+        for effect in effects:
+            if type(effect) is LoseItemEffect:
+                key = (role.gameobject.uid, effect.item)
+                losses[key] = losses.get(key, 0) + 1
+    return losses
+
+class OfferLedger:
+    """The running net item losses of the parties to an offer.
+
+    The ledger is updated as actions are appended or popped, so checking whether
+    one more action is affordable compares one inventory quantity per item the
+    action takes away, no matter how long the offer is.
+    """
+
+    __slots__ = "world", "actions", "losses"
+
+    def __init__(self, world: World) -> None:
+        self.world = world
+        self.actions: List[Action] = []
+        #(GameObject ID, item) => quantity lost by the actions in the offer
+        self.losses: Dict[Tuple[int, str], int] = {}
+
+    def append(self, action: Action) -> None:
+        self.actions.append(action)
+        for key, quantity in get_item_losses(action).items():
+            self.losses[key] = self.losses.get(key, 0) + quantity
+
+    def pop(self) -> Action:
+        action = self.actions.pop()
+        for key, quantity in get_item_losses(action).items():
+            remaining = self.losses[key] - quantity
+            if remaining:
+                self.losses[key] = remaining
+            else:
+                del self.losses[key]
+        return action
+
+    def sync(self, offer: 'list[Action]') -> None:
+        """Pop and append actions until the ledger matches an offer."""
+        shared = 0
+        for ours, theirs in zip(self.actions, offer):
+            if ours != theirs:
+                break
+            shared += 1
+
+        while len(self.actions) > shared:
+            self.pop()
+
+        for action in offer[shared:]:
+            self.append(action)
+
+    def get_available(self, uid: int, item: str) -> int:
+        inventory = self.world.get_gameobject(uid).try_component(Inventory)
+        return inventory.get_quantity(item) if inventory else 0
+
+    def is_affordable(self) -> bool:
+        """Can every party afford to lose the items the offer takes from them?"""
+        return all(
+            quantity <= self.get_available(uid, item)
+            for (uid, item), quantity in self.losses.items()
+        )
+
+    def can_append(self, action: Action) -> bool:
+        """Can the parties afford the action's losses on top of an affordable offer?"""
+        for (uid, item), quantity in get_item_losses(action).items():
+            lost = self.losses.get((uid, item), 0) + quantity
+            if lost > self.get_available(uid, item):
+                return False
+        return True
 
-    self_net_item_dict = {}
-    other_net_item_dict = {}
-
-    #calculate the net gain or loss of items resulting from the current offer + potential action
-
-    list_of_actions = []
-    list_of_actions.extend(offers_so_far[0])
-    list_of_actions.append(potential_action)
-
-    for action in list_of_actions:
-        effects_dict = action.val.get_effects()
-
-        for role in effects_dict.keys():
-            if role.gameobject == self_object:
-                chosen_dict = self_net_item_dict
-            elif role.gameobject == other_object:
-                chosen_dict = other_net_item_dict
-
-            effects = effects_dict[role]
-            for effect in effects:
-                if type(effect) in [LoseItemEffect]: #don't consider gain as that can crete really dumb trades
-                    item_delta = 1 if effect is GainItemEffect else -1
-                    if effect.item not in chosen_dict:
-                        chosen_dict[effect.item] = item_delta
-                    else:
-                        chosen_dict[effect.item] = item_delta + chosen_dict[effect.item]
-
-    #make sure its possible to lose that many items
-
-    #print(self_net_item_dict)
-    #print(other_net_item_dict)
-
-    for item in self_net_item_dict:
-        amount = self_net_item_dict[item]
-        #print(item, amount, self_inventory.get_quantity(item), not (amount < 0 and self_inventory.get_quantity(item) < -amount))
-        if amount < 0 and self_inventory.get_quantity(item) < -amount:
-            return False
-
-    for item in other_net_item_dict:
-        amount = other_net_item_dict[item]
-        #print(item, amount, other_inventory.get_quantity(item), not (amount < 0 and other_inventory.get_quantity(item) < -amount))
-        if amount < 0 and other_inventory.get_quantity(item) < -amount:
-            return False
-
-    return True
 class NeighborlyNegotiator(Agent):
-    def __init__(self, name: str, game_object : GameObject, seeded_random) -> None:
+    def __init__(
+        self,
+        name: str,
+        game_object : GameObject,
+        seeded_random,
+        batch: Optional[NegotiationBatch] = None,
+    ) -> None:
         super().__init__(seeded_random)
         self.name = name
         self.gameObject = game_object
+        #negotiations in a batch share utilities and candidate actions
+        self.batch = batch
+        #salt for the deterministic utility noise of this agent (per character in batches),
+        #drawn from a generator of its own so that setting up negotiations leaves the
+        #world's random state alone
+        noise_random = game_object.world.get_resource(NegotiationRandom)
+        if batch is None:
+            self.noise_salt = noise_random.getrandbits(32)
+        else:
+            self.noise_salt = batch.get_noise_salt(game_object.uid, noise_random)
+        #forked generator for binding candidate actions without using the world's
+        self.dry_run_random = random.Random(self.noise_salt)
+        #net item losses of the offer on the table, kept in sync between enumerations
+        self.offer_ledger = OfferLedger(game_object.world)
         #overload the negotiation functions
         #self.agent.evaluate_action = types.MethodType(self.evaluate_action_ov, self)
         #self.agent.generate_starting_possible_actions = types.MethodType(self.generate_starting_possible_actions_ov, self)
         #self.agent.parent = self
 
-    def generate_starting_possible_actions(self) -> 'list[Action]':
-        possible_actions: List[Action] = []
-        partner : NeighborlyNegotiator = self.negotiation_state.get_partner(self)
+    #bind every supported action between this agent and a partner (in dry runs)
+    def bind_candidates(self, partner: 'NeighborlyNegotiator') -> 'list[Action]':
+        candidates: List[Action] = []
 
-        #print(f'enumerating actions for {self.gameObject.get_component(GameCharacter).first_name}')
+        def bind(action, *roles):
+            world = self.gameObject.world
+            if candidate := dry_run(action, world, RoleList(roles), self.dry_run_random):
+                candidates.append(Action(candidate))
 
         for action in supported_actions:
             if action in [GiveEvent, TradeEvent]:
-                if event := action.instantiate(self.gameObject.world, RoleList([Role("Initiator", self.gameObject), Role("Other", partner.gameObject)])):
-                    if check_item_possibility(self.gameObject, partner.gameObject, self.negotiation_state.currentOffers, Action(event)):
-                        possible_actions.append(Action(event))
-                        #print(f'they can ask for {action.__name__}: {self.evaluate_action(Action(event))}')
-                if event := action.instantiate(self.gameObject.world, RoleList([Role("Initiator", partner.gameObject), Role("Other", self.gameObject)])):
-                    if check_item_possibility(self.gameObject, partner.gameObject, self.negotiation_state.currentOffers, Action(event)):
-                        possible_actions.append(Action(event))
-                        #print(f'they can ask for {action.__name__}: {self.evaluate_action(Action(event))}')
+                bind(action, Role("Initiator", self.gameObject), Role("Other", partner.gameObject))
+                bind(action, Role("Initiator", partner.gameObject), Role("Other", self.gameObject))
 
             if action in [GoodWordEvent]:
-                if event := action.instantiate(self.gameObject.world, RoleList([Role("Initiator", partner.gameObject), Role("Subject", self.gameObject), Role("Other", None)])):
-                    possible_actions.append(Action(event))
-                    #print(f'they can ask for {action.__name__}: {self.evaluate_action(Action(event))}')
+                bind(action, Role("Initiator", partner.gameObject), Role("Subject", self.gameObject), Role("Other", None))
             if action in [TellAboutEvent]:
-                if event := action.instantiate(self.gameObject.world, RoleList([Role("Initiator", partner.gameObject), Role("Subject", self.gameObject), Role("Other", None)])):
-                    possible_actions.append(Action(event))
-                    #print(f'they can ask for {action.__name__}: {self.evaluate_action(Action(event))}')
-                if event := action.instantiate(self.gameObject.world, RoleList([Role("Initiator", partner.gameObject), Role("Subject", None), Role("Other", self.gameObject)])):
-                    possible_actions.append(Action(event))
-                    #print(f'they can ask for {action.__name__}: {self.evaluate_action(Action(event))}')
+                bind(action, Role("Initiator", partner.gameObject), Role("Subject", self.gameObject), Role("Other", None))
+                bind(action, Role("Initiator", partner.gameObject), Role("Subject", None), Role("Other", self.gameObject))
 
             #...others here...
 
-        possible_actions = [p for p in possible_actions if self.evaluate_action(p) > 0 and p not in self.negotiation_state.currentOffers[0]]
+        return candidates
+
+    def generate_starting_possible_actions(self) -> 'list[Action]':
+        partner : NeighborlyNegotiator = self.negotiation_state.get_partner(self)
+
+        #print(f'enumerating actions for {self.gameObject.get_component(GameCharacter).first_name}')
+
+        #the world does not change during a batch, so a pair's candidates are bound once
+        if self.batch is None:
+            candidates = self.bind_candidates(partner)
+        else:
+            key = (self.gameObject.uid, partner.gameObject.uid)
+            if key not in self.batch.candidate_table:
+                self.batch.candidate_table[key] = self.bind_candidates(partner)
+            candidates = self.batch.candidate_table[key]
+
+        ledger = self.offer_ledger
+        ledger.sync(self.negotiation_state.currentOffers[0])
+        affordable = ledger.is_affordable()
+
+        #actions that take items must be affordable on top of the offer on the table
+        possible_actions = [
+            c for c in candidates
+            if not get_item_losses(c) or (affordable and ledger.can_append(c))
+        ]
+
+        possible_actions = [p for p in possible_actions if self.get_utility(p) > 0 and p not in self.negotiation_state.currentOffers[0]]
         #print(f'{len(possible_actions)} are pos')
         return possible_actions
 
+    def get_utility(self, action: Action) -> int:
+        if self.batch is None:
+            return super().get_utility(action)
+
+        utility_table = self.batch.utility_table
+        key = (self.gameObject.uid, self.get_action_key(action))
+        if key not in utility_table:
+            utility_table[key] = self.evaluate_action(action)
+        return utility_table[key]
+
+    def get_action_key(self, action: Action) -> Hashable:
+        return action.val.key
+
+    def freeze_offer(self, offer: 'list[Action]') -> Hashable:
+        return tuple(action.val.key for action in offer)
+
+    #stable pseudo-random utility in [0, 3] for an item moved by an action
+    def get_utility_noise(self, action: Action, item: Optional[str]) -> int:
+        seed_str = repr((self.noise_salt, self.get_action_key(action), item))
+        return zlib.crc32(seed_str.encode()) % 4
+
     #evaluate action (evaluator, verb, subject, object, verbbenefitfor_subject, verbbenefitfor_object):
     def evaluate_action(self, action : Action) -> int:
         neighborly_action_priority = action.val.get_priority()
         effects_dict = action.val.get_effects()
 
+        market = self.gameObject.world.get_resource(Market)
+
         biz = get_associated_business(self.gameObject)
-        prod = None
+        required_items = frozenset()
         if biz:
-            prod = biz.gameobject.get_component(Produces)
+            required_items = market.get_required_items(biz.gameobject.uid)
 
         utility = 0
 
@@ -134,23 +384,23 @@ class NeighborlyNegotiator(Agent):
                     utility += 1 * sign
                     used_rational_util = False
                     if biz:
-                        if effect.item in prod.requires:
+                        if effect.item in required_items:
                             utility += 4 * sign
                             used_rational_util = True
                         #elif effect.item in prod.produces:
                             #utility -= 1 * sign
 
                     if not used_rational_util:
-                        utility += self.gameObject.world.get_resource(random.Random).randint(0, 3) * sign
+                        utility += self.get_utility_noise(action, effect.item) * sign
 
                     continue
 
                 elif type(effect) in [GainRelationshipEffect, LoseRelationshipEffect]:
                     sign = 1 if type(effect) is GainRelationshipEffect else -1
-                    target = effect.relationship.get_component(Relationship).target
-                    owner = effect.relationship.get_component(Relationship).owner
-                    target_obj = self.gameObject.world.get_gameobject(target)
-                    owner_obj = self.gameObject.world.get_gameobject(owner)
+                    world = self.gameObject.world
+                    target = effect.target
+                    owner = effect.owner
+                    owner_obj = world.get_gameobject(owner)
 
                     utility += 1 * sign
                     if effect.facet == Respect:
@@ -158,8 +408,7 @@ class NeighborlyNegotiator(Agent):
                         if target == self.gameObject.uid:
                             other_biz = get_associated_business(owner_obj)
                             if other_biz and biz:
-                                other_prod = other_biz.gameobject.get_component(Produces)
-                                if True in [x in other_prod.produces for x in prod.requires]:
+                                if market.produces_any(other_biz.gameobject.uid, required_items):
                                     utility += 1 * sign
 
                     #gaining favors is considered bad, losing is considered REALLY good (only if you actually owe them a Favor, in which case its bad the more Favors they owe you)
@@ -167,8 +416,8 @@ class NeighborlyNegotiator(Agent):
                         i_own_the_debt = owner == self.gameObject.uid
 
                         if i_own_the_debt:
-                            favors_they_owe_me = effect.relationship.get_component(Favors).favors
-                            favors_i_owe_them = get_relationship(target_obj, owner_obj).get_component(Favors).favors
+                            favors_they_owe_me = get_favors(world, owner, target)
+                            favors_i_owe_them = get_favors(world, target, owner)
 
                             #me no longer owing a favor is usually good
                             if type(effect) is LoseRelationshipEffect:
@@ -179,8 +428,8 @@ class NeighborlyNegotiator(Agent):
                                 utility -= favors_i_owe_them * 2
 
                         else:
-                            favors_i_owe_them = effect.relationship.get_component(Favors).favors
-                            favors_they_owe_me = get_relationship(target_obj, owner_obj).get_component(Favors).favors
+                            favors_i_owe_them = get_favors(world, owner, target)
+                            favors_they_owe_me = get_favors(world, target, owner)
 
                             #them no longer owing me a favor is fine
                             if type(effect) is LoseRelationshipEffect:
@@ -193,7 +442,86 @@ class NeighborlyNegotiator(Agent):
                         #print(f"GoodWord: {utility}, I-own:{i_own_the_debt}, favors-i-owe:{favors_i_owe_them}, favors-they-owe:{favors_they_owe_me}")
 
                 elif type(effect) is GainKnowledgeEffect:
-                    if biz and effect.item in prod.requires:
+                    if biz and effect.item in required_items:
                         utility += 2 #knowledge is power or whatever
             
         return utility * neighborly_action_priority
+
+def take_snapshot(
+    negotiator: NeighborlyNegotiator,
+    partner: NeighborlyNegotiator,
+    initial_ask: Action,
+    record_trace: bool,
+) -> Tuple[NegotiationSnapshot, List[Action]]:
+    """Pack a batched negotiation into a NegotiationSnapshot for search_agreement().
+
+    Parameters
+    ----------
+    negotiator
+        The agent that asks first (its batch must not be None).
+    partner
+        The other agent.
+    initial_ask
+        The action that the negotiator asks for.
+    record_trace
+        Should the search record a NegotiationTrace.
+
+    Returns
+    -------
+    Tuple[NegotiationSnapshot, List[Action]]
+        The snapshot and the actions that its indices refer to.
+    """
+    batch = negotiator.batch
+    assert batch is not None, "Only batched negotiations can be snapshotted."
+
+    actions: List[Action] = []
+    indices: Dict[Hashable, int] = {}
+
+    def get_index(action: Action) -> int:
+        key = action.val.key
+        if key not in indices:
+            indices[key] = len(actions)
+            actions.append(action)
+        return indices[key]
+
+    ask = get_index(initial_ask)
+
+    candidates = []
+    for agent, other in ((negotiator, partner), (partner, negotiator)):
+        key = (agent.gameObject.uid, other.gameObject.uid)
+        if key not in batch.candidate_table:
+            batch.candidate_table[key] = agent.bind_candidates(other)
+        candidates.append(array("q", map(get_index, batch.candidate_table[key])))
+
+    utilities = [
+        array("q", (agent.get_utility(action) for action in actions))
+        for agent in (negotiator, partner)
+    ]
+
+    slots: Dict[Tuple[int, str], int] = {}
+    loss_offsets = array("q", [0])
+    loss_slots = array("q")
+    loss_quantities = array("q")
+    for action in actions:
+        for key, quantity in get_item_losses(action).items():
+            loss_slots.append(slots.setdefault(key, len(slots)))
+            loss_quantities.append(quantity)
+        loss_offsets.append(len(loss_slots))
+
+    ledger = negotiator.offer_ledger
+    available = array("q", (ledger.get_available(uid, item) for uid, item in slots))
+
+    snapshot = NegotiationSnapshot(
+        initial_ask=ask,
+        candidates=(candidates[0], candidates[1]),
+        utilities=(utilities[0], utilities[1]),
+        loss_offsets=loss_offsets,
+        loss_slots=loss_slots,
+        loss_quantities=loss_quantities,
+        available=available,
+        max_counter_offers=negotiator.max_counter_offers,
+        search_budget=negotiator.search_budget,
+        record_trace=record_trace,
+    )
+
+    return snapshot, actions
@@ -0,0 +1,226 @@
+"""Negotiation searches that run outside of the simulation (e.g., in worker processes).
+
+During a NegotiationBatch, the world does not change, so a negotiation only depends on
+the candidate actions of its two agents, their utilities, and the items that the
+candidates take from each party. take_snapshot() in neighborly_classes packs these
+into a NegotiationSnapshot of plain arrays that refer to candidates by index.
+search_agreement() runs the negotiation protocol on a snapshot. It only imports
+speakeasy.negotiation.core and returns the same result (in indices) as running the
+protocol on the agents themselves, so it can run in any process.
+"""
+
+from array import array
+from typing import Any, List, Optional, Tuple
+
+from speakeasy.negotiation.core import (
+    Action,
+    Agent,
+    NegotiationState,
+    NegotiationTrace,
+    complete_negotiation,
+    iter_negotiation,
+)
+
+
+class NegotiationSnapshot:
+    """Everything needed to run a negotiation, with candidate actions as indices."""
+
+    __slots__ = (
+        "initial_ask",
+        "candidates",
+        "utilities",
+        "loss_offsets",
+        "loss_slots",
+        "loss_quantities",
+        "available",
+        "max_counter_offers",
+        "search_budget",
+        "record_trace",
+    )
+
+    initial_ask: int
+    """The index of the action that the first agent asks for."""
+
+    candidates: Tuple["array[int]", "array[int]"]
+    """The indices of each agent's candidate actions in the order they were bound."""
+
+    utilities: Tuple["array[int]", "array[int]"]
+    """The utility of every action (by index) to each agent."""
+
+    loss_offsets: "array[int]"
+    """Action i takes the items in loss_slots[loss_offsets[i]:loss_offsets[i + 1]]."""
+
+    loss_slots: "array[int]"
+    """Indices into available of the (party, item) pairs that actions take."""
+
+    loss_quantities: "array[int]"
+    """How many of each (party, item) in loss_slots an action takes."""
+
+    available: "array[int]"
+    """The quantity of each (party, item) pair in the party's inventory."""
+
+    max_counter_offers: Optional[int]
+    """The agents' cap on the number of counter-offers (None means no cap)."""
+
+    search_budget: Optional[int]
+    """The agents' cap on the actions considered per search (None means no cap)."""
+
+    record_trace: bool
+    """Should the search record a NegotiationTrace."""
+
+    def __init__(
+        self,
+        initial_ask: int,
+        candidates: Tuple["array[int]", "array[int]"],
+        utilities: Tuple["array[int]", "array[int]"],
+        loss_offsets: "array[int]",
+        loss_slots: "array[int]",
+        loss_quantities: "array[int]",
+        available: "array[int]",
+        max_counter_offers: Optional[int],
+        search_budget: Optional[int],
+        record_trace: bool,
+    ) -> None:
+        self.initial_ask = initial_ask
+        self.candidates = candidates
+        self.utilities = utilities
+        self.loss_offsets = loss_offsets
+        self.loss_slots = loss_slots
+        self.loss_quantities = loss_quantities
+        self.available = available
+        self.max_counter_offers = max_counter_offers
+        self.search_budget = search_budget
+        self.record_trace = record_trace
+
+    def get_losses(self, action: int) -> List[Tuple[int, int]]:
+        """Return the (slot, quantity) pairs of the items an action takes."""
+        start, end = self.loss_offsets[action], self.loss_offsets[action + 1]
+        return list(zip(self.loss_slots[start:end], self.loss_quantities[start:end]))
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, attr) for attr in NegotiationSnapshot.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for attr, value in zip(NegotiationSnapshot.__slots__, state):
+            setattr(self, attr, value)
+
+
+class SnapshotAgent(Agent):
+    """An agent whose actions are candidate indices into a NegotiationSnapshot.
+
+    It mirrors NeighborlyNegotiator: starting actions are the agent's candidates with
+    positive utility that are not in the offer on the table, and actions that take
+    items must be affordable on top of that offer.
+    """
+
+    def __init__(self, snapshot: NegotiationSnapshot, index: int) -> None:
+        # Agent.__init__ draws random utilities for its letter actions, which would
+        # advance the global random number generator, so it is not called
+        self.snapshot = snapshot
+        self.candidates = snapshot.candidates[index]
+        self.utilities = snapshot.utilities[index]
+        self.parent = None
+        self.negotiation_state = None
+        self.max_counter_offers = snapshot.max_counter_offers
+        self.search_budget = snapshot.search_budget
+
+    def generate_starting_possible_actions(self) -> "list[Action]":
+        snapshot = self.snapshot
+        offer = self.negotiation_state.currentOffers[0]
+
+        taken = {}
+        for action in offer:
+            for slot, quantity in snapshot.get_losses(action.val):
+                taken[slot] = taken.get(slot, 0) + quantity
+
+        available = snapshot.available
+        affordable = all(
+            quantity <= available[slot] for slot, quantity in taken.items()
+        )
+
+        possible_actions = []
+        for candidate in self.candidates:
+            losses = snapshot.get_losses(candidate)
+            if losses and not (
+                affordable
+                and all(
+                    taken.get(slot, 0) + quantity <= available[slot]
+                    for slot, quantity in losses
+                )
+            ):
+                continue
+            possible_actions.append(Action(candidate))
+
+        return [
+            p for p in possible_actions if self.get_utility(p) > 0 and p not in offer
+        ]
+
+
+def search_agreement(
+    snapshot: NegotiationSnapshot,
+) -> Tuple[Tuple[Any, List[List[int]]], Optional[NegotiationTrace]]:
+    """Run the negotiation protocol on a snapshot.
+
+    Parameters
+    ----------
+    snapshot
+        The negotiation to run.
+
+    Returns
+    -------
+    Tuple[Tuple[Any, List[List[int]]], Optional[NegotiationTrace]]
+        The final response category and offers (as lists of action indices), and the
+        trace (whose actions are indices too) if one was recorded.
+    """
+    agent1 = SnapshotAgent(snapshot, 0)
+    agent2 = SnapshotAgent(snapshot, 1)
+
+    state = NegotiationState(agent1, agent2, None)
+    agent1.negotiation_state = state
+    agent2.negotiation_state = state
+
+    (response, offers), trace = complete_negotiation(
+        iter_negotiation(
+            agent1, agent2, Action(snapshot.initial_ask), snapshot.record_trace
+        )
+    )
+
+    return (response, [[a.val for a in offer] for offer in offers]), trace
+
+
+def restore_actions(
+    result: Tuple[Any, List[List[int]]],
+    trace: Optional[NegotiationTrace],
+    actions: List[Action],
+) -> Tuple[Tuple[Any, List[List[Action]]], Optional[NegotiationTrace]]:
+    """Replace the action indices in the output of search_agreement() with actions.
+
+    Parameters
+    ----------
+    result
+        The final response category and offers returned by search_agreement().
+    trace
+        The trace returned by search_agreement().
+    actions
+        The actions that the snapshot's indices refer to.
+
+    Returns
+    -------
+    Tuple[Tuple[Any, List[List[Action]]], Optional[NegotiationTrace]]
+        The result and trace in the same form as run_negotiation() returns them.
+    """
+
+    def restore(offers: List[List[Action]]) -> List[List[Action]]:
+        return [[actions[a.val] for a in offer] for offer in offers]
+
+    response, offers = result
+
+    if trace is not None:
+        trace.initial_offers = restore(trace.initial_offers)
+        for turn in trace.turns:
+            turn.offers = restore(turn.offers)
+        trace.actions_discussed = [
+            (actions[a.val], u1, u2) for (a, u1, u2) in trace.actions_discussed
+        ]
+
+    return (response, [[actions[i] for i in offer] for offer in offers]), trace
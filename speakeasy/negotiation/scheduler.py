@@ -0,0 +1,194 @@
+"""Batched scheduling of the negotiations that start during a simulation step.
+
+By default, each NegotiateEvent runs its whole negotiation as soon as it executes.
+When a world has a NegotiationBatch resource, NegotiateEvents only submit themselves
+to it. NegotiationSystem then runs every negotiation submitted during the step in one
+batch, at the end of the step:
+
+1. Each negotiation is set up in the order it was submitted.
+2. Protocol turns are interleaved, one turn of each unfinished negotiation per round.
+   Nothing in the world changes while they run, so the candidate actions between two
+   characters are only bound once, and the utility of an action for a character is
+   computed once and shared by all of that character's negotiations.
+3. Agreements are committed in the order negotiations were submitted. An agreement
+   that asks someone for items they no longer have (because an earlier agreement in
+   the batch took them) is dropped, as if no agreement was reached.
+
+A NegotiationBatch with workers > 0 runs step 2 in a pool of worker processes instead.
+Each negotiation is packed into a NegotiationSnapshot of its agents' candidates,
+utilities, and item losses, searched by a worker, and its agreement is committed on
+the main process as in step 3. Since the world is frozen during the batch, the results
+are the same as running the batch in-process.
+"""
+
+import random
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Generator, Hashable, List, Optional, Tuple
+
+from neighborly.systems import System
+
+from speakeasy.negotiation.core import iter_negotiation
+
+
+class NegotiationBatch:
+    """Negotiations that were started during the current simulation step."""
+
+    __slots__ = (
+        "pending",
+        "utility_table",
+        "candidate_table",
+        "noise_salts",
+        "workers",
+        "_executor",
+        "_finalizer",
+        "__weakref__",
+    )
+
+    pending: List[Any]
+    """NegotiateEvents in the order that they were submitted."""
+
+    utility_table: Dict[Tuple[int, Hashable], int]
+    """(character ID, action key) mapped to the action's utility to the character."""
+
+    candidate_table: Dict[Tuple[int, int], List[Any]]
+    """(character ID, partner ID) mapped to the candidate actions bound between them."""
+
+    noise_salts: Dict[int, int]
+    """Character IDs mapped to the salt of their utility noise for this batch."""
+
+    workers: int
+    """The number of worker processes that search for agreements (0 runs in-process)."""
+
+    _executor: Optional[Executor]
+    """The pool of worker processes (created the first time it is needed)."""
+
+    _finalizer: Optional[weakref.finalize]
+    """Shuts the pool down when called, or when the batch is garbage collected."""
+
+    def __init__(self, workers: int = 0) -> None:
+        self.pending = []
+        self.utility_table = {}
+        self.candidate_table = {}
+        self.noise_salts = {}
+        self.workers = workers
+        self._executor = None
+        self._finalizer = None
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        # The process pool cannot be pickled, so checkpoints recreate it on demand
+        return (
+            self.pending,
+            self.utility_table,
+            self.candidate_table,
+            self.noise_salts,
+            self.workers,
+        )
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        (
+            self.pending,
+            self.utility_table,
+            self.candidate_table,
+            self.noise_salts,
+            self.workers,
+        ) = state
+        self._executor = None
+        self._finalizer = None
+
+    def submit(self, event: Any) -> None:
+        """Queue a NegotiateEvent to run with the rest of the batch."""
+        self.pending.append(event)
+
+    def get_noise_salt(self, uid: int, rng: random.Random) -> int:
+        """Return a character's utility noise salt, drawing it the first time."""
+        if uid not in self.noise_salts:
+            self.noise_salts[uid] = rng.getrandbits(32)
+        return self.noise_salts[uid]
+
+    def run(self) -> None:
+        """Run and commit all the pending negotiations."""
+        pending, self.pending = self.pending, []
+
+        negotiations = [(event, event.start_negotiation(self)) for event in pending]
+        negotiations = [(event, setup) for event, setup in negotiations if setup]
+
+        if self.workers > 0:
+            results = self._search_in_workers([setup for _, setup in negotiations])
+        else:
+            results = self._search_in_process([setup for _, setup in negotiations])
+
+        for (event, _), result in zip(negotiations, results):
+            event.finish_negotiation(*result)
+
+        self.utility_table.clear()
+        self.candidate_table.clear()
+        self.noise_salts.clear()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started.
+
+        A batch that is garbage collected (or alive at exit) stops its workers too, but
+        the world keeps it alive until then, so simulations should call this when they
+        finish.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        self._executor = None
+        self._finalizer = None
+
+    @staticmethod
+    def _search_in_process(setups: List[Tuple[Any, ...]]) -> List[Any]:
+        """Run negotiations with their protocol turns interleaved."""
+        negotiations: List[Generator[Any, None, Any]] = [
+            iter_negotiation(*setup) for setup in setups
+        ]
+
+        results: List[Any] = [None] * len(negotiations)
+        active = list(range(len(negotiations)))
+
+        while active:
+            unfinished: List[int] = []
+            for i in active:
+                try:
+                    next(negotiations[i])
+                    unfinished.append(i)
+                except StopIteration as stop:
+                    results[i] = stop.value
+            active = unfinished
+
+        return results
+
+    def _search_in_workers(self, setups: List[Tuple[Any, ...]]) -> List[Any]:
+        """Run negotiations from snapshots in the pool of worker processes."""
+        # neighborly_classes imports this module through speakeasy.events
+        from speakeasy.negotiation.neighborly_classes import take_snapshot
+        from speakeasy.negotiation.offload import restore_actions, search_agreement
+
+        snapshots = [take_snapshot(*setup) for setup in setups]
+
+        if len(snapshots) < 2:
+            # Not worth the inter-process round trip
+            found = [search_agreement(snapshot) for snapshot, _ in snapshots]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._finalizer = weakref.finalize(self, self._executor.shutdown)
+            found = list(
+                self._executor.map(search_agreement, [s for s, _ in snapshots])
+            )
+
+        return [
+            restore_actions(result, trace, actions)
+            for (result, trace), (_, actions) in zip(found, snapshots)
+        ]
+
+
+class NegotiationSystem(System):
+    """Runs the negotiations submitted to the world's NegotiationBatch."""
+
+    sys_group = "late-update"
+
+    def run(self, *args: Any, **kwargs: Any) -> None:
+        if batch := self.world.try_resource(NegotiationBatch):
+            batch.run()
@@ -2,16 +2,29 @@ import os
 import pathlib
 from typing import Any
 
+from neighborly.core.life_event import EventHistory
 from neighborly.loaders import load_data_file, load_occupation_types, load_prefab
 from neighborly.plugins.defaults import names
 from neighborly.simulation import Neighborly, PluginInfo
 
 import speakeasy.components
+import speakeasy.events
 import speakeasy.social_rules
 import speakeasy.systems
 from speakeasy import VERSION
 from speakeasy.event_listeners import register_event_listeners
-from speakeasy.factories import InventoryFactory, EthnicityFactory
+from speakeasy.event_log import install_event_log
+from speakeasy.factories import EthnicityFactory, EventHistoryFactory, InventoryFactory
+from speakeasy.instrumentation import EventInstrumentation, instrument_module
+from speakeasy.negotiation.scheduler import NegotiationBatch, NegotiationSystem
+from speakeasy.resources import (
+    BusinessAssociations,
+    ItemRegistry,
+    KinshipIndex,
+    Market,
+    NegotiationRandom,
+    RespectIndex,
+)
 
 _RESOURCES_DIR = pathlib.Path(os.path.abspath(__file__)).parent / "data"
 
@@ -31,10 +44,40 @@ def setup(sim: Neighborly, **kwargs: Any) -> None:
     sim.register_component(speakeasy.components.Produces)
     sim.register_component(speakeasy.components.Knowledge)
     sim.register_component(speakeasy.components.Respect)
+    sim.register_component(speakeasy.components.VirtueSignature)
+
+    # Add resources
+    sim.add_resource(RespectIndex())
+    sim.add_resource(BusinessAssociations())
+    sim.add_resource(ItemRegistry())
+    sim.add_resource(Market())
+    sim.add_resource(KinshipIndex())
+    # A string seed keeps this stream apart from the world's (seeded with the number)
+    sim.add_resource(NegotiationRandom(f"negotiation-{sim.config.seed}"))
+
+    if event_log_path := sim.config.settings.get("event_log", False):
+        # The setting is either True (use a temporary file) or a file path
+        install_event_log(
+            sim.world, event_log_path if isinstance(event_log_path, str) else None
+        )
+        sim.register_component(EventHistory, factory=EventHistoryFactory())
+
+    negotiation_workers: int = sim.config.settings.get("negotiation_workers", 0)
+    if negotiation_workers or sim.config.settings.get("batch_negotiations", False):
+        sim.add_resource(NegotiationBatch(workers=negotiation_workers))
+        sim.add_system(NegotiationSystem())
+
+    if sim.config.settings.get("instrument_events", False):
+        sim.add_resource(EventInstrumentation())
+        instrument_module(speakeasy.events)
 
     # Add systems
     #sim.add_system(speakeasy.systems.ProbeRelationshipSystem())
-    sim.add_system(speakeasy.systems.ProduceItemsSystem())
+    sim.add_system(
+        speakeasy.systems.ProduceItemsSystem(
+            vectorized=sim.config.settings.get("vectorized_production", False)
+        )
+    )
 
     # load prefabs and content
     load_prefab(_RESOURCES_DIR / "character.default.with-inventory.yaml")
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import random
+from types import MappingProxyType
+from typing import (
+    AbstractSet,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+_EMPTY_SET: FrozenSet[int] = frozenset()
+_EMPTY_STR_SET: FrozenSet[str] = frozenset()
+_EMPTY_FAMILY: Mapping[int, int] = MappingProxyType({})
+
+
+class RespectIndex:
+    """Tracks which relationships have Respect values above given thresholds.
+
+    Respect facets report their new value to this index whenever they change. This
+    lets event binders look up mutually respected characters using set operations
+    instead of walking every character's relationships.
+
+    Notes
+    -----
+    Relationships that have never reported a value are assumed to have a Respect
+    of zero. So, only positive thresholds can be tracked.
+    """
+
+    __slots__ = "_values", "_outgoing", "_incoming", "_mutual"
+
+    _values: Dict[int, Dict[int, int]]
+    """Owner IDs mapped to target IDs mapped to the owner's respect for the target."""
+
+    _outgoing: Dict[int, Dict[int, Set[int]]]
+    """Thresholds mapped to owner IDs mapped to IDs of targets at/above threshold."""
+
+    _incoming: Dict[int, Dict[int, Set[int]]]
+    """Thresholds mapped to target IDs mapped to IDs of owners at/above threshold."""
+
+    _mutual: Dict[int, Dict[int, Set[int]]]
+    """Thresholds mapped to character IDs mapped to IDs with mutual respect."""
+
+    def __init__(self) -> None:
+        self._values = {}
+        self._outgoing = {}
+        self._incoming = {}
+        self._mutual = {}
+
+    def update(self, owner: int, target: int, value: int) -> None:
+        """Record the current Respect value of a relationship.
+
+        Parameters
+        ----------
+        owner
+            The GameObject ID of the relationship owner.
+        target
+            The GameObject ID of the relationship target.
+        value
+            The owner's current Respect value toward the target.
+        """
+        if value == 0:
+            if owner in self._values:
+                self._values[owner].pop(target, None)
+        else:
+            self._values.setdefault(owner, {})[target] = value
+
+        for threshold in self._outgoing:
+            self._update_threshold(threshold, owner, target, value >= threshold)
+
+    def get_value(self, owner: int, target: int) -> int:
+        """Return the Respect value of an owner toward a target."""
+        return self._values.get(owner, {}).get(target, 0)
+
+    def respects(self, owner: int, target: int, threshold: int) -> bool:
+        """Check if an owner's respect for a target meets a threshold."""
+        return self.get_value(owner, target) >= threshold
+
+    def mutually_respect(self, a: int, b: int, threshold: int) -> bool:
+        """Check if two characters' respect for each other meets a threshold."""
+        return self.respects(a, b, threshold) and self.respects(b, a, threshold)
+
+    def respected_by(self, owner: int, threshold: int) -> AbstractSet[int]:
+        """Return the IDs of everyone an owner respects at/above a threshold.
+
+        The returned set is owned by the index and should not be modified.
+        """
+        return self._get_tracked(self._outgoing, threshold).get(owner, _EMPTY_SET)
+
+    def respecting(self, target: int, threshold: int) -> AbstractSet[int]:
+        """Return the IDs of everyone that respects a target at/above a threshold.
+
+        The returned set is owned by the index and should not be modified.
+        """
+        return self._get_tracked(self._incoming, threshold).get(target, _EMPTY_SET)
+
+    def mutually_respected(self, character: int, threshold: int) -> AbstractSet[int]:
+        """Return the IDs of everyone sharing respect at/above a threshold.
+
+        The returned set is owned by the index and should not be modified.
+        """
+        return self._get_tracked(self._mutual, threshold).get(character, _EMPTY_SET)
+
+    def _get_tracked(
+        self, table: Dict[int, Dict[int, Set[int]]], threshold: int
+    ) -> Dict[int, Set[int]]:
+        """Return the entries for a threshold, starting to track it if needed."""
+        if threshold not in table:
+            self._track(threshold)
+        return table[threshold]
+
+    def _track(self, threshold: int) -> None:
+        """Build the sets for a new threshold from the recorded Respect values."""
+        if threshold <= 0:
+            raise ValueError(
+                f"Respect thresholds must be positive, but was given {threshold}"
+            )
+
+        self._outgoing[threshold] = {}
+        self._incoming[threshold] = {}
+        self._mutual[threshold] = {}
+
+        for owner, targets in self._values.items():
+            for target, value in targets.items():
+                if value >= threshold:
+                    self._update_threshold(threshold, owner, target, True)
+
+    def _update_threshold(
+        self, threshold: int, owner: int, target: int, is_above: bool
+    ) -> None:
+        outgoing = self._outgoing[threshold]
+        incoming = self._incoming[threshold]
+        mutual = self._mutual[threshold]
+
+        if is_above:
+            outgoing.setdefault(owner, set()).add(target)
+            incoming.setdefault(target, set()).add(owner)
+            if owner in outgoing.get(target, _EMPTY_SET):
+                mutual.setdefault(owner, set()).add(target)
+                mutual.setdefault(target, set()).add(owner)
+        else:
+            outgoing.get(owner, set()).discard(target)
+            incoming.get(target, set()).discard(owner)
+            mutual.get(owner, set()).discard(target)
+            mutual.get(target, set()).discard(owner)
+
+
+class BusinessAssociations:
+    """Caches the ID of the business that each character is associated with.
+
+    Characters are associated with the business they own or the business whose owner
+    they work for. It also caches the reverse mapping from each business to the IDs
+    of its owner and employees. Entries are invalidated by event listeners when
+    characters start or end jobs and when businesses close.
+    """
+
+    __slots__ = "_businesses", "_members", "_associates"
+
+    _businesses: Dict[int, Optional[int]]
+    """Character IDs mapped to the ID of their business (None if no business)."""
+
+    _members: Dict[int, Set[int]]
+    """Business IDs mapped to the IDs of characters cached as associated with it."""
+
+    _associates: Dict[int, FrozenSet[int]]
+    """Business IDs mapped to the IDs of their owner and employees."""
+
+    def __init__(self) -> None:
+        self._businesses = {}
+        self._members = {}
+        self._associates = {}
+
+    def get(self, character: int) -> Optional[int]:
+        """Return the cached business ID for a character.
+
+        Parameters
+        ----------
+        character
+            The GameObject ID of a character.
+
+        Returns
+        -------
+        int or None
+            The GameObject ID of the business or None if they have no business.
+
+        Raises
+        ------
+        KeyError
+            If there is no cached entry for the character.
+        """
+        return self._businesses[character]
+
+    def set(self, character: int, business: Optional[int]) -> None:
+        """Cache the business ID for a character.
+
+        Parameters
+        ----------
+        character
+            The GameObject ID of a character.
+        business
+            The GameObject ID of their business or None if they have no business.
+        """
+        self.invalidate(character)
+        self._businesses[character] = business
+        if business is not None:
+            self._members.setdefault(business, set()).add(character)
+
+    def get_associates(self, business: int) -> FrozenSet[int]:
+        """Return the cached IDs of a business's owner and employees.
+
+        Parameters
+        ----------
+        business
+            The GameObject ID of a business.
+
+        Returns
+        -------
+        FrozenSet[int]
+            The GameObject IDs of the owner and employees.
+
+        Raises
+        ------
+        KeyError
+            If there is no cached entry for the business.
+        """
+        return self._associates[business]
+
+    def set_associates(self, business: int, associates: Iterable[int]) -> None:
+        """Cache the IDs of a business's owner and employees.
+
+        Parameters
+        ----------
+        business
+            The GameObject ID of a business.
+        associates
+            The GameObject IDs of the owner and employees.
+        """
+        self._associates[business] = frozenset(associates)
+
+    def invalidate(self, character: int) -> None:
+        """Remove the cached entry for a character."""
+        business = self._businesses.pop(character, None)
+        if business is not None:
+            self._members[business].discard(character)
+
+    def invalidate_business(self, business: int) -> None:
+        """Remove the cached entries of a business and its associated characters."""
+        self._associates.pop(business, None)
+        for character in self._members.pop(business, set()):
+            del self._businesses[character]
+
+    def __contains__(self, character: int) -> bool:
+        return character in self._businesses
+
+
+class KinshipIndex:
+    """Tracks the Family relationships between characters.
+
+    Event listeners update the index when Family relationship statuses are added or
+    removed. So, checking if two characters are family is a dictionary lookup instead
+    of a walk over a character's relationships.
+    """
+
+    __slots__ = "_family"
+
+    _family: Dict[int, Dict[int, int]]
+    """Owner IDs mapped to target IDs mapped to IDs of Family relationships."""
+
+    def __init__(self) -> None:
+        self._family = {}
+
+    def add(self, owner: int, target: int, relationship: int) -> None:
+        """Record that a relationship has a Family status.
+
+        Parameters
+        ----------
+        owner
+            The GameObject ID of the relationship owner.
+        target
+            The GameObject ID of the relationship target.
+        relationship
+            The GameObject ID of the relationship.
+        """
+        self._family.setdefault(owner, {})[target] = relationship
+
+    def remove(self, owner: int, target: int) -> None:
+        """Record that a relationship no longer has a Family status."""
+        family = self._family.get(owner)
+        if family is not None:
+            family.pop(target, None)
+
+    def is_family(self, owner: int, target: int) -> bool:
+        """Check if an owner has a Family relationship toward a target."""
+        return target in self._family.get(owner, _EMPTY_FAMILY)
+
+    def are_related(self, a: int, b: int) -> bool:
+        """Check if two characters are the same or a has a Family relationship to b.
+
+        This gives the same result as neighborly.utils.query.are_related() with its
+        default degree of separation.
+        """
+        return a == b or self.is_family(a, b)
+
+    def get_family(self, owner: int) -> List[int]:
+        """Return the IDs of targets of an owner's Family relationships.
+
+        The IDs are in the order that the relationships were created, like
+        get_relationships_with_statuses(owner, Family).
+        """
+        family = self._family.get(owner, _EMPTY_FAMILY)
+        return sorted(family, key=family.__getitem__)
+
+
+class NegotiationRandom(random.Random):
+    """A random number generator for negotiations, separate from the world's.
+
+    Negotiators draw the salts of their utility noise (which also seed the generators
+    that candidate actions are bound with) from this generator. So, how many
+    negotiations are set up, and whether they are batched, does not change the random
+    numbers that the rest of the simulation draws from the world's generator.
+    """
+
+
+class ItemRegistry:
+    """Assigns dense integer IDs to item names.
+
+    Inventories store quantities in slots indexed by these IDs instead of keeping a
+    dictionary of item names. IDs are assigned in the order items are first seen and
+    are never reused.
+    """
+
+    __slots__ = "_ids", "_names"
+
+    _ids: Dict[str, int]
+    """Item names mapped to their IDs."""
+
+    _names: List[str]
+    """Item names indexed by ID."""
+
+    def __init__(self) -> None:
+        self._ids = {}
+        self._names = []
+
+    def get_id(self, item: str) -> int:
+        """Return the ID of an item, assigning a new one if it is not registered.
+
+        Parameters
+        ----------
+        item
+            The name of an item.
+
+        Returns
+        -------
+        int
+            The item's ID.
+        """
+        item_id = self._ids.get(item)
+        if item_id is None:
+            item_id = len(self._names)
+            self._ids[item] = item_id
+            self._names.append(item)
+        return item_id
+
+    def try_id(self, item: str) -> Optional[int]:
+        """Return the ID of an item or None if it is not registered."""
+        return self._ids.get(item)
+
+    def get_name(self, item_id: int) -> str:
+        """Return the name of the item with the given ID."""
+        return self._names[item_id]
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class Market:
+    """Indexes open businesses by the items they produce and require.
+
+    Businesses are added when they open (or as soon as a GameObject has both Business
+    and Produces components, for businesses that are spawned directly) and removed
+    when they close, so supply and demand queries only touch the businesses that match.
+    """
+
+    __slots__ = "_produced_items", "_required_items", "_producers", "_buyers"
+
+    _produced_items: Dict[int, FrozenSet[str]]
+    """Business IDs mapped to the names of the items they produce."""
+
+    _required_items: Dict[int, FrozenSet[str]]
+    """Business IDs mapped to the names of the items they require."""
+
+    _producers: Dict[str, Set[int]]
+    """Item names mapped to the IDs of businesses that produce them."""
+
+    _buyers: Dict[str, Set[int]]
+    """Item names mapped to the IDs of businesses that require them."""
+
+    def __init__(self) -> None:
+        self._produced_items = {}
+        self._required_items = {}
+        self._producers = {}
+        self._buyers = {}
+
+    def add_business(
+        self, business: int, produces: Iterable[str], requires: Iterable[str]
+    ) -> None:
+        """Add an open business to the market.
+
+        Parameters
+        ----------
+        business
+            The GameObject ID of the business.
+        produces
+            The names of the items the business produces.
+        requires
+            The names of the items the business requires for production.
+        """
+        self.remove_business(business)
+
+        self._produced_items[business] = frozenset(produces)
+        self._required_items[business] = frozenset(requires)
+
+        for item in self._produced_items[business]:
+            self._producers.setdefault(item, set()).add(business)
+
+        for item in self._required_items[business]:
+            self._buyers.setdefault(item, set()).add(business)
+
+    def remove_business(self, business: int) -> None:
+        """Remove a business from the market (if present)."""
+        for item in self._produced_items.pop(business, _EMPTY_STR_SET):
+            self._producers[item].discard(business)
+
+        for item in self._required_items.pop(business, _EMPTY_STR_SET):
+            self._buyers[item].discard(business)
+
+    def get_producers(self, item: str) -> AbstractSet[int]:
+        """Return the IDs of open businesses that produce an item.
+
+        The returned set is owned by the market and should not be modified.
+        """
+        return self._producers.get(item, _EMPTY_SET)
+
+    def get_buyers(self, item: str) -> AbstractSet[int]:
+        """Return the IDs of open businesses that require an item.
+
+        The returned set is owned by the market and should not be modified.
+        """
+        return self._buyers.get(item, _EMPTY_SET)
+
+    def get_produced_items(self, business: int) -> FrozenSet[str]:
+        """Return the names of the items an open business produces."""
+        return self._produced_items.get(business, _EMPTY_STR_SET)
+
+    def get_required_items(self, business: int) -> FrozenSet[str]:
+        """Return the names of the items an open business requires."""
+        return self._required_items.get(business, _EMPTY_STR_SET)
+
+    def produces_any(self, business: int, items: Iterable[str]) -> bool:
+        """Check if an open business produces any of the given items."""
+        return not self.get_produced_items(business).isdisjoint(items)
+
+    def get_businesses(self) -> List[int]:
+        """Return the IDs of all open businesses in the order they opened."""
+        return list(self._produced_items)
+
+    def __contains__(self, business: int) -> bool:
+        return business in self._produced_items
@@ -1,4 +1,4 @@
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
 from neighborly import GameObject
 from neighborly.components import Virtues
@@ -6,7 +6,8 @@ from neighborly.core.relationship import Friendship, RelationshipFacet, Romance
 from neighborly.decorators import social_rule
 from neighborly.utils.query import are_related
 
-from speakeasy.components import Ethnicity, Faction, Respect
+from speakeasy.components import Ethnicity, Faction, Respect, VirtueSignature
+from speakeasy.resources import KinshipIndex
 
 
 @social_rule("Characters with the same ethnicity gain a boost in respect")
@@ -48,38 +49,72 @@ def respect_same_faction(
     return {}
 
 
+def _are_related(subject: GameObject, target: GameObject) -> bool:
+    """Check if characters are related, using the KinshipIndex if there is one."""
+    kinship_index = subject.world.try_resource(KinshipIndex)
+
+    if kinship_index is None:
+        return are_related(subject, target)
+
+    return kinship_index.are_related(subject.uid, target.uid)
+
+
 @social_rule("Characters that are closely related gain a boost in respect")
 def respect_for_family(
     subject: GameObject, target: GameObject
 ) -> Dict[Type[RelationshipFacet], int]:
     """Characters that are closely related gain a boost in respect"""
 
-    if are_related(subject, target):
+    if _are_related(subject, target):
         return {Respect: 10}
 
     return {}
 
 
+def get_virtue_signature(gameobject: GameObject) -> Optional[VirtueSignature]:
+    """Return a character's VirtueSignature, refreshing it if their Virtues changed.
+
+    Signatures are added along with Virtues by an event listener. Characters with
+    Virtues but no signature get a signature that is not added to them.
+
+    Parameters
+    ----------
+    gameobject
+        A character.
+
+    Returns
+    -------
+    Optional[VirtueSignature]
+        The signature of the character's virtues, or None if they have no Virtues.
+    """
+    virtues = gameobject.try_component(Virtues)
+
+    if virtues is None:
+        return None
+
+    signature = gameobject.try_component(VirtueSignature)
+
+    if signature is None:
+        return VirtueSignature(virtues)
+
+    signature.refresh(virtues)
+
+    return signature
+
+
 @social_rule("Characters with shared high/low virtues gain romance points")
 def romance_boost_from_shared_virtues(
     subject: GameObject, target: GameObject
 ) -> Dict[Type[RelationshipFacet], int]:
     """Characters with shared high/low virtues gain romance points"""
 
-    if not subject.has_component(Virtues) or not target.has_component(Virtues):
-        return {}
-
-    subject_virtues = subject.get_component(Virtues)
-    target_virtues = target.get_component(Virtues)
+    subject_signature = get_virtue_signature(subject)
+    target_signature = get_virtue_signature(target)
 
-    shared_likes = set(subject_virtues.get_high_values()).intersection(
-        set(target_virtues.get_high_values())
-    )
-    shared_dislikes = set(subject_virtues.get_low_values()).intersection(
-        set(target_virtues.get_low_values())
-    )
+    if subject_signature is None or target_signature is None:
+        return {}
 
-    return {Romance: len(shared_likes) + len(shared_dislikes)}
+    return {Romance: subject_signature.count_shared_virtues(target_signature)}
 
 
 @social_rule("Characters with shared high/low virtues gain romance points")
@@ -88,20 +123,13 @@ def romance_loss_from_virtue_conflicts(
 ) -> Dict[Type[RelationshipFacet], int]:
     """Characters with shared high/low virtues gain romance points"""
 
-    if not subject.has_component(Virtues) or not target.has_component(Virtues):
-        return {}
-
-    subject_virtues = subject.get_component(Virtues)
-    target_virtues = target.get_component(Virtues)
+    subject_signature = get_virtue_signature(subject)
+    target_signature = get_virtue_signature(target)
 
-    subject_conflicts = set(subject_virtues.get_high_values()).intersection(
-        set(target_virtues.get_low_values())
-    )
-    target_conflicts = set(target_virtues.get_high_values()).intersection(
-        set(subject_virtues.get_low_values())
-    )
+    if subject_signature is None or target_signature is None:
+        return {}
 
-    return {Romance: -1 * (len(subject_conflicts) + len(target_conflicts))}
+    return {Romance: -1 * subject_signature.count_virtue_conflicts(target_signature)}
 
 
 @social_rule("Characters with more similar virtues will be better friends")
@@ -110,12 +138,12 @@ def friendship_virtue_compatibility(
 ) -> Dict[Type[RelationshipFacet], int]:
     """Characters with more similar virtues will be better friends"""
 
-    if not subject.has_component(Virtues) or not target.has_component(Virtues):
-        return {}
+    subject_signature = get_virtue_signature(subject)
+    target_signature = get_virtue_signature(target)
 
-    character_virtues = subject.get_component(Virtues)
-    acquaintance_virtues = target.get_component(Virtues)
+    if subject_signature is None or target_signature is None:
+        return {}
 
-    compatibility = float(character_virtues.compatibility(acquaintance_virtues)) / 100.0
+    compatibility = float(subject_signature.compatibility(target_signature)) / 100.0
 
     return {Friendship: round(6 * compatibility)}
@@ -1,5 +1,8 @@
 import random
-from typing import Any
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
 
 from neighborly.components import Business, GameCharacter
 from neighborly.core.ecs import Active
@@ -9,13 +12,62 @@ from neighborly.core.time import SimDateTime
 from neighborly.systems import System
 
 from speakeasy.components import Inventory, Knowledge, Produces
+from speakeasy.resources import ItemRegistry, Market
 
 
 class ProduceItemsSystem(System):
+    """Business owners use required items in their inventory to produce new items.
+
+    When vectorized, owners' inventories and business recipes are gathered into NumPy
+    matrices (one row per business, one column per item ID) so that checking which
+    businesses can produce this tick and computing the new quantities are whole-matrix
+    operations. An owner with several businesses produces for each of them in turn, so
+    rows are processed in waves in which every owner appears at most once. Both paths
+    produce identical inventories.
+    """
+
     sys_group = "early-update"
 
+    def __init__(self, vectorized: bool = False) -> None:
+        """
+        Parameters
+        ----------
+        vectorized
+            Run production over NumPy matrices instead of item by item.
+        """
+        super().__init__()
+        self.vectorized: bool = vectorized
+        self._item_registry: ItemRegistry = ItemRegistry()
+        self._recipe_key: Tuple[Tuple[int, int], ...] = ()
+        self._requires: npt.NDArray[np.int64] = np.zeros((0, 0), dtype=np.int64)
+        self._produces: npt.NDArray[np.int64] = np.zeros((0, 0), dtype=np.int64)
+
     def run(self, *args: Any, **kwargs: Any) -> None:
-        for _, (business, produces) in self.world.get_components((Business, Produces)):
+        if self.vectorized:
+            self._run_vectorized()
+        else:
+            self._run_item_by_item()
+
+    def _get_producers(self) -> List[Tuple[int, Tuple[Business, Produces]]]:
+        """Return the businesses that may produce items this step.
+
+        Only open businesses are considered when the world has a Market.
+        """
+        market = self.world.try_resource(Market)
+
+        if market is None:
+            return self.world.get_components((Business, Produces))
+
+        producers: List[Tuple[int, Tuple[Business, Produces]]] = []
+        for uid in market.get_businesses():
+            gameobject = self.world.get_gameobject(uid)
+            business = gameobject.get_component(Business)
+            produces = gameobject.get_component(Produces)
+            producers.append((uid, (business, produces)))
+        return producers
+
+    def _run_item_by_item(self) -> None:
+        for _, (business, produces) in self._get_producers():
             has_required_items = True
 
             # check for owner
@@ -44,3 +96,84 @@ class ProduceItemsSystem(System):
             # Add produces items to owners' inventory
             for item, quantity in produces.produces.items():
                 inventory.add_item(item, quantity)
+
+    def _run_vectorized(self) -> None:
+        rows: List[Tuple[int, Inventory, Produces]] = []
+        waves: List[List[int]] = []
+        owner_rows: Dict[int, int] = {}
+        for uid, (business, produces) in self._get_producers():
+            if business.owner:
+                inventory = self.world.get_gameobject(business.owner).get_component(
+                    Inventory
+                )
+                # The nth business of an owner produces in the nth wave
+                wave = owner_rows.get(business.owner, 0)
+                owner_rows[business.owner] = wave + 1
+                if wave == len(waves):
+                    waves.append([])
+                waves[wave].append(len(rows))
+                rows.append((uid, inventory, produces))
+
+        if not rows:
+            return
+
+        self._update_recipes(rows)
+
+        for wave in waves:
+            self._produce_wave(rows, np.array(wave, dtype=np.int64))
+
+    def _produce_wave(
+        self,
+        rows: List[Tuple[int, Inventory, Produces]],
+        wave: npt.NDArray[np.int64],
+    ) -> None:
+        """Produce items for rows whose businesses all have different owners."""
+        requires = self._requires[wave]
+
+        held = np.zeros(requires.shape, dtype=np.int64)
+        for i, row in enumerate(wave):
+            _, inventory, produces = rows[row]
+            for item in (*produces.requires, *produces.produces):
+                held[i, self._item_registry.get_id(item)] = inventory.get_quantity(item)
+
+        can_produce = np.all(held >= requires, axis=1)
+        updated = held + can_produce[:, np.newaxis] * (self._produces[wave] - requires)
+
+        for i in np.flatnonzero(can_produce):
+            _, inventory, produces = rows[wave[i]]
+            self._write_back(inventory, produces, updated[i])
+
+    def _update_recipes(self, rows: List[Tuple[int, Inventory, Produces]]) -> None:
+        """Rebuild the recipe matrices if the producing businesses have changed."""
+        recipe_key = tuple((uid, id(produces)) for uid, _, produces in rows)
+
+        if recipe_key == self._recipe_key:
+            return
+
+        world_registry = self.world.try_resource(ItemRegistry)
+        if world_registry is not None:
+            self._item_registry = world_registry
+        get_id = self._item_registry.get_id
+
+        for _, _, produces in rows:
+            for item in (*produces.requires, *produces.produces):
+                get_id(item)
+
+        shape = (len(rows), len(self._item_registry))
+        self._requires = np.zeros(shape, dtype=np.int64)
+        self._produces = np.zeros(shape, dtype=np.int64)
+
+        for i, (_, _, produces) in enumerate(rows):
+            for item, quantity in produces.requires.items():
+                self._requires[i, get_id(item)] = quantity
+            for item, quantity in produces.produces.items():
+                self._produces[i, get_id(item)] = quantity
+
+        self._recipe_key = recipe_key
+
+    def _write_back(
+        self, inventory: Inventory, produces: Produces, row: npt.NDArray[np.int64]
+    ) -> None:
+        """Copy the updated quantities of a recipe's items into an inventory."""
+        for item in (*produces.requires, *produces.produces):
+            inventory.set_quantity(item, int(row[self._item_registry.get_id(item)]))
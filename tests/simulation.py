@@ -0,0 +1,70 @@
+"""Small, quiet Speakeasy simulations for tests that need a populated world."""
+from typing import Any, Dict, Optional
+
+from neighborly import Neighborly, NeighborlyConfig
+
+from speakeasy.batch import reset_global_state
+
+
+def create_test_simulation(
+    seed: int, settings: Optional[Dict[str, Any]] = None
+) -> Neighborly:
+    """Create a Speakeasy simulation of a default town that has not been stepped.
+
+    Event listeners and social rules registered by earlier simulations are cleared
+    first, so simulations with the same seed and settings produce the same output.
+    """
+    reset_global_state()
+
+    return Neighborly(
+        NeighborlyConfig.parse_obj(
+            {
+                "seed": seed,
+                "verbose": False,
+                "time_increment": "1mo",
+                "relationship_schema": {
+                    "components": {
+                        "Friendship": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "Romance": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "InteractionScore": {
+                            "min_value": -5,
+                            "max_value": 5,
+                        },
+                        "Respect": {
+                            "min_value": -100,
+                            "max_value": 100,
+                        },
+                        "Favors": {"favors": 0},
+                    }
+                },
+                "plugins": [
+                    "neighborly.plugins.defaults.create_town",
+                    "neighborly.plugins.defaults.characters",
+                    "neighborly.plugins.defaults.residences",
+                    "neighborly.plugins.defaults.social_rules",
+                    "neighborly.plugins.defaults.resident_spawning",
+                    "neighborly.plugins.defaults.names",
+                    "speakeasy.plugin",
+                ],
+                "settings": {"print_negotiations": False, **(settings or {})},
+            }
+        )
+    )
+
+
+def run_test_simulation(
+    seed: int, months: int, settings: Optional[Dict[str, Any]] = None
+) -> Neighborly:
+    """Create a Speakeasy simulation and step it once per month."""
+    sim = create_test_simulation(seed, settings)
+
+    for _ in range(months):
+        sim.step()
+
+    return sim
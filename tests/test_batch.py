@@ -0,0 +1,76 @@
+from typing import Any, Dict
+
+from speakeasy.batch import aggregate_summaries, run_seeds
+
+CONFIG: Dict[str, Any] = {
+    "verbose": False,
+    "time_increment": "1mo",
+    "years_to_simulate": 1,
+    "relationship_schema": {
+        "components": {
+            "Friendship": {"min_value": -100, "max_value": 100},
+            "Romance": {"min_value": -100, "max_value": 100},
+            "InteractionScore": {"min_value": -5, "max_value": 5},
+            "Respect": {"min_value": -100, "max_value": 100},
+            "Favors": {"favors": 0},
+        }
+    },
+    "plugins": [
+        "neighborly.plugins.defaults.create_town",
+        "neighborly.plugins.defaults.characters",
+        "neighborly.plugins.defaults.residences",
+        "neighborly.plugins.defaults.social_rules",
+        "neighborly.plugins.defaults.location_bias_rules",
+        "neighborly.plugins.defaults.resident_spawning",
+        "neighborly.plugins.defaults.names",
+        "speakeasy.plugin",
+    ],
+    "settings": {"print_negotiations": False},
+}
+
+
+def test_run_seeds_is_reproducible() -> None:
+    sequential = run_seeds(CONFIG, [3, 4], workers=1)
+    parallel = run_seeds(CONFIG, [4, 3], workers=2)
+
+    def strip_timing(report: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        return {
+            run["seed"]: {k: v for k, v in run.items() if k != "elapsed_s"}
+            for run in report["runs"]
+        }
+
+    assert strip_timing(sequential) == strip_timing(parallel)
+    assert [run["seed"] for run in parallel["runs"]] == [4, 3]
+    assert sequential["statistics"]["total_events"]["min"] > 0
+
+
+def test_aggregate_summaries() -> None:
+    statistics = aggregate_summaries(
+        [
+            {
+                "elapsed_s": 1.0,
+                "active_characters": 10,
+                "open_businesses": 2,
+                "total_items": 5,
+                "total_events": 3,
+                "events": {"TradeEvent": 3},
+            },
+            {
+                "elapsed_s": 3.0,
+                "active_characters": 20,
+                "open_businesses": 4,
+                "total_items": 7,
+                "total_events": 1,
+                "events": {"GiveEvent": 1},
+            },
+        ]
+    )
+
+    assert statistics["active_characters"]["mean"] == 15
+    assert statistics["events.TradeEvent"] == {
+        "mean": 1.5,
+        "stdev": statistics["events.TradeEvent"]["stdev"],
+        "min": 0,
+        "max": 3,
+    }
+    assert statistics["events.GiveEvent"]["max"] == 1
@@ -0,0 +1,66 @@
+import json
+from typing import Dict, Type
+
+from neighborly.components import GameCharacter
+from neighborly.core.ecs import Active
+from neighborly.core.relationship import RelationshipFacet, SocialRules
+
+import speakeasy.social_rules
+from benchmarks.social_rules import SocialRuleEvaluator
+from benchmarks.suite import get_speakeasy_life_events, run_benchmarks
+from benchmarks.worlds import build_world
+from speakeasy.events import NegotiateEvent, TradeEvent
+
+
+def test_run_benchmarks() -> None:
+    report = run_benchmarks([10], repeat=2, warmup_months=0)
+
+    names = {result["name"] for result in report["results"]}
+
+    assert "export_to_json" in names
+    assert "write_json" in names
+    assert "instantiate.TradeEvent" in names
+    assert "ProduceItemsSystem.run.vectorized" in names
+    assert "social_rules.batched" in names
+    assert "NegotiateEvent.end_to_end" in names
+    assert "negotiation.batched" in names
+    assert all(
+        result["calls"] == 2
+        for result in report["results"]
+        if result["name"] not in ("export_to_json", "write_json")
+    )
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_get_speakeasy_life_events() -> None:
+    life_events = get_speakeasy_life_events()
+
+    assert TradeEvent in life_events
+    assert NegotiateEvent in life_events
+
+
+def test_social_rule_evaluator() -> None:
+    sim = build_world(20, seed=3, warmup_months=6)
+    world = sim.world
+
+    characters = [uid for uid, _ in world.get_components((GameCharacter, Active))]
+    pairs = [(s, t) for s in characters for t in characters if s != t]
+    rules = [
+        info.rule
+        for info in SocialRules.iter_rules()
+        if info.rule.__module__ == speakeasy.social_rules.__name__
+    ]
+
+    scores = SocialRuleEvaluator().score(world, pairs)
+
+    for i, (s, t) in enumerate(pairs):
+        expected: Dict[Type[RelationshipFacet], int] = {}
+        for rule in rules:
+            for facet, delta in rule(
+                world.get_gameobject(s), world.get_gameobject(t)
+            ).items():
+                expected[facet] = expected.get(facet, 0) + delta
+
+        assert {facet: int(deltas[i]) for facet, deltas in scores.items()} == {
+            facet: expected.get(facet, 0) for facet in scores
+        }
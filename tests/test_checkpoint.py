@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+from neighborly.core.time import SimDateTime, TimeDelta
+from neighborly.exporter import export_to_json
+
+from speakeasy.checkpoint import SNAPSHOT_FILE, Checkpointer, resume_simulation
+from tests.simulation import create_test_simulation
+
+
+def export_world(sim: Any) -> Dict[str, Any]:
+    data = json.loads(export_to_json(sim))
+    # StatusManager stores a set of types, which may iterate in a different order
+    # after being unpickled.
+    for gameobject in data["gameobjects"].values():
+        if "StatusManager" in gameobject["components"]:
+            gameobject["components"]["StatusManager"]["statuses"].sort()
+    return data
+
+
+def test_resume_simulation(tmp_path: Path) -> None:
+    sim = create_test_simulation(5)
+    start_date = sim.world.get_resource(SimDateTime).copy()
+    stop_date = start_date + TimeDelta(months=12)
+    Checkpointer(str(tmp_path / "uninterrupted"), 3).run_until(sim, stop_date)
+    expected = export_world(sim)
+
+    # Stop halfway through, as if the simulation crashed
+    sim = create_test_simulation(5)
+    Checkpointer(str(tmp_path / "resumed"), 3).run_until(
+        sim, start_date + TimeDelta(months=6)
+    )
+
+    sim, checkpointer, _ = resume_simulation(str(tmp_path / "resumed"))
+    assert sim.world.get_resource(SimDateTime) == start_date + TimeDelta(months=6)
+    assert checkpointer.checkpoint_count == 2
+    checkpointer.run_until(sim, stop_date)
+
+    assert export_world(sim) == expected
+    assert checkpointer.checkpoint_count == 4
+
+
+def test_checkpoint_interval(tmp_path: Path) -> None:
+    sim = create_test_simulation(5)
+    checkpointer = Checkpointer(str(tmp_path), 1)
+    stop_date = sim.world.get_resource(SimDateTime).copy() + TimeDelta(months=2)
+    checkpointer.run_until(sim, stop_date)
+
+    assert checkpointer.checkpoint_count == 2
+
+    checkpointer.save(sim, stop_date)
+
+    assert checkpointer.checkpoint_count == 3
+    # Only the latest snapshot is kept
+    assert os.listdir(tmp_path) == [SNAPSHOT_FILE]
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import numpy as np
+from neighborly.core.life_event import AllEvents
+from neighborly.core.relationship import Relationship
+
+from speakeasy.columnar import ColumnarExport, export_to_columnar
+from speakeasy.components import Favors, Inventory, Respect
+from tests.simulation import run_test_simulation
+
+
+def test_export_to_columnar(tmp_path: Path) -> None:
+    sim = run_test_simulation(7, 6)
+    world = sim.world
+
+    export_to_columnar(sim, str(tmp_path))
+    export = ColumnarExport(str(tmp_path))
+
+    inventories = export.get_table("inventories")
+    assert isinstance(inventories["quantity"], np.memmap)
+    assert inventories["quantity"].dtype == np.dtype("<i4")
+
+    items = export.get_dictionary("items")
+    expected_inventories = {
+        (uid, item): quantity
+        for uid, inventory in world.get_component(Inventory)
+        for item, quantity in inventory.items.items()
+    }
+    assert {
+        (int(owner), items[item]): int(quantity)
+        for owner, item, quantity in zip(
+            inventories["owner"], inventories["item"], inventories["quantity"]
+        )
+    } == expected_inventories
+
+    relationships = export.to_dataframe("relationships").set_index("relationship")
+    for uid, relationship in world.get_component(Relationship):
+        gameobject = world.get_gameobject(uid)
+        row = relationships.loc[uid]
+        assert (row["owner"], row["target"]) == (relationship.owner, relationship.target)
+        assert row["respect"] == gameobject.get_component(Respect).get_value()
+        assert row["favors"] == gameobject.get_component(Favors).favors
+
+    all_events = list(world.get_resource(AllEvents))
+    events = export.to_dataframe("events")
+    assert list(events["event_id"]) == [event.get_id() for event in all_events]
+    assert list(events["event_type"]) == [type(e).__name__ for e in all_events]
+
+    event_roles = export.to_dataframe("event_roles")
+    assert len(event_roles) == sum(len(list(e.iter_roles())) for e in all_events)
+
+    knowledge = export.to_dataframe("knowledge")
+    assert set(knowledge["relation"].unique()) <= {"produces", "buys"}
@@ -0,0 +1,86 @@
+import pytest
+from neighborly.components import Virtues
+
+from speakeasy.components import Inventory, Knowledge, VirtueSignature
+from speakeasy.resources import ItemRegistry
+
+
+def test_inventory() -> None:
+    registry = ItemRegistry()
+    registry.get_id("money")
+
+    inventory = Inventory({"corn": 2}, registry=registry)
+
+    assert inventory.get_quantity("corn") == 2
+    assert inventory.get_quantity("money") == 0
+    assert inventory.get_quantity("sword") == 0
+
+    inventory.add_item("money", 3)
+    inventory.add_item("booze", 1)
+
+    assert inventory.items == {"money": 3, "corn": 2, "booze": 1}
+    assert inventory.get_items() == ["money", "corn", "booze"]
+    assert len(inventory.items) == 3
+
+    inventory.remove_item("corn", 2)
+
+    assert "corn" not in inventory.items
+    assert inventory.to_dict() == {"items": {"money": 3, "booze": 1}}
+
+    with pytest.raises(KeyError):
+        inventory.remove_item("corn", 1)
+
+    with pytest.raises(ValueError):
+        inventory.remove_item("money", 4)
+
+    inventory.remove_item("money", 3)
+    del inventory.items["booze"]
+
+    assert inventory.is_empty()
+    assert repr(inventory) == "Inventory({})"
+
+
+def test_knowledge_producer_ids() -> None:
+    knowledge = Knowledge()
+
+    knowledge.add_producer(1, "booze")
+    knowledge.add_producer(1, "corn")
+    knowledge.add_producer(2, "corn")
+
+    assert knowledge.producer_ids == {1, 2}
+    assert knowledge.known_producers() == [1, 2]
+
+    knowledge.remove_producer(1, "booze")
+
+    assert knowledge.producer_ids == {1, 2}
+
+    knowledge.remove_producer(1, "corn")
+
+    assert knowledge.producer_ids == {2}
+
+    # Producers keep the order they were learned in
+    knowledge.add_producer(1, "booze")
+
+    assert knowledge.known_producers() == [2, 1]
+
+
+def test_virtue_signature() -> None:
+    a = Virtues({"LOYALTY": 40, "POWER": 30, "FAMILY": 20, "LUST": -45, "PEACE": -30})
+    b = Virtues({"LOYALTY": 25, "PEACE": 35, "LUST": -10, "POWER": -40, "FAMILY": 10})
+
+    a_signature, b_signature = VirtueSignature(a), VirtueSignature(b)
+
+    assert a_signature.count_shared_virtues(b_signature) == len(
+        set(a.get_high_values()) & set(b.get_high_values())
+    ) + len(set(a.get_low_values()) & set(b.get_low_values()))
+    assert a_signature.count_virtue_conflicts(b_signature) == len(
+        set(a.get_high_values()) & set(b.get_low_values())
+    ) + len(set(b.get_high_values()) & set(a.get_low_values()))
+    assert a_signature.compatibility(b_signature) == a.compatibility(b)
+
+    high = a_signature.high
+    a[0] = 50
+    a_signature.refresh(a)
+
+    assert a_signature.high != high
+    assert a_signature.compatibility(b_signature) == a.compatibility(b)
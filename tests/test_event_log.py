@@ -0,0 +1,95 @@
+import pickle
+
+import pytest
+from neighborly.core.ecs import World
+from neighborly.core.life_event import AllEvents, EventHistory, LifeEvent
+from neighborly.core.time import SimDateTime
+
+from speakeasy.event_log import EventIdList, EventLog
+from speakeasy.exporter import iter_json
+from tests.simulation import run_test_simulation
+
+
+def test_event_log_export_matches() -> None:
+    expected = "".join(iter_json(run_test_simulation(7, 6)))
+
+    sim = run_test_simulation(7, 6, {"event_log": True})
+
+    assert "".join(iter_json(sim)) == expected
+
+
+def test_event_log() -> None:
+    sim = run_test_simulation(7, 6, {"event_log": True})
+    event_log = sim.world.get_resource(EventLog)
+    all_events = sim.world.get_resource(AllEvents)
+
+    assert len(event_log) > 0
+    assert list(event_log) == [event.get_id() for event in all_events]
+    assert len(event_log.get_records()) == len(event_log)
+
+    event = next(iter(all_events))
+    assert event_log[event.get_id()].to_dict() == event.to_dict()
+
+    # Appending an event again replaces its record
+    event_log.append(event)
+    assert len(event_log) == len(event_log.get_records())
+    assert list(event_log)[0] == event.get_id()
+
+    with pytest.raises(TypeError):
+        del event_log[event.get_id()]
+
+    for _, event_history in sim.world.get_component(EventHistory):
+        history: EventIdList = event_history._history  # type: ignore
+        assert isinstance(history, EventIdList)
+        # Events that never reach AllEvents stay in memory
+        for character_event in history:
+            event_id = character_event.get_id()
+            assert event_id in event_log or event_id in history._pending
+
+
+class EmptyEvent(LifeEvent):
+    pass
+
+
+def test_event_id_list_pending() -> None:
+    event_log = EventLog(World())
+    history = EventIdList(event_log)
+    logged = EmptyEvent(SimDateTime(1, 1, 1, 0), [])
+    event_log.append(logged)
+    pending = EmptyEvent(SimDateTime(1, 1, 1, 0), [])
+
+    history.append(logged)
+    history.append(pending)
+    history.append(pending)
+    assert list(history._pending) == [pending.get_id()]
+    assert history[2] is pending
+
+    # Writing the event drops it from every list holding it
+    other_history = EventIdList(event_log)
+    other_history.append(pending)
+    event_log.append(pending)
+    assert not history._pending and not other_history._pending
+    assert [e.get_id() for e in history] == [
+        logged.get_id(),
+        pending.get_id(),
+        pending.get_id(),
+    ]
+
+
+def test_event_log_pickle() -> None:
+    sim = run_test_simulation(7, 6, {"event_log": True})
+    # Copy the records to a log that no EventIdList is waiting on
+    event_log = EventLog(sim.world)
+    for event in sim.world.get_resource(EventLog).values():
+        event_log.append(event)
+
+    # Pickling the whole world requires speakeasy.checkpoint's pickler
+    event_log.world = None  # type: ignore
+    restored: EventLog = pickle.loads(pickle.dumps(event_log))
+    restored.world = sim.world
+    event_log.world = sim.world
+
+    assert list(restored) == list(event_log)
+    assert [e.to_dict() for e in restored.values()] == [
+        e.to_dict() for e in event_log.values()
+    ]
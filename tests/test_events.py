@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+
+from speakeasy.components import Favors, Respect
+from speakeasy.events import (
+    GainItemEffect,
+    GainRelationshipEffect,
+    LoseItemEffect,
+    LoseRelationshipEffect,
+    cache_effects,
+)
+
+
+def test_effects_are_immutable_values() -> None:
+    effect = GainRelationshipEffect(1, 2, Respect)
+
+    assert effect == GainRelationshipEffect(1, 2, Respect)
+    assert effect != LoseRelationshipEffect(1, 2, Respect)
+    assert effect != GainRelationshipEffect(1, 2, Favors)
+    assert GainItemEffect("booze") != LoseItemEffect("booze")
+    assert len({effect, GainRelationshipEffect(1, 2, Respect)}) == 1
+
+    with pytest.raises(AttributeError):
+        effect.owner = 3  # type: ignore
+
+    assert pickle.loads(pickle.dumps(effect)) == effect
+
+
+def test_cache_effects() -> None:
+    class Event:
+        calls = 0
+
+        @cache_effects
+        def get_effects(self):
+            Event.calls += 1
+            return {}
+
+    event = Event()
+
+    assert event.get_effects() is event.get_effects()
+    assert Event.calls == 1
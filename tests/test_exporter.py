@@ -0,0 +1,41 @@
+import io
+import json
+
+from neighborly.core.life_event import AllEvents
+from neighborly.exporter import export_to_json
+
+from speakeasy.exporter import write_json, write_ndjson
+from tests.simulation import run_test_simulation
+
+
+def test_write_json() -> None:
+    sim = run_test_simulation(7, 6)
+
+    output = io.StringIO()
+    write_json(sim, output)
+
+    assert output.getvalue() == export_to_json(sim)
+
+
+def test_write_ndjson() -> None:
+    sim = run_test_simulation(7, 6)
+
+    output = io.StringIO()
+    write_ndjson(sim, output)
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    exported = json.loads(export_to_json(sim))
+
+    assert records[0] == {"type": "simulation", "seed": exported["seed"]}
+    assert {
+        str(r["data"]["id"]): r["data"] for r in records if r["type"] == "gameobject"
+    } == exported["gameobjects"]
+    assert {
+        str(r["id"]): r["data"] for r in records if r["type"] == "event"
+    } == exported["resources"]["AllEvents"]
+    assert len([r for r in records if r["type"] == "event"]) == len(
+        list(sim.world.get_resource(AllEvents))
+    )
+    assert {
+        r["name"]: r["data"] for r in records if r["type"] == "resource"
+    } == {k: v for k, v in exported["resources"].items() if k != "AllEvents"}
@@ -0,0 +1,61 @@
+import speakeasy.events
+from speakeasy.batch import reset_global_state
+from speakeasy.events import TradeEvent
+from speakeasy.instrumentation import (
+    EventInstrumentation,
+    LatencyHistogram,
+    instrumented,
+    uninstrument_all,
+)
+from tests.simulation import create_test_simulation
+
+
+def test_latency_histogram() -> None:
+    histogram = LatencyHistogram()
+
+    histogram.record(0.0000005)
+    histogram.record(0.000003)
+    histogram.record(0.000003)
+    histogram.record(10000.0)
+
+    data = histogram.to_dict()
+
+    assert data["count"] == 4
+    assert data["buckets_us"] == {"1": 1, "4": 2, str(2**31): 1}
+    assert data["min_s"] == 0.0000005
+    assert data["max_s"] == 10000.0
+
+
+def test_event_instrumentation() -> None:
+    sim = create_test_simulation(1, {"instrument_events": True})
+
+    for _ in range(6):
+        sim.step()
+
+    data = sim.world.get_resource(EventInstrumentation).to_dict()
+
+    trade_stats = data["TradeEvent"]
+    assert trade_stats["attempts"] > 0
+    assert trade_stats["instantiate_latency"]["count"] == trade_stats["attempts"]
+    assert trade_stats["bind_calls"]["initiator"] >= trade_stats["attempts"]
+    assert (
+        trade_stats["attempts"] - trade_stats["instantiated"]
+        == sum(trade_stats["bind_failures"].values())
+    )
+    assert {
+        role: latency["count"] for role, latency in trade_stats["bind_latency"].items()
+    } == trade_stats["bind_calls"]
+
+    # Later simulations are not instrumented
+    reset_global_state()
+    assert not hasattr(TradeEvent.execute, "__wrapped__")
+
+
+def test_instrumented() -> None:
+    uninstrument_all()
+    execute = TradeEvent.__dict__["execute"]
+
+    with instrumented(speakeasy.events):
+        assert TradeEvent.__dict__["execute"] is not execute
+
+    assert TradeEvent.__dict__["execute"] is execute
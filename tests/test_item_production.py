@@ -1,6 +1,10 @@
-from neighborly import SimDateTime, World
+from neighborly import GameObject, SimDateTime, World
+from neighborly.components import Business
+from neighborly.core.ecs import ComponentAddedEvent
 
 from speakeasy.components import Inventory, Produces
+from speakeasy.event_listeners import add_spawned_business_to_market
+from speakeasy.resources import Market
 from speakeasy.systems import ProduceItemsSystem
 
 
@@ -37,3 +41,100 @@ def test_produces() -> None:
 
     assert inventory.get_quantity("sword") == 2
     assert inventory.get_quantity("armor") == 2
+
+
+def run_production_world(vectorized: bool):
+    world = World()
+
+    world.add_resource(SimDateTime())
+
+    ProduceItemsSystem.sys_group = "root"
+    world.add_system(ProduceItemsSystem(vectorized=vectorized))
+
+    # Spawn a placeholder so that no owner has the ID 0
+    world.spawn_gameobject()
+
+    recipes = [
+        ({"corn": 1}, {"money": 1}),
+        ({"booze": 1}, {"corn": 1}),
+        ({"money": 1}, {"booze": 2}),
+        ({"corn": 2, "money": 1}, {"corn": 1}),
+    ]
+
+    inventories = []
+    for i, (produces, requires) in enumerate(recipes):
+        owner = world.spawn_gameobject([Inventory({"corn": i, "money": 2})])
+        business = Business("Owner", {})
+        business.set_owner(owner.uid)
+        world.spawn_gameobject([business, Produces(produces, requires)])
+        inventories.append(owner.get_component(Inventory))
+
+    results = []
+    for _ in range(4):
+        world.step()
+        results.append([list(inventory.items.items()) for inventory in inventories])
+
+    return results
+
+
+def test_vectorized_produces() -> None:
+    assert run_production_world(True) == run_production_world(False)
+
+
+def run_shared_owner_world(vectorized: bool):
+    world = World()
+
+    world.add_resource(SimDateTime())
+
+    ProduceItemsSystem.sys_group = "root"
+    world.add_system(ProduceItemsSystem(vectorized=vectorized))
+
+    # Spawn a placeholder so that no owner has the ID 0
+    world.spawn_gameobject()
+
+    owner = world.spawn_gameobject([Inventory({"corn": 2})])
+
+    for _ in range(2):
+        business = Business("Owner", {})
+        business.set_owner(owner.uid)
+        world.spawn_gameobject([business, Produces({"booze": 1}, {"corn": 1})])
+
+    world.step()
+
+    return dict(owner.get_component(Inventory).items)
+
+
+def test_vectorized_produces_shared_owner() -> None:
+    assert run_shared_owner_world(False) == {"booze": 2}
+    assert run_shared_owner_world(True) == {"booze": 2}
+
+
+def test_spawned_business_joins_market() -> None:
+    world = World()
+
+    world.add_resource(SimDateTime())
+    world.add_resource(Market())
+
+    ProduceItemsSystem.sys_group = "root"
+    world.add_system(ProduceItemsSystem())
+
+    GameObject.on(ComponentAddedEvent, add_spawned_business_to_market)
+
+    try:
+        # Spawn a placeholder so that no owner has the ID 0
+        world.spawn_gameobject()
+
+        owner = world.spawn_gameobject([Inventory({"corn": 1})])
+        business = Business("Owner", {})
+        business.set_owner(owner.uid)
+        distillery = world.spawn_gameobject(
+            [business, Produces({"booze": 1}, {"corn": 1})]
+        )
+
+        assert world.get_resource(Market).get_producers("booze") == {distillery.uid}
+
+        world.step()
+
+        assert dict(owner.get_component(Inventory).items) == {"booze": 1}
+    finally:
+        GameObject.clear_event_listeners()
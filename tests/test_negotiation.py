@@ -0,0 +1,212 @@
+import random
+from typing import Any, Dict, Optional
+
+from neighborly.components import GameCharacter
+from neighborly.core.ecs import Active, World
+from neighborly.core.life_event import AllEvents, LifeEvent
+
+import speakeasy.events  # noqa: F401 (must be imported before neighborly_classes)
+from speakeasy.events import NegotiateEvent
+from speakeasy.negotiation.core import (
+    Action,
+    Agent,
+    ResponseCategory,
+    get_initial_ask_options,
+    run_negotiation,
+)
+from speakeasy.negotiation.neighborly_classes import (
+    EventCandidate,
+    NeighborlyNegotiator,
+    OfferLedger,
+    get_item_losses,
+)
+from speakeasy.negotiation.scheduler import NegotiationBatch
+from tests.simulation import run_test_simulation
+
+
+def create_agent(utilities) -> Agent:
+    agent = Agent(random.Random(1337))
+    agent.utilities = {**utilities}
+    return agent
+
+
+def test_search_counter_offers() -> None:
+    agent = create_agent({"A": 1, "B": 2, "C": 3, "D": 4})
+
+    possible_actions = sorted(map(Action, "ABCD"), key=agent.get_utility)
+
+    offers = agent.search_counter_offers(3, set(), possible_actions)
+
+    assert [[a.val for a in o] for o in offers] == [["D"], ["C", "B"]]
+
+    offers = agent.search_counter_offers(3, {("D",)}, possible_actions)
+
+    assert [[a.val for a in o] for o in offers] == [["C", "B"]]
+
+    agent.max_counter_offers = 1
+    offers = agent.search_counter_offers(3, set(), possible_actions)
+
+    assert [[a.val for a in o] for o in offers] == [["D"]]
+
+    agent.max_counter_offers = None
+    agent.search_budget = 2
+    offers = agent.search_counter_offers(3, set(), possible_actions)
+
+    assert [[a.val for a in o] for o in offers] == [["D"]]
+
+
+def test_respond_to_offer() -> None:
+    agent = create_agent({"A": -3, "B": 2, "C": 2})
+
+    response, offers = agent.respond_to_offer([Action("B")], [])
+
+    assert response == ResponseCategory.ACCEPT
+
+    response, offers = agent.respond_to_offer([Action("A")], [])
+
+    assert response == ResponseCategory.COUNTER
+    assert [[a.val for a in o] for o in offers] == [["A", "C", "B"]]
+
+    response, offers = agent.respond_to_offer(
+        [Action("A")], [[Action("A"), Action("C"), Action("B")]]
+    )
+
+    assert response == ResponseCategory.REJECT
+
+
+def test_run_negotiation() -> None:
+    agent1 = create_agent({"A": 5, "B": -1, "C": -1})
+    agent2 = create_agent({"A": -3, "B": 2, "C": 2})
+
+    get_initial_ask_options(agent1, agent2)
+    (result, offers), trace = run_negotiation(agent1, agent2, Action("A"))
+
+    assert result == ResponseCategory.ACCEPT
+    assert [turn.response for turn in trace.turns] == [
+        ResponseCategory.COUNTER,
+        ResponseCategory.ACCEPT,
+    ]
+    assert trace.render().startswith("Negotiation Begins")
+
+    get_initial_ask_options(agent1, agent2)
+    (result, offers), trace = run_negotiation(
+        agent1, agent2, Action("A"), record_trace=False
+    )
+
+    assert result == ResponseCategory.ACCEPT
+    assert [a.val for a in offers[0]] == ["A", "C", "B"]
+    assert trace is None
+
+
+def create_world(seed: int = 3, settings: Optional[Dict[str, Any]] = None) -> World:
+    return run_test_simulation(seed, 12, settings).world
+
+
+def test_dry_run_candidates() -> None:
+    world = create_world()
+    characters = [
+        world.get_gameobject(uid)
+        for uid, _ in world.get_components((GameCharacter, Active))
+    ][:20]
+
+    rng_state = world.get_resource(random.Random).getstate()
+    next_event_id = LifeEvent._next_event_id  # type: ignore
+    gameobject_count = len(list(world.get_gameobjects()))
+
+    options = []
+    for a in characters:
+        for b in characters:
+            if a != b:
+                options.extend(
+                    get_initial_ask_options(
+                        NeighborlyNegotiator("a", a, random.Random(1)),
+                        NeighborlyNegotiator("b", b, random.Random(2)),
+                    )
+                )
+
+    assert options
+    assert world.get_resource(random.Random).getstate() == rng_state
+    assert LifeEvent._next_event_id == next_event_id  # type: ignore
+    assert len(list(world.get_gameobjects())) == gameobject_count
+
+    candidate: EventCandidate = options[0].val
+    assert candidate == EventCandidate(candidate.event)
+    event = candidate.commit(world)
+    assert event.get_id() == next_event_id
+    assert event is not candidate.event
+    assert str(event) == str(candidate)
+    assert event.get_id() in world.get_resource(AllEvents)._history  # type: ignore
+
+
+def test_offer_ledger() -> None:
+    world = create_world()
+    characters = [
+        world.get_gameobject(uid)
+        for uid, _ in world.get_components((GameCharacter, Active))
+    ]
+
+    rng = random.Random(1)
+    actions = []
+    for a in characters:
+        for b in characters:
+            if a != b and len(actions) < 12:
+                actions.extend(
+                    get_initial_ask_options(
+                        NeighborlyNegotiator("a", a, rng),
+                        NeighborlyNegotiator("b", b, rng),
+                    )
+                )
+
+    assert any(get_item_losses(action) for action in actions)
+
+    ledger = OfferLedger(world)
+    for _ in range(50):
+        offer = rng.sample(actions, rng.randint(0, 6))
+        ledger.sync(offer)
+
+        expected = {}
+        for action in offer:
+            for key, quantity in get_item_losses(action).items():
+                expected[key] = expected.get(key, 0) + quantity
+
+        assert ledger.actions == offer
+        assert ledger.losses == expected
+
+    ledger.sync([])
+    assert ledger.losses == {}
+
+
+def test_negotiation_batch() -> None:
+    world = create_world(5, {"batch_negotiations": True})
+
+    assert len(world.get_resource(NegotiationBatch).pending) == 0
+
+    events = list(world.get_resource(AllEvents))
+    negotiations = [e for e in events if isinstance(e, NegotiateEvent)]
+    agreed = [action.val for e in negotiations for action in e.agreement]
+
+    assert negotiations
+    assert agreed
+    assert len({e.get_id() for e in events}) == len(events)
+
+    rerun = create_world(5, {"batch_negotiations": True})
+    assert [str(e) for e in rerun.get_resource(AllEvents)] == [str(e) for e in events]
+
+
+def test_negotiation_offload() -> None:
+    # Long enough for some batches to have multiple negotiations, which is when the
+    # searches are sent to the worker processes
+    sim = run_test_simulation(3, 36, {"negotiation_workers": 2})
+    batch = sim.world.get_resource(NegotiationBatch)
+
+    assert batch._executor is not None  # type: ignore
+
+    batch.shutdown()
+
+    assert batch._executor is None  # type: ignore
+
+    expected = run_test_simulation(3, 36, {"batch_negotiations": True})
+
+    assert [str(e) for e in sim.world.get_resource(AllEvents)] == [
+        str(e) for e in expected.world.get_resource(AllEvents)
+    ]
@@ -0,0 +1,139 @@
+import pytest
+from neighborly.components import GameCharacter
+from neighborly.components.character import Family
+from neighborly.core.relationship import Relationship, get_relationships_with_statuses
+from neighborly.utils.query import are_related
+
+from speakeasy.resources import (
+    BusinessAssociations,
+    ItemRegistry,
+    KinshipIndex,
+    Market,
+    RespectIndex,
+)
+from tests.simulation import run_test_simulation
+
+
+def test_respect_index() -> None:
+    respect_index = RespectIndex()
+
+    respect_index.update(1, 2, 6)
+
+    assert respect_index.respected_by(1, 5) == {2}
+    assert respect_index.respecting(2, 5) == {1}
+    assert len(respect_index.mutually_respected(1, 5)) == 0
+
+    respect_index.update(2, 1, 5)
+
+    assert respect_index.mutually_respected(1, 5) == {2}
+    assert respect_index.mutually_respected(2, 5) == {1}
+    assert respect_index.mutually_respect(1, 2, 5) is True
+    assert respect_index.mutually_respect(1, 2, 6) is False
+
+    respect_index.update(1, 2, 3)
+
+    assert len(respect_index.respected_by(1, 5)) == 0
+    assert len(respect_index.mutually_respected(2, 5)) == 0
+    assert respect_index.respecting(1, 5) == {2}
+    assert respect_index.get_value(1, 2) == 3
+
+
+def test_business_associations() -> None:
+    associations = BusinessAssociations()
+
+    associations.set(1, 10)
+    associations.set(2, 10)
+    associations.set(3, None)
+
+    assert 1 in associations
+    assert associations.get(1) == 10
+    assert associations.get(3) is None
+
+    associations.invalidate_business(10)
+
+    assert 1 not in associations
+    assert 2 not in associations
+    assert 3 in associations
+
+    associations.invalidate(3)
+
+    assert 3 not in associations
+
+    associations.set_associates(10, [1, 2])
+
+    assert associations.get_associates(10) == {1, 2}
+
+    associations.invalidate_business(10)
+
+    with pytest.raises(KeyError):
+        associations.get_associates(10)
+
+
+def test_item_registry() -> None:
+    registry = ItemRegistry()
+
+    assert registry.get_id("booze") == 0
+    assert registry.get_id("corn") == 1
+    assert registry.get_id("booze") == 0
+    assert registry.try_id("money") is None
+    assert registry.get_name(1) == "corn"
+    assert "corn" in registry
+    assert len(registry) == 2
+
+
+def test_market() -> None:
+    market = Market()
+
+    market.add_business(1, ["booze"], ["corn"])
+    market.add_business(2, ["corn"], ["money"])
+    market.add_business(3, ["money"], ["booze"])
+
+    assert market.get_producers("corn") == {2}
+    assert market.get_buyers("corn") == {1}
+    assert market.get_required_items(3) == {"booze"}
+    assert market.produces_any(1, ["booze", "money"])
+    assert not market.produces_any(1, ["corn"])
+    assert market.get_businesses() == [1, 2, 3]
+
+    market.remove_business(2)
+
+    assert 2 not in market
+    assert market.get_producers("corn") == set()
+    assert market.get_buyers("money") == set()
+    assert market.get_produced_items(2) == set()
+
+
+def test_kinship_index() -> None:
+    kinship_index = KinshipIndex()
+
+    kinship_index.add(1, 3, 12)
+    kinship_index.add(1, 2, 10)
+
+    assert kinship_index.is_family(1, 2) is True
+    assert kinship_index.is_family(2, 1) is False
+    assert kinship_index.are_related(2, 2) is True
+    assert kinship_index.get_family(1) == [2, 3]
+    assert kinship_index.get_family(2) == []
+
+    kinship_index.remove(1, 2)
+
+    assert kinship_index.are_related(1, 2) is False
+    assert kinship_index.get_family(1) == [3]
+
+
+def test_kinship_index_matches_relationships() -> None:
+    sim = run_test_simulation(3, 12)
+    world = sim.world
+    kinship_index = world.get_resource(KinshipIndex)
+
+    characters = [
+        world.get_gameobject(uid) for uid, _ in world.get_component(GameCharacter)
+    ]
+
+    for a in characters:
+        assert kinship_index.get_family(a.uid) == [
+            r.get_component(Relationship).target
+            for r in get_relationships_with_statuses(a, Family)
+        ]
+        for b in characters:
+            assert kinship_index.are_related(a.uid, b.uid) == are_related(a, b)
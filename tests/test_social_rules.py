@@ -0,0 +1,48 @@
+from neighborly import GameObject, World
+from neighborly.components import Virtues
+from neighborly.core.ecs import ComponentAddedEvent
+from neighborly.core.relationship import Friendship, Romance
+
+from speakeasy.components import VirtueSignature
+from speakeasy.event_listeners import add_virtue_signature
+from speakeasy.social_rules import (
+    friendship_virtue_compatibility,
+    romance_boost_from_shared_virtues,
+    romance_loss_from_virtue_conflicts,
+)
+
+
+def test_virtue_signature_added_with_virtues() -> None:
+    world = World()
+
+    GameObject.on(ComponentAddedEvent, add_virtue_signature)
+
+    try:
+        character = world.spawn_gameobject([Virtues({"LOYALTY": 40, "LUST": -45})])
+    finally:
+        GameObject.clear_event_listeners()
+
+    signature = character.get_component(VirtueSignature)
+    assert signature.compatibility(signature) == 100
+
+
+def test_virtue_rules_do_not_add_components() -> None:
+    world = World()
+    a = Virtues({"LOYALTY": 40, "POWER": 30, "FAMILY": 20, "LUST": -45, "PEACE": -30})
+    b = Virtues({"LOYALTY": 25, "PEACE": 35, "LUST": -10, "POWER": -40, "FAMILY": 10})
+    subject = world.spawn_gameobject([a])
+    target = world.spawn_gameobject([b])
+
+    a_signature, b_signature = VirtueSignature(a), VirtueSignature(b)
+
+    assert romance_boost_from_shared_virtues(subject, target) == {
+        Romance: a_signature.count_shared_virtues(b_signature)
+    }
+    assert romance_loss_from_virtue_conflicts(subject, target) == {
+        Romance: -a_signature.count_virtue_conflicts(b_signature)
+    }
+    assert friendship_virtue_compatibility(subject, target) == {
+        Friendship: round(6 * a.compatibility(b) / 100)
+    }
+    assert not subject.has_component(VirtueSignature)
+    assert not target.has_component(VirtueSignature)